@@ -5,7 +5,7 @@ from alembic import context
 
 from app.core.config import settings
 from app.database import Base
-from app.db_models import User, FitnessConnection, FitnessData
+from app.db_models import User, FitnessConnection, FitnessData, WorkerReadiness, SafetySession, SafetyEvent
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,45 @@
+"""add roster change notify trigger
+
+Revision ID: 3f2a9d7c41e8
+Revises: 6b5011550384
+Create Date: 2026-10-19 10:12:03.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9d7c41e8'
+down_revision: Union[str, None] = '6b5011550384'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NOTIFY roster_changed with the user id on any users write, so every
+    # backend process can drop that user from its in-memory roster cache
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_roster_changed() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('roster_changed', OLD.id::text);
+            ELSE
+                PERFORM pg_notify('roster_changed', NEW.id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER users_roster_changed
+        AFTER INSERT OR UPDATE OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_roster_changed();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_roster_changed ON users;")
+    op.execute("DROP FUNCTION IF EXISTS notify_roster_changed();")
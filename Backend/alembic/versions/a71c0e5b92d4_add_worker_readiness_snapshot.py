@@ -0,0 +1,47 @@
+"""add worker readiness snapshot
+
+Revision ID: a71c0e5b92d4
+Revises: 3f2a9d7c41e8
+Create Date: 2026-10-19 11:02:47.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71c0e5b92d4'
+down_revision: Union[str, None] = '3f2a9d7c41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('worker_readiness',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('zone_assignment', sa.String(length=100), nullable=True),
+    sa.Column('fitness_status', postgresql.ENUM('CLEARED', 'RESTRICTED', 'UNFIT', 'PENDING', name='fitnessstatus', create_type=False), nullable=True),
+    sa.Column('cognitive_result', postgresql.ENUM('FIT', 'SUPERVISION_REQUIRED', 'UNFIT', name='cognitiveresult', create_type=False), nullable=True),
+    sa.Column('cognitive_score', sa.Integer(), nullable=True),
+    sa.Column('cognitive_valid_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('fitness_date', sa.Date(), nullable=True),
+    sa.Column('sleep_hours', sa.Float(), nullable=True),
+    sa.Column('heart_rate_resting', sa.Integer(), nullable=True),
+    sa.Column('readiness', sa.Enum('READY', 'SUPERVISION_REQUIRED', 'NOT_READY', name='readinessstatus'), nullable=False),
+    sa.Column('reasons', sa.JSON(), nullable=True),
+    sa.Column('stale_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_worker_readiness_zone_readiness', 'worker_readiness', ['zone_assignment', 'readiness'], unique=False)
+    op.create_index('ix_worker_readiness_stale_at', 'worker_readiness', ['stale_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_worker_readiness_stale_at', table_name='worker_readiness')
+    op.drop_index('ix_worker_readiness_zone_readiness', table_name='worker_readiness')
+    op.drop_table('worker_readiness')
+    sa.Enum(name='readinessstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,64 @@
+"""add safety sessions and events
+
+Revision ID: c5d83e1f07a2
+Revises: a71c0e5b92d4
+Create Date: 2026-10-19 11:48:12.660391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d83e1f07a2'
+down_revision: Union[str, None] = 'a71c0e5b92d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('safety_sessions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('admin_id', sa.UUID(), nullable=False),
+    sa.Column('source', sa.String(length=50), nullable=True),
+    sa.Column('camera_id', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.Enum('ACTIVE', 'STOPPED', name='sessionstatus'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['admin_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_safety_sessions_admin_id'), 'safety_sessions', ['admin_id'], unique=False)
+    op.create_index(op.f('ix_safety_sessions_started_at'), 'safety_sessions', ['started_at'], unique=False)
+    op.create_table('safety_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('session_id', sa.UUID(), nullable=True),
+    sa.Column('worker_id', sa.UUID(), nullable=True),
+    sa.Column('event_type', sa.Enum('PPE_VIOLATION', 'PPE_RESOLVED', 'LOST_WORKER', 'ERGONOMIC_ALERT', name='safetyeventtype'), nullable=False),
+    sa.Column('severity', sa.Enum('LOW', 'MEDIUM', 'HIGH', name='eventseverity'), nullable=False),
+    sa.Column('track_id', sa.Integer(), nullable=True),
+    sa.Column('stream_id', sa.String(length=100), nullable=True),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['safety_sessions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['worker_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_safety_events_session_occurred', 'safety_events', ['session_id', 'occurred_at'], unique=False)
+    op.create_index('ix_safety_events_worker_occurred', 'safety_events', ['worker_id', 'occurred_at'], unique=False)
+    op.create_index('ix_safety_events_occurred', 'safety_events', ['occurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_safety_events_occurred', table_name='safety_events')
+    op.drop_index('ix_safety_events_worker_occurred', table_name='safety_events')
+    op.drop_index('ix_safety_events_session_occurred', table_name='safety_events')
+    op.drop_table('safety_events')
+    op.drop_index(op.f('ix_safety_sessions_started_at'), table_name='safety_sessions')
+    op.drop_index(op.f('ix_safety_sessions_admin_id'), table_name='safety_sessions')
+    op.drop_table('safety_sessions')
+    sa.Enum(name='eventseverity').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='safetyeventtype').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='sessionstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""add zone event types
+
+Revision ID: e2b7f4a9c815
+Revises: c5d83e1f07a2
+Create Date: 2026-10-19 14:05:37.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f4a9c815'
+down_revision: Union[str, None] = 'c5d83e1f07a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE safetyeventtype ADD VALUE IF NOT EXISTS 'ZONE_UNAUTHORIZED'")
+        op.execute("ALTER TYPE safetyeventtype ADD VALUE IF NOT EXISTS 'ZONE_DWELL'")
+
+
+def downgrade() -> None:
+    # Postgres cannot drop enum values; remove the rows that use them instead
+    op.execute("DELETE FROM safety_events WHERE event_type IN ('ZONE_UNAUTHORIZED', 'ZONE_DWELL')")
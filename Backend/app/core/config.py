@@ -12,10 +12,76 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements; 0 for transaction poolers
+    DB_ECHO: bool = False               # SQL query logging
 
     # JWT Authentication (verification only)
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    WS_REQUIRE_AUTH: bool = False     # reject /ws handshakes without a valid token
+
+    # Motion-gated inference
+    MOTION_GATE_ENABLED: bool = True
+    MOTION_THRESHOLD: float = 0.004   # fraction of ROI pixels that must change
+    MOTION_MAX_SKIP: int = 15         # force full inference after this many static frames
+
+    # Keyframe detection — YOLO every K frames, optical flow in between
+    KEYFRAME_DETECTION_ENABLED: bool = False
+    KEYFRAME_MAX_INTERVAL: int = 6    # K for a still scene; shrinks to 1 with motion
+
+    # Preprocessing — each consumer gets its own resize of the source frame
+    DETECT_INPUT_SIZE: int = 640      # detector's native (square, letterboxed) input
+    POSE_INPUT_WIDTH: int = 320       # pose runs at this width, aspect preserved
+    DISPLAY_MAX_WIDTH: int = 640      # annotated frames + returned boxes fit in this box;
+    DISPLAY_MAX_HEIGHT: int = 480     # 0 = no limit (annotate at source resolution)
+
+    # Pose estimation backend: mediapipe, mediapipe-tasks or yolo-pose
+    POSE_BACKEND: str = "mediapipe"
+    POSE_MODEL_COMPLEXITY: int = 1        # mediapipe: 0 lite, 1 full, 2 heavy
+    POSE_LANDMARKER_MODEL: str = "yolo_models/pose_landmarker_full.task"  # mediapipe-tasks bundle
+    POSE_MAX_PEOPLE: int = 4              # mediapipe-tasks: people per frame
+    POSE_YOLO_MODEL: str = "yolo_models/yolo11n-pose.pt"  # yolo-pose, unless the detector is itself a pose model
+
+    # Stateful backends get one instance per stream
+    POSE_POOL_SIZE: int = 0               # max instances (= concurrent pose calls); 0 = CPU count
+    POSE_POOL_IDLE_TIMEOUT: float = 60.0  # seconds before an unused instance is closed
+
+    # Landmark smoothing (One-Euro) and confidence gating before ergonomics
+    LANDMARK_FILTER_ENABLED: bool = True
+    LANDMARK_MIN_CUTOFF: float = 1.0      # Hz; lower = smoother when still
+    LANDMARK_BETA: float = 10.0           # cutoff increase with joint speed; higher = less lag
+    LANDMARK_MIN_VISIBILITY: float = 0.5  # joints below this are unreliable and skipped
+
+    # Cumulative ergonomic exposure (bends, lifts, arm cycles, time at risk)
+    EXPOSURE_SHIFT_START_HOUR: int = 0    # local hour at which per-worker counters roll over
+
+    # Inference scheduling: webcam = live, CCTV = near-live, /process = batch
+    INFERENCE_WORKERS: int = 2                # frames processed concurrently
+    INFERENCE_BATCH_WORKERS: int = 0          # max of those for batch jobs; 0 = all but one
+    INFERENCE_LIVE_DEADLINE: float = 0.25     # seconds a webcam frame may queue before it is dropped
+    INFERENCE_NEAR_LIVE_DEADLINE: float = 1.0 # same for CCTV frames
+
+    # Video decoding (PyAV if installed, else OpenCV)
+    DECODE_THREADS: int = 0           # decoder threads, 0 = auto
+    DECODE_MAX_WIDTH: int = 1280      # decoder downscales wider sources; 0 = full resolution
+
+    # Worker tracking
+    TRACK_LOST_TIMEOUT: float = 5.0   # seconds unseen before an assigned worker counts as lost
+
+    # Re-identification of lost workers by appearance
+    REID_ENABLED: bool = True
+    REID_MIN_SIMILARITY: float = 0.85  # colour-histogram similarity needed to carry an assignment over
+    REID_GALLERY_TTL: float = 120.0    # seconds a lost worker stays matchable
+
+    # JPEG encoding of outgoing frames: auto (turbo if installed), turbo or cv2
+    JPEG_ENCODER: str = "auto"
+
+    # H.264 fragmented-MP4 output (/stream), needs PyAV
+    VIDEO_STREAM_BITRATE: int = 800_000  # bits/s per stream
+    VIDEO_STREAM_GOP: int = 20           # frames per keyframe = per fragment
 
     class Config:
         env_file = ".env"
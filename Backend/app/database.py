@@ -1,19 +1,59 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-# Create SQLAlchemy engine
+def _pool_options(url):
+    # SQLite (local stand-in) keeps SQLAlchemy's default pool, which has no sizing
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+def _async_url(url):
+    """Swap the sync driver for its asyncio counterpart"""
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").update_query_dict({
+            "prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)
+        })
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+_url = make_url(settings.DATABASE_URL)
+
+# Create SQLAlchemy engine — used by scripts, Alembic and background writers
 engine = create_engine(
-    settings.DATABASE_URL,
+    _url,
     pool_pre_ping=True,  # Verify connections before using
-    # pool_size=10,
-    # max_overflow=20
-    echo=True # Enable SQL query logging for debugging purposes
+    echo=settings.DB_ECHO,  # SQL query logging, off unless debugging
+    **_pool_options(_url)
+)
+
+# Async engine — used by request handlers so DB waits don't block the
+# event loop that also serves the video sockets
+_async_connect_args = {}
+if _url.get_backend_name() == "postgresql":
+    # asyncpg's own statement cache; set to 0 behind a transaction-mode pooler
+    _async_connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+async_engine = create_async_engine(
+    _async_url(_url),
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO,
+    connect_args=_async_connect_args,
+    **_pool_options(_url)
 )
 
-# Session factory
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -24,4 +64,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
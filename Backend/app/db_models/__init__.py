@@ -3,6 +3,8 @@ from app.db_models.fitness_connection import FitnessConnection
 from app.db_models.fitness_data import FitnessData
 from app.db_models.worker_profile import WorkerProfile, BloodGroup, FitnessStatus, Gender, DominantHand
 from app.db_models.cognitive_assessment import CognitiveAssessment, CognitiveResult
+from app.db_models.worker_readiness import WorkerReadiness, ReadinessStatus
+from app.db_models.safety_session import SafetySession, SafetyEvent, SessionStatus, SafetyEventType, EventSeverity
 
 __all__ = [
     "User", "UserRole",
@@ -10,4 +12,6 @@ __all__ = [
     "FitnessData",
     "WorkerProfile", "BloodGroup", "FitnessStatus", "Gender", "DominantHand",
     "CognitiveAssessment", "CognitiveResult",
+    "WorkerReadiness", "ReadinessStatus",
+    "SafetySession", "SafetyEvent", "SessionStatus", "SafetyEventType", "EventSeverity",
 ]
\ No newline at end of file
@@ -0,0 +1,66 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index, Enum as SQLEnum, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+import enum
+from app.database import Base
+
+class SessionStatus(str, enum.Enum):
+    ACTIVE = "active"
+    STOPPED = "stopped"
+
+class SafetyEventType(str, enum.Enum):
+    PPE_VIOLATION = "ppe_violation"
+    PPE_RESOLVED = "ppe_resolved"
+    LOST_WORKER = "lost_worker"
+    ERGONOMIC_ALERT = "ergonomic_alert"
+    ZONE_UNAUTHORIZED = "zone_unauthorized"
+    ZONE_DWELL = "zone_dwell"
+
+class EventSeverity(str, enum.Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+class SafetySession(Base):
+    __tablename__ = "safety_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    admin_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    source = Column(String(50), nullable=True)      # webcam / cctv / file
+    camera_id = Column(String(255), nullable=True)
+    status = Column(SQLEnum(SessionStatus), nullable=False, default=SessionStatus.ACTIVE)
+
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    ended_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    admin = relationship("User", back_populates="safety_sessions")
+    events = relationship("SafetyEvent", back_populates="session", cascade="all, delete-orphan", passive_deletes=True)
+
+class SafetyEvent(Base):
+    __tablename__ = "safety_events"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    session_id = Column(UUID(as_uuid=True), ForeignKey('safety_sessions.id', ondelete='CASCADE'), nullable=True)
+    worker_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+
+    event_type = Column(SQLEnum(SafetyEventType), nullable=False)
+    severity = Column(SQLEnum(EventSeverity), nullable=False, default=EventSeverity.MEDIUM)
+    track_id = Column(Integer, nullable=True)
+    stream_id = Column(String(100), nullable=True)
+    details = Column(JSONB, nullable=True)  # item, scores, worker snapshot...
+
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Relationship
+    session = relationship("SafetySession", back_populates="events")
+
+    # Event log queries filter by session, worker or time and sort by time
+    __table_args__ = (
+        Index('ix_safety_events_session_occurred', 'session_id', 'occurred_at'),
+        Index('ix_safety_events_worker_occurred', 'worker_id', 'occurred_at'),
+        Index('ix_safety_events_occurred', 'occurred_at'),
+    )
@@ -24,7 +24,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-    # safety_sessions = relationship("SafetySession", back_populates="admin", cascade="all, delete-orphan")
+    safety_sessions = relationship("SafetySession", back_populates="admin", cascade="all, delete-orphan")
     fitness_connection = relationship("FitnessConnection", back_populates="user", uselist=False, cascade="all, delete-orphan")
     fitness_data = relationship("FitnessData", back_populates="user", cascade="all, delete-orphan")
     worker_profile = relationship("WorkerProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, JSON, Index, Enum as SQLEnum, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+from app.database import Base
+from app.db_models.worker_profile import FitnessStatus
+from app.db_models.cognitive_assessment import CognitiveResult
+
+class ReadinessStatus(str, enum.Enum):
+    READY = "ready"
+    SUPERVISION_REQUIRED = "supervision_required"
+    NOT_READY = "not_ready"
+
+class WorkerReadiness(Base):
+    """
+    Materialized pre-shift readiness per worker. Denormalizes the latest
+    WorkerProfile, CognitiveAssessment and FitnessData so a zone roster is
+    one indexed query. Kept in sync by app.services.readiness_service.
+    """
+    __tablename__ = "worker_readiness"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    zone_assignment = Column(String(100), nullable=True)
+
+    # Sources
+    fitness_status = Column(SQLEnum(FitnessStatus), nullable=True)
+    cognitive_result = Column(SQLEnum(CognitiveResult), nullable=True)
+    cognitive_score = Column(Integer, nullable=True)
+    cognitive_valid_until = Column(DateTime(timezone=True), nullable=True)
+    fitness_date = Column(Date, nullable=True)  # day of the sleep / HR values below
+    sleep_hours = Column(Float, nullable=True)
+    heart_rate_resting = Column(Integer, nullable=True)
+
+    # Result
+    readiness = Column(SQLEnum(ReadinessStatus), nullable=False)
+    reasons = Column(JSON, default=list)  # human-readable reasons for a non-ready status
+
+    # When the result goes out of date without any source write (cognitive
+    # expiry, fitness data ageing out); re-materialized on the next read
+    stale_at = Column(DateTime(timezone=True), nullable=True)
+
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationship
+    user = relationship("User")
+
+    __table_args__ = (
+        Index('ix_worker_readiness_zone_readiness', 'zone_assignment', 'readiness'),
+        Index('ix_worker_readiness_stale_at', 'stale_at'),
+    )
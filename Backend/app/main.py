@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.routes import  health, upload, websocket, tracking
+from app.utils.security import WebSocketAuthMiddleware
+from app.routes import  health, upload, websocket, tracking, cameras, fitness, readiness, safety, video_stream, ergonomics
 
 app = FastAPI(title=settings.APP_NAME, version=settings.VERSION)
 
@@ -13,13 +14,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Verify WebSocket tokens once per handshake, through the token cache
+app.add_middleware(WebSocketAuthMiddleware, require_auth=settings.WS_REQUIRE_AUTH)
+
 # Include routers
 app.include_router(health.router, tags=["Health"])
 app.include_router(upload.router, tags=["Upload"])
 app.include_router(websocket.router, tags=["WebSocket"])
 app.include_router(tracking.router, tags=["Tracking"])
+app.include_router(cameras.router, tags=["Cameras"])
+app.include_router(fitness.router, tags=["Fitness"])
+app.include_router(readiness.router, tags=["Readiness"])
+app.include_router(safety.router, tags=["Safety"])
+app.include_router(video_stream.router, tags=["Video Stream"])
+app.include_router(ergonomics.router, tags=["Ergonomics"])
+
+@app.on_event("startup")
+async def startup_event():
+    from app.services.roster_cache import roster_cache
+    from app.services.safety_event_writer import safety_event_writer
+    safety_event_writer.start()
+    try:
+        await roster_cache.listen_for_changes(settings.DATABASE_URL)
+    except Exception as e:
+        # Cache still works, bounded by its TTL
+        print(f"⚠️ Roster change listener unavailable: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    from app.models.safety_monitor import safety_monitor
-    safety_monitor.cleanup()
\ No newline at end of file
+    from app.models import safety_monitor
+    from app.services.roster_cache import roster_cache
+    from app.services.safety_event_writer import safety_event_writer
+    from app.services.video_stream_service import video_stream_service
+    from app.services.inference_scheduler import inference_scheduler
+    video_stream_service.stop_all()
+    inference_scheduler.stop()
+    safety_monitor.cleanup()
+    await roster_cache.stop_listening()
+    safety_event_writer.stop()
\ No newline at end of file
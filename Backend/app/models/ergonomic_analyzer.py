@@ -1,20 +1,166 @@
-import math
+import numpy as np
+
+# ----------------------------------------------------------------------
+# LOOKUP TABLES
+# Standard RULA (McAtamney & Corlett, 1993) and REBA (Hignett &
+# McAtamney, 2000) tables. A sub-score s sits at index s - 1.
+# ----------------------------------------------------------------------
+
+# RULA Table A [upper arm 1-6][lower arm 1-3][wrist 1-4][wrist twist 1-2]
+RULA_TABLE_A = np.array([
+    1, 2, 2, 2, 2, 3, 3, 3,
+    2, 2, 2, 2, 3, 3, 3, 3,
+    2, 3, 3, 3, 3, 3, 4, 4,
+    2, 3, 3, 3, 3, 4, 4, 4,
+    3, 3, 3, 3, 3, 4, 4, 4,
+    3, 4, 4, 4, 4, 4, 5, 5,
+    3, 3, 4, 4, 4, 4, 5, 5,
+    3, 4, 4, 4, 4, 4, 5, 5,
+    4, 4, 4, 4, 4, 5, 5, 5,
+    4, 4, 4, 4, 4, 5, 5, 5,
+    4, 4, 4, 4, 4, 5, 5, 5,
+    4, 4, 4, 5, 5, 5, 6, 6,
+    5, 5, 5, 5, 5, 6, 6, 7,
+    5, 6, 6, 6, 6, 7, 7, 7,
+    6, 6, 6, 7, 7, 7, 7, 8,
+    7, 7, 7, 7, 7, 8, 8, 9,
+    8, 8, 8, 8, 8, 9, 9, 9,
+    9, 9, 9, 9, 9, 9, 9, 9,
+], dtype=np.uint8).reshape(6, 3, 4, 2)
+
+# RULA Table B [neck 1-6][trunk 1-6][legs 1-2]
+RULA_TABLE_B = np.array([
+    1, 3, 2, 3, 3, 4, 5, 5, 6, 6, 7, 7,
+    2, 3, 2, 3, 4, 5, 5, 5, 6, 7, 7, 7,
+    3, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 7,
+    5, 5, 5, 6, 6, 7, 7, 7, 7, 7, 8, 8,
+    7, 7, 7, 7, 7, 8, 8, 8, 8, 8, 8, 8,
+    8, 8, 8, 8, 8, 8, 8, 9, 9, 9, 9, 9,
+], dtype=np.uint8).reshape(6, 6, 2)
+
+# RULA Table C [wrist/arm score 1-8+][neck/trunk/leg score 1-7+]
+RULA_TABLE_C = np.array([
+    [1, 2, 3, 3, 4, 5, 5],
+    [2, 2, 3, 4, 4, 5, 5],
+    [3, 3, 3, 4, 4, 5, 6],
+    [3, 3, 3, 4, 5, 6, 6],
+    [4, 4, 4, 5, 6, 7, 7],
+    [4, 4, 5, 6, 6, 7, 7],
+    [5, 5, 6, 6, 7, 7, 7],
+    [5, 5, 6, 7, 7, 7, 7],
+], dtype=np.uint8)
+
+# REBA Table A [trunk 1-5][neck 1-3][legs 1-4], written neck-major as published
+REBA_TABLE_A = np.array([
+    [[1, 2, 3, 4], [2, 3, 4, 5], [2, 4, 5, 6], [3, 5, 6, 7], [4, 6, 7, 8]],
+    [[1, 2, 3, 4], [3, 4, 5, 6], [4, 5, 6, 7], [5, 6, 7, 8], [6, 7, 8, 9]],
+    [[3, 3, 5, 6], [4, 5, 6, 7], [5, 6, 7, 8], [6, 7, 8, 9], [7, 8, 9, 9]],
+], dtype=np.uint8).transpose(1, 0, 2)
+
+# REBA Table B [upper arm 1-6][lower arm 1-2][wrist 1-3], written lower-arm-major
+REBA_TABLE_B = np.array([
+    [[1, 2, 2], [1, 2, 3], [3, 4, 5], [4, 5, 5], [6, 7, 8], [7, 8, 8]],
+    [[1, 2, 3], [2, 3, 4], [4, 5, 5], [5, 6, 7], [7, 8, 8], [8, 9, 9]],
+], dtype=np.uint8).transpose(1, 0, 2)
+
+# REBA Table C [score A 1-12][score B 1-12]
+REBA_TABLE_C = np.array([
+    [1, 1, 1, 2, 3, 3, 4, 5, 6, 7, 7, 7],
+    [1, 2, 2, 3, 4, 4, 5, 6, 6, 7, 7, 8],
+    [2, 3, 3, 3, 4, 5, 6, 7, 7, 8, 8, 8],
+    [3, 4, 4, 4, 5, 6, 7, 8, 8, 9, 9, 9],
+    [4, 4, 4, 5, 6, 7, 8, 8, 9, 9, 9, 9],
+    [6, 6, 6, 7, 8, 8, 9, 9, 9, 10, 10, 10],
+    [7, 7, 7, 8, 9, 9, 9, 10, 10, 11, 11, 11],
+    [8, 8, 8, 9, 10, 10, 10, 10, 10, 11, 11, 11],
+    [9, 9, 9, 10, 10, 10, 11, 11, 11, 12, 12, 12],
+    [10, 10, 10, 11, 11, 11, 11, 12, 12, 12, 12, 12],
+    [11, 11, 11, 11, 12, 12, 12, 12, 12, 12, 12, 12],
+    [12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12],
+], dtype=np.uint8)
+
+SIDES = ("left", "right")
+
+# Image y points down
+UP = np.array([0.0, -1.0, 0.0], dtype=np.float32)
+
+
+# ----------------------------------------------------------------------
+# VECTOR HELPERS — all broadcast over leading axes
+# ----------------------------------------------------------------------
+
+def _dot(a, b):
+    return np.sum(a * b, axis=-1)
+
+
+def _unit(v):
+    return v / np.maximum(np.linalg.norm(v, axis=-1, keepdims=True), 1e-9)
+
+
+def _angle(a, b):
+    """Angle between vectors in degrees"""
+    return np.degrees(np.arccos(np.clip(_dot(_unit(a), _unit(b)), -1.0, 1.0)))
+
+
+def _lean(v, axis):
+    """Signed angle of v towards a unit axis, in degrees"""
+    return np.degrees(np.arcsin(np.clip(_dot(_unit(v), axis), -1.0, 1.0)))
+
+
+def _band(values, edges):
+    """1 for values <= edges[0], 2 up to edges[1], ..."""
+    return 1 + np.digitize(values, edges, right=True)
+
 
 class ErgonomicAnalyzer:
     """
-    Analyzes posture using RULA (Rapid Upper Limb Assessment) 
+    Analyzes posture using RULA (Rapid Upper Limb Assessment)
     and REBA (Rapid Entire Body Assessment) scores.
+
+    Sub-scores follow the published worksheets and are combined through
+    the standard Table A/B/C lookups. Both arms are scored and the worse
+    side is reported, among the sides whose shoulder/elbow/wrist are
+    reliable. Angles are measured in 3D (MediaPipe z is on the same
+    scale as x) and paired midline points are visibility-weighted, so an
+    occluded shoulder or hip pulls the body axes less.
+
+    Sub-scores whose joints are unreliable (trunk, neck, legs, wrist) are
+    skipped rather than guessed: they take their neutral value and are
+    listed under "skipped". Without a reliable arm there is no score.
+
+    score() works on (people, 33, 4) arrays, so a batch costs the same
+    handful of NumPy operations as a single person.
     """
-    
+
+    # Joints below this visibility are unreliable, unless the caller
+    # passes its own reliability mask (see LandmarkFilter)
+    MIN_VISIBILITY = 0.5
+
+    # Worksheet adjustments the methods leave to the assessor
+    ABDUCTION_ANGLE = 30.0          # upper arm out to the side
+    SIDE_BEND_ANGLE = 10.0          # trunk / neck lateral lean
+    TWIST_ANGLE = 20.0              # shoulder line vs hip line, seen from above
+    WRIST_DEVIATION_ANGLE = 15.0    # radial / ulnar deviation
+    NECK_TWIST_RATIO = 0.3          # nose offset from ear midpoint / ear width
+    SHOULDER_RAISED_RATIO = 0.4     # ear height above shoulder / shoulder width
+    ARM_OUT_RATIO = 0.5             # wrist outside shoulder / shoulder width
+    LEG_BALANCE_RATIO = 0.15        # ankle height difference / leg length
+
     def __init__(self):
         # MediaPipe landmark indices
         self.NOSE = 0
+        self.LEFT_EAR = 7
+        self.RIGHT_EAR = 8
         self.LEFT_SHOULDER = 11
         self.RIGHT_SHOULDER = 12
         self.LEFT_ELBOW = 13
         self.RIGHT_ELBOW = 14
         self.LEFT_WRIST = 15
         self.RIGHT_WRIST = 16
+        self.LEFT_PINKY = 17
+        self.RIGHT_PINKY = 18
+        self.LEFT_INDEX = 19
+        self.RIGHT_INDEX = 20
         self.LEFT_HIP = 23
         self.RIGHT_HIP = 24
         self.LEFT_KNEE = 25
@@ -22,228 +168,281 @@ class ErgonomicAnalyzer:
         self.LEFT_ANKLE = 27
         self.RIGHT_ANKLE = 28
 
-    def analyze_posture(self, landmarks):
+        # (left, right) pairs, indexed [:, pair] -> (people, 2, ...)
+        self.EARS = [self.LEFT_EAR, self.RIGHT_EAR]
+        self.SHOULDERS = [self.LEFT_SHOULDER, self.RIGHT_SHOULDER]
+        self.ELBOWS = [self.LEFT_ELBOW, self.RIGHT_ELBOW]
+        self.WRISTS = [self.LEFT_WRIST, self.RIGHT_WRIST]
+        self.PINKIES = [self.LEFT_PINKY, self.RIGHT_PINKY]
+        self.INDEXES = [self.LEFT_INDEX, self.RIGHT_INDEX]
+        self.HIPS = [self.LEFT_HIP, self.RIGHT_HIP]
+        self.KNEES = [self.LEFT_KNEE, self.RIGHT_KNEE]
+        self.ANKLES = [self.LEFT_ANKLE, self.RIGHT_ANKLE]
+
+        # Outward direction per side, as a multiple of the left-pointing shoulder axis
+        self._outward_sign = np.array([1.0, -1.0], dtype=np.float32)[None, :, None]
+
+    def analyze_posture(self, landmarks, aspect: float = 1.0, modifiers: dict = None):
         """
         Main function to analyze posture and return RULA/REBA scores.
-        
+
         Args:
-            landmarks: List of dicts with keys 'x', 'y', 'z', 'visibility'
-        
+            landmarks: List of dicts with keys 'x', 'y', 'z', 'visibility',
+                and optionally 'reliable' (set by LandmarkFilter)
+            aspect: width / height of the image the landmarks were found
+                in, so normalized x and y are measured in the same units
+            modifiers: optional muscle_use / force (RULA) and load /
+                activity (REBA) adjustments, e.g. from TrackKinematics
+
         Returns:
-            dict with 'rula' and 'reba' scores
+            dict with 'rula' and 'reba' scores and the skipped sub-scores,
+            or None when no arm is reliable enough to score
         """
         if not landmarks or len(landmarks) < 33:
             return None
-        
+
         try:
-            rula_score = self._calculate_rula(landmarks)
-            reba_score = self._calculate_reba(landmarks)
-            
+            points = np.array(
+                [[lm['x'], lm['y'], lm['z'], lm['visibility']] for lm in landmarks[:33]],
+                dtype=np.float32
+            )
+            reliable = None
+            if "reliable" in landmarks[0]:
+                reliable = np.array([[lm["reliable"] for lm in landmarks[:33]]], dtype=bool)
+
+            scores = self.score(points[None], aspect, reliable, modifiers)
+            if not scores["valid"][0]:
+                return None
+            rula_score = int(scores["rula"][0])
+            reba_score = int(scores["reba"][0])
+
             return {
                 "rula": {
                     "score": rula_score,
-                    "risk": self._get_rula_risk(rula_score)
+                    "risk": self._get_rula_risk(rula_score),
+                    "side": SIDES[scores["rula_side"][0]]
                 },
                 "reba": {
                     "score": reba_score,
-                    "risk": self._get_reba_risk(reba_score)
-                }
+                    "risk": self._get_reba_risk(reba_score),
+                    "side": SIDES[scores["reba_side"][0]]
+                },
+                "skipped": [name for name, skipped in scores["skipped"].items() if skipped[0]],
+                "modifiers": modifiers
             }
         except Exception as e:
             print(f"Error in posture analysis: {e}")
             return None
 
-    def _calculate_rula(self, landmarks):
-        """
-        Simplified RULA score calculation (1-7 scale)
-        Focuses on upper body: arms, wrists, neck
+    def score(self, points, aspect: float = 1.0, reliable=None, modifiers: dict = None) -> dict:
         """
-        # Upper arm angle (shoulder to elbow)
-        upper_arm_score = self._score_upper_arm(landmarks)
-        
-        # Lower arm angle (elbow to wrist)
-        lower_arm_score = self._score_lower_arm(landmarks)
-        
-        # Wrist position
-        wrist_score = self._score_wrist(landmarks)
-        
-        # Neck position
-        neck_score = self._score_neck(landmarks)
-        
-        # Combine scores (simplified RULA table)
-        # In real RULA, you'd use lookup tables
-        posture_score = (upper_arm_score + lower_arm_score + wrist_score + neck_score) / 4
-        
-        # Map to 1-7 scale
-        rula_score = min(7, max(1, int(posture_score * 2)))
-        return rula_score
-
-    def _calculate_reba(self, landmarks):
-        """
-        Simplified REBA score calculation (1-15 scale)
-        Focuses on whole body: trunk, neck, legs
+        Score a batch of people.
+
+        Args:
+            points: (people, 33, 4) array of x, y, z, visibility
+            aspect: width / height of the source image
+            reliable: optional (people, 33) bool mask of trustworthy
+                joints; defaults to visibility >= MIN_VISIBILITY
+            modifiers: optional dict of muscle_use, force, load and
+                activity terms, each a scalar or a (people,) array
+
+        Returns:
+            dict of (people,) arrays: rula, reba, the side index
+            (0 = left, 1 = right) each score was taken from, valid (a
+            reliable arm was found) and skipped (sub-score name -> mask)
         """
-        # Trunk (torso) posture
-        trunk_score = self._score_trunk(landmarks)
-        
-        # Neck posture
-        neck_score = self._score_neck(landmarks)
-        
-        # Leg posture
-        leg_score = self._score_legs(landmarks)
-        
-        # Upper limb score
-        upper_limb_score = (self._score_upper_arm(landmarks) + self._score_lower_arm(landmarks)) / 2
-        
-        # Combine scores (simplified REBA table)
-        posture_score = (trunk_score * 1.5 + neck_score + leg_score + upper_limb_score) / 4
-        
-        # Map to 1-15 scale
-        reba_score = min(15, max(1, int(posture_score * 3)))
-        return reba_score
+        points = np.asarray(points, dtype=np.float32)
+        xyz = points[..., :3] * np.array([aspect, 1.0, aspect], dtype=np.float32)
+        vis = points[..., 3]
+        reliable = vis >= self.MIN_VISIBILITY if reliable is None else np.asarray(reliable, dtype=bool)
+
+        body = self._body_frame(xyz, vis, reliable)
+        trunk = self._score_trunk(body)
+        neck = self._score_neck(xyz, body, reliable)
+        legs = self._score_legs(xyz, reliable)
+        arms = self._score_arms(xyz, body, reliable)
+
+        # Muscle use / force / load / activity terms, 0 unless supplied
+        modifiers = modifiers or {}
+        muscle_use, force, load, activity = (
+            np.asarray(modifiers.get(name, 0), dtype=np.intp).reshape(-1)
+            for name in ("muscle_use", "force", "load", "activity")
+        )
+
+        # ---- RULA: Table A per side, Table B once, Table C per side ----
+        rula_a = RULA_TABLE_A[arms["upper_arm"] - 1, arms["rula_lower_arm"] - 1,
+                              arms["rula_wrist"] - 1, arms["wrist_twist"] - 1] + (muscle_use + force)[:, None]
+        rula_b = RULA_TABLE_B[neck["rula"] - 1, trunk["rula"] - 1, legs["rula"] - 1] + muscle_use + force
+        rula = RULA_TABLE_C[np.minimum(rula_a, 8) - 1, np.minimum(rula_b, 7)[:, None] - 1]
+
+        # ---- REBA: Table A once, Table B per side, Table C per side ----
+        reba_a = REBA_TABLE_A[trunk["reba"] - 1, neck["reba"] - 1, legs["reba"] - 1] + load
+        reba_b = REBA_TABLE_B[arms["upper_arm"] - 1, arms["reba_lower_arm"] - 1, arms["reba_wrist"] - 1]
+        reba = REBA_TABLE_C[np.minimum(reba_a, 12)[:, None] - 1, np.minimum(reba_b, 12) - 1]
+        reba = np.minimum(reba + activity[:, None], 15)
+
+        # Worse of the reliable sides
+        scored = arms["ok"]
+        rula = np.where(scored, rula, 0)
+        reba = np.where(scored, reba, 0)
+        rula_side = rula.argmax(axis=1)
+
+        return {
+            "rula": rula.max(axis=1),
+            "reba": reba.max(axis=1),
+            "rula_side": rula_side,
+            "reba_side": reba.argmax(axis=1),
+            "valid": scored.any(axis=1),
+            "skipped": {
+                "trunk": ~body["trunk_ok"],
+                "neck": ~neck["ok"],
+                "legs": ~legs["ok"],
+                "wrist": ~arms["hand_ok"][np.arange(len(points)), rula_side],
+            },
+        }
+
+    # ============ BODY FRAME ============
+
+    def _midpoint(self, xyz, vis, pair):
+        """Visibility-weighted midpoint of a left/right landmark pair"""
+        weights = np.clip(vis[:, pair], 0.05, 1.0)[..., None]
+        return (xyz[:, pair] * weights).sum(axis=1) / weights.sum(axis=1)
+
+    def _body_frame(self, xyz, vis, reliable):
+        shoulder_mid = self._midpoint(xyz, vis, self.SHOULDERS)
+        hip_mid = self._midpoint(xyz, vis, self.HIPS)
+        ear_mid = self._midpoint(xyz, vis, self.EARS)
+
+        # Without a reliable shoulder and hip the trunk is taken as upright,
+        # which leaves the arms measured from vertical
+        trunk_ok = reliable[:, self.SHOULDERS].any(axis=1) & reliable[:, self.HIPS].any(axis=1)
+        trunk = np.where(trunk_ok[:, None], shoulder_mid - hip_mid, UP)
+
+        # Facing direction: nose ahead of the ears, flattened to the ground
+        # plane; facing the camera (-z) when that is degenerate or unseen
+        facing = xyz[:, self.NOSE] - ear_mid
+        facing[:, 1] = 0.0
+        head_seen = reliable[:, self.NOSE] & reliable[:, self.EARS].any(axis=1)
+        degenerate = (np.linalg.norm(facing, axis=-1) < 1e-6) | ~head_seen
+        facing[degenerate] = (0.0, 0.0, -1.0)
+
+        shoulder_axis = xyz[:, self.LEFT_SHOULDER] - xyz[:, self.RIGHT_SHOULDER]
+        return {
+            "shoulder_mid": shoulder_mid,
+            "ear_mid": ear_mid,
+            "trunk": trunk,
+            "trunk_ok": trunk_ok,
+            "head_seen": head_seen,
+            "forward": _unit(facing),
+            "shoulder_axis": shoulder_axis,
+            "hip_axis": xyz[:, self.LEFT_HIP] - xyz[:, self.RIGHT_HIP],
+            "lateral": _unit(shoulder_axis),
+            "shoulder_width": np.linalg.norm(shoulder_axis, axis=-1),
+        }
 
     # ============ SCORING FUNCTIONS ============
-    
-    def _score_upper_arm(self, landmarks):
-        """Score upper arm position (1-4)"""
-        left_shoulder = landmarks[self.LEFT_SHOULDER]
-        left_elbow = landmarks[self.LEFT_ELBOW]
-        
-        # Calculate angle from vertical
-        angle = self._calculate_angle_vertical(left_shoulder, left_elbow)
-        
-        if angle < 20:
-            return 1
-        elif angle < 45:
-            return 2
-        elif angle < 90:
-            return 3
-        else:
-            return 4
-
-    def _score_lower_arm(self, landmarks):
-        """Score lower arm position (1-3)"""
-        left_elbow = landmarks[self.LEFT_ELBOW]
-        left_wrist = landmarks[self.LEFT_WRIST]
-        left_shoulder = landmarks[self.LEFT_SHOULDER]
-        
-        # Calculate elbow angle
-        angle = self._calculate_joint_angle(left_shoulder, left_elbow, left_wrist)
-        
-        if 60 <= angle <= 100:
-            return 1  # Good position
-        elif angle < 60 or angle > 120:
-            return 3  # Extreme position
-        else:
-            return 2  # Moderate
-
-    def _score_wrist(self, landmarks):
-        """Score wrist position (1-3)"""
-        wrist = landmarks[self.LEFT_WRIST]
-        elbow = landmarks[self.LEFT_ELBOW]
-        
-        # Check if wrist is bent (deviation from elbow-wrist line)
-        deviation = abs(wrist['y'] - elbow['y']) * 100
-        
-        if deviation < 5:
-            return 1  # Neutral
-        elif deviation < 15:
-            return 2  # Moderate bend
-        else:
-            return 3  # Extreme bend
-
-    def _score_neck(self, landmarks):
-        """Score neck position (1-4)"""
-        nose = landmarks[self.NOSE]
-        left_shoulder = landmarks[self.LEFT_SHOULDER]
-        right_shoulder = landmarks[self.RIGHT_SHOULDER]
-        
-        # Calculate neck forward lean
-        shoulder_mid_y = (left_shoulder['y'] + right_shoulder['y']) / 2
-        neck_forward = (nose['y'] - shoulder_mid_y) * 100
-        
-        if abs(neck_forward) < 10:
-            return 1  # Upright
-        elif abs(neck_forward) < 20:
-            return 2  # Slight bend
-        elif abs(neck_forward) < 40:
-            return 3  # Moderate bend
-        else:
-            return 4  # Extreme bend
-
-    def _score_trunk(self, landmarks):
-        """Score trunk/torso position (1-5)"""
-        left_shoulder = landmarks[self.LEFT_SHOULDER]
-        left_hip = landmarks[self.LEFT_HIP]
-        
-        # Calculate trunk lean from vertical
-        angle = self._calculate_angle_vertical(left_hip, left_shoulder)
-        
-        if angle < 5:
-            return 1  # Upright
-        elif angle < 20:
-            return 2  # Slight bend
-        elif angle < 60:
-            return 3  # Moderate bend
-        elif angle < 90:
-            return 4  # Severe bend
-        else:
-            return 5  # Extreme bend
-
-    def _score_legs(self, landmarks):
-        """Score leg position (1-4)"""
-        left_hip = landmarks[self.LEFT_HIP]
-        left_knee = landmarks[self.LEFT_KNEE]
-        left_ankle = landmarks[self.LEFT_ANKLE]
-        
-        # Calculate knee angle
-        angle = self._calculate_joint_angle(left_hip, left_knee, left_ankle)
-        
-        # Check if legs are bent (sitting/kneeling)
-        if angle > 150:
-            return 1  # Standing straight
-        elif angle > 90:
-            return 2  # Slightly bent
-        elif angle > 60:
-            return 3  # Sitting/kneeling
-        else:
-            return 4  # Extreme position
-
-    # ============ HELPER FUNCTIONS ============
-    
-    def _calculate_angle_vertical(self, point1, point2):
-        """Calculate angle from vertical (in degrees)"""
-        dx = point2['x'] - point1['x']
-        dy = point2['y'] - point1['y']
-        angle = abs(math.degrees(math.atan2(dx, dy)))
-        return angle
-
-    def _calculate_joint_angle(self, point1, point2, point3):
-        """Calculate angle at point2 formed by point1-point2-point3"""
-        # Vector from point2 to point1
-        v1x = point1['x'] - point2['x']
-        v1y = point1['y'] - point2['y']
-        
-        # Vector from point2 to point3
-        v2x = point3['x'] - point2['x']
-        v2y = point3['y'] - point2['y']
-        
-        # Calculate angle using dot product
-        dot = v1x * v2x + v1y * v2y
-        mag1 = math.sqrt(v1x**2 + v1y**2)
-        mag2 = math.sqrt(v2x**2 + v2y**2)
-        
-        if mag1 == 0 or mag2 == 0:
-            return 0
-        
-        cos_angle = dot / (mag1 * mag2)
-        cos_angle = max(-1, min(1, cos_angle))  # Clamp to [-1, 1]
-        angle = math.degrees(math.acos(cos_angle))
-        
-        return angle
+
+    def _score_trunk(self, body):
+        """RULA trunk (1-6) and REBA trunk (1-5); neutral when unreliable"""
+        trunk = body["trunk"]
+        angle = _angle(trunk, UP)
+        extended = (_dot(trunk, body["forward"]) < 0) & (angle > 5)
+
+        side_bend = np.abs(_lean(trunk, _unit(body["hip_axis"]))) > self.SIDE_BEND_ANGLE
+        shoulders_flat = body["shoulder_axis"] * (1.0, 0.0, 1.0)
+        hips_flat = body["hip_axis"] * (1.0, 0.0, 1.0)
+        twisted = _angle(shoulders_flat, hips_flat) > self.TWIST_ANGLE
+
+        flexion = _band(angle, [5, 20, 60])
+        rula = np.where(extended, 2, flexion) + twisted + side_bend
+        reba = np.where(extended, 2 + (angle > 20), flexion) + (twisted | side_bend)
+        ok = body["trunk_ok"]
+        return {"rula": np.where(ok, np.clip(rula, 1, 6), 1), "reba": np.where(ok, np.clip(reba, 1, 5), 1)}
+
+    def _score_neck(self, xyz, body, reliable):
+        """RULA neck (1-6) and REBA neck (1-3), relative to the trunk; neutral when unreliable"""
+        neck = body["ear_mid"] - body["shoulder_mid"]
+        angle = _angle(neck, body["trunk"])
+        extended = (_dot(_unit(neck) - _unit(body["trunk"]), body["forward"]) < 0) & (angle > 10)
+
+        side_bend = np.abs(_lean(neck, body["lateral"])) > self.SIDE_BEND_ANGLE
+        ear_width = np.linalg.norm(xyz[:, self.LEFT_EAR] - xyz[:, self.RIGHT_EAR], axis=-1)
+        nose_offset = np.abs(_dot(xyz[:, self.NOSE] - body["ear_mid"], body["lateral"]))
+        # Twist needs both ears to measure against
+        twisted = reliable[:, self.EARS].all(axis=1) & (nose_offset > self.NECK_TWIST_RATIO * ear_width)
+
+        rula = np.where(extended, 4, _band(angle, [10, 20])) + twisted + side_bend
+        reba = np.where(extended | (angle > 20), 2, 1) + (twisted | side_bend)
+        ok = body["head_seen"] & reliable[:, self.SHOULDERS].any(axis=1)
+        return {
+            "rula": np.where(ok, np.clip(rula, 1, 6), 1),
+            "reba": np.where(ok, np.clip(reba, 1, 3), 1),
+            "ok": ok,
+        }
+
+    def _score_legs(self, xyz, reliable):
+        """RULA legs (1-2) and REBA legs (1-4); supported if the legs are out of view"""
+        hips, knees, ankles = xyz[:, self.HIPS], xyz[:, self.KNEES], xyz[:, self.ANKLES]
+        seen = reliable[:, self.HIPS] & reliable[:, self.KNEES] & reliable[:, self.ANKLES]
+
+        knee_flexion = np.where(seen, _angle(knees - hips, ankles - knees), 0.0).max(axis=1)
+        leg_length = np.linalg.norm(ankles - hips, axis=-1).mean(axis=1)
+        ankle_drop = np.abs(ankles[:, 0, 1] - ankles[:, 1, 1])
+        unbalanced = seen.all(axis=1) & (ankle_drop > self.LEG_BALANCE_RATIO * leg_length)
+
+        rula = 1 + unbalanced
+        reba = 1 + unbalanced + np.digitize(knee_flexion, [30, 60], right=True)
+        return {"rula": rula.astype(np.intp), "reba": np.clip(reba, 1, 4), "ok": seen.any(axis=1)}
+
+    def _score_arms(self, xyz, body, reliable):
+        """Per-side (people, 2) upper arm, lower arm and wrist scores"""
+        shoulders, elbows, wrists = xyz[:, self.SHOULDERS], xyz[:, self.ELBOWS], xyz[:, self.WRISTS]
+        outward = body["lateral"][:, None] * self._outward_sign
+        shoulder_width = body["shoulder_width"][:, None]
+
+        # A side is scored only with its whole arm chain reliable; wrist
+        # bend additionally needs the hand
+        ok = reliable[:, self.SHOULDERS] & reliable[:, self.ELBOWS] & reliable[:, self.WRISTS]
+        hand_ok = reliable[:, self.INDEXES] & reliable[:, self.PINKIES]
+
+        # ---- Upper arm: angle from the trunk line, flexion or extension ----
+        upper = elbows - shoulders
+        angle = _angle(upper, -body["trunk"][:, None])
+        extended = (_dot(upper, body["forward"][:, None]) < 0) & (angle > 20)
+        abducted = _lean(upper, outward) > self.ABDUCTION_ANGLE
+        ear_height = _dot(xyz[:, self.EARS] - shoulders, _unit(body["trunk"])[:, None])
+        raised = reliable[:, self.EARS] & (ear_height < self.SHOULDER_RAISED_RATIO * shoulder_width)
+        upper_arm = np.clip(np.where(extended, 2, _band(angle, [20, 45, 90])) + raised + abducted, 1, 6)
+
+        # ---- Lower arm: elbow flexion, working across the body or out to the side ----
+        forearm = wrists - elbows
+        elbow_flexion = _angle(upper, forearm)
+        lower_arm = np.where((elbow_flexion >= 60) & (elbow_flexion <= 100), 1, 2)
+        across = _dot(wrists - body["shoulder_mid"][:, None], outward) < 0
+        out_to_side = _dot(wrists - shoulders, outward) > self.ARM_OUT_RATIO * shoulder_width
+
+        # ---- Wrist: bend from the forearm line, deviation across the palm ----
+        knuckles = (xyz[:, self.INDEXES] + xyz[:, self.PINKIES]) / 2
+        hand = knuckles - wrists
+        wrist_bend = _angle(forearm, hand)
+        palm_axis = _unit(xyz[:, self.INDEXES] - xyz[:, self.PINKIES])
+        deviation = np.abs(_dot(_unit(hand), palm_axis) - _dot(_unit(forearm), palm_axis))
+        deviated = np.degrees(np.arcsin(np.clip(deviation, 0.0, 1.0))) > self.WRIST_DEVIATION_ANGLE
+
+        return {
+            "ok": ok,
+            "hand_ok": hand_ok,
+            "upper_arm": upper_arm,
+            "rula_lower_arm": np.clip(lower_arm + (across | out_to_side), 1, 3),
+            "reba_lower_arm": lower_arm,
+            "rula_wrist": np.where(hand_ok, np.clip(_band(wrist_bend, [5, 15]) + deviated, 1, 4), 1),
+            "reba_wrist": np.where(hand_ok, np.clip(1 + (wrist_bend > 15) + deviated, 1, 3), 1),
+            # Forearm rotation isn't observable from pose landmarks: mid-range
+            "wrist_twist": np.ones_like(upper_arm),
+        }
 
     # ============ RISK LEVEL FUNCTIONS ============
-    
+
     def _get_rula_risk(self, score):
         """Get risk level for RULA score"""
         if score <= 2:
@@ -266,4 +465,4 @@ class ErgonomicAnalyzer:
         elif score <= 14:
             return "High"
         else:
-            return "Very High"
\ No newline at end of file
+            return "Very High"
@@ -0,0 +1,191 @@
+import cv2
+import numpy as np
+
+
+class KeyframeTracker:
+    """
+    Runs the detector only on keyframes and propagates boxes in between
+    with sparse Lucas-Kanade optical flow.
+
+    A small grid of points is sampled inside every box of the last frame,
+    flowed to the current frame in one calcOpticalFlowPyrLK call, and each
+    box is shifted by the median displacement of its surviving points.
+    Track IDs and classes are carried over untouched, so WorkerTrackingService
+    and the annotations see the same tracks as on the keyframe.
+
+    The keyframe interval K adapts to scene motion: fast motion shrinks it
+    towards min_interval, a still scene grows it to max_interval. A keyframe
+    is also forced when optical flow loses a box or the detector's person
+    confidence drops.
+    """
+
+    # Relative grid positions sampled inside each box (3 x 3 points)
+    GRID = np.array([0.25, 0.5, 0.75], dtype=np.float32)
+
+    def __init__(self, max_interval: int = 6, min_interval: int = 1,
+                 motion_low: float = 1.0, motion_high: float = 8.0,
+                 min_confidence: float = 0.35, min_flow_ratio: float = 0.5):
+        self.max_interval = max_interval
+        self.min_interval = min_interval
+
+        # Median box motion in px/frame: below motion_low -> max_interval,
+        # above motion_high -> min_interval, linear in between
+        self.motion_low = motion_low
+        self.motion_high = motion_high
+
+        # Mean person confidence on a keyframe below this forces the next keyframe
+        self.min_confidence = min_confidence
+
+        # Fraction of a box's points that must be tracked by optical flow
+        self.min_flow_ratio = min_flow_ratio
+
+        # stream_id -> {"gray", "detections", "since_keyframe", "interval"}
+        self._state: dict = {}
+
+        gx, gy = np.meshgrid(self.GRID, self.GRID)
+        self._grid_x = gx.ravel()[None, :]
+        self._grid_y = gy.ravel()[None, :]
+
+    # ------------------------------------------------------------------
+    # KEYFRAME SCHEDULING
+    # ------------------------------------------------------------------
+
+    def needs_keyframe(self, stream_id: str) -> bool:
+        state = self._state.get(stream_id)
+        if state is None:
+            return True
+        return state["since_keyframe"] >= state["interval"]
+
+    def set_keyframe(self, stream_id: str, frame, detections: list, person_class_id: int = 5):
+        """Store detector output for a keyframe and pick the next interval"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        previous = self._state.get(stream_id)
+
+        motion = 0.0
+        if previous is not None:
+            motion = self._keyframe_motion(previous, detections)
+
+        interval = self._interval_for_motion(motion)
+
+        person_confs = [det["conf"] for det in detections if det.get("class_id") == person_class_id]
+        if person_confs and sum(person_confs) / len(person_confs) < self.min_confidence:
+            # Detector is unsure — don't coast on these boxes
+            interval = self.min_interval
+
+        self._state[stream_id] = {
+            "gray": gray,
+            "detections": detections,
+            "since_keyframe": 0,
+            "interval": interval,
+        }
+
+    def get_interval(self, stream_id: str) -> int:
+        state = self._state.get(stream_id)
+        return state["interval"] if state else self.min_interval
+
+    # ------------------------------------------------------------------
+    # PROPAGATION — call on non-keyframes
+    # ------------------------------------------------------------------
+
+    def propagate(self, stream_id: str, frame):
+        """
+        Shift the last known boxes to the current frame.
+        Returns the propagated detections, or None if tracking confidence
+        dropped and the caller should run the detector instead.
+        """
+        state = self._state.get(stream_id)
+        if state is None:
+            return None
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        detections = state["detections"]
+
+        if not detections:
+            state["gray"] = gray
+            state["since_keyframe"] += 1
+            return []
+
+        boxes = np.array([det["bbox"] for det in detections], dtype=np.float32)
+        widths = (boxes[:, 2] - boxes[:, 0])[:, None]
+        heights = (boxes[:, 3] - boxes[:, 1])[:, None]
+
+        xs = boxes[:, 0:1] + widths * self._grid_x
+        ys = boxes[:, 1:2] + heights * self._grid_y
+        points = np.stack([xs.ravel(), ys.ravel()], axis=1).reshape(-1, 1, 2)
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+            state["gray"], gray, points, None, winSize=(15, 15), maxLevel=2
+        )
+        if next_points is None:
+            return None
+
+        n_boxes, n_points = len(detections), self._grid_x.shape[1]
+        status = status.reshape(n_boxes, n_points).astype(bool)
+        if (status.mean(axis=1) < self.min_flow_ratio).any():
+            return None
+
+        flow = (next_points - points).reshape(n_boxes, n_points, 2)
+        flow = np.where(status[..., None], flow, np.nan)
+        shift = np.nanmedian(flow, axis=1)
+
+        height, width = gray.shape[:2]
+        boxes[:, [0, 2]] += shift[:, 0:1]
+        boxes[:, [1, 3]] += shift[:, 1:2]
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width - 1)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height - 1)
+        boxes = boxes.round().astype(int).tolist()
+
+        propagated = []
+        for det, box, (dx, dy) in zip(detections, boxes, shift.tolist()):
+            moved = {**det, "bbox": box, "propagated": True}
+            if det.get("keypoints"):
+                # Pose keypoints (YOLO-pose detector) move with their box
+                moved["keypoints"] = [[x + dx, y + dy, conf] for x, y, conf in det["keypoints"]]
+            propagated.append(moved)
+
+        motion = float(np.median(np.linalg.norm(shift, axis=1)))
+        state["interval"] = min(state["interval"], self._interval_for_motion(motion))
+        state["gray"] = gray
+        state["detections"] = propagated
+        state["since_keyframe"] += 1
+        return propagated
+
+    def reset(self, stream_id: str = None):
+        if stream_id is None:
+            self._state.clear()
+        else:
+            self._state.pop(stream_id, None)
+
+    # ------------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------------
+
+    def _interval_for_motion(self, motion: float) -> int:
+        if motion <= self.motion_low:
+            return self.max_interval
+        if motion >= self.motion_high:
+            return self.min_interval
+        t = (motion - self.motion_low) / (self.motion_high - self.motion_low)
+        return int(round(self.max_interval - t * (self.max_interval - self.min_interval)))
+
+    def _keyframe_motion(self, previous: dict, detections: list) -> float:
+        """Median per-frame centre displacement of tracks seen on both keyframes"""
+        old_centres = {
+            det["track_id"]: det["bbox"] for det in previous["detections"]
+            if det.get("track_id") is not None
+        }
+        moves = []
+        for det in detections:
+            old = old_centres.get(det.get("track_id"))
+            if old is None:
+                continue
+            x1, y1, x2, y2 = det["bbox"]
+            dx = (x1 + x2 - old[0] - old[2]) / 2
+            dy = (y1 + y2 - old[1] - old[3]) / 2
+            moves.append((dx * dx + dy * dy) ** 0.5)
+
+        if not moves:
+            return 0.0
+        # previous["detections"] were already propagated up to the last frame,
+        # so this is the displacement over a single frame
+        return float(np.median(moves))
@@ -1,26 +1,357 @@
+import os
+import threading
+import time
 import mediapipe as mp
 import cv2
 
-class PoseDetector:
-    def __init__(self):
+NUM_LANDMARKS = 33
+
+# MediaPipe skeleton edges as (start, end) landmark indices
+POSE_CONNECTIONS = sorted(tuple(edge) for edge in mp.solutions.pose.POSE_CONNECTIONS)
+
+# COCO-17 keypoint order -> MediaPipe landmark index
+COCO_TO_MEDIAPIPE = [0, 2, 5, 7, 8, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+
+
+# ----------------------------------------------------------------------
+# BACKENDS
+# ----------------------------------------------------------------------
+
+class PoseBackend:
+    """
+    Pose estimator interface. detect() returns one list of 33 landmark
+    dicts (x, y normalized to the frame, z, visibility) per person found,
+    indexed like MediaPipe Pose. Joints a backend can't estimate come back
+    with visibility 0, so later stages treat them as unreliable.
+
+    - multi_person: finds every person in one call
+    - stateful: tracks across frames, so needs one instance per stream
+    - shares_detector: reads keypoints from the YOLO detection pass
+      (detections + frame_size) instead of running a model of its own
+    """
+
+    name = "base"
+    multi_person = False
+    stateful = False
+    shares_detector = False
+
+    def detect(self, frame, detections: list = None, frame_size: tuple = None) -> list:
+        raise NotImplementedError
+
+    def cleanup(self):
+        pass
+
+
+class PoseDetector(PoseBackend):
+    """
+    MediaPipe Pose (legacy solutions API), one person per frame.
+    model_complexity 0 = lite (fastest), 1 = full, 2 = heavy (most accurate).
+    """
+
+    stateful = True
+
+    def __init__(self, model_complexity: int = 1):
+        self.name = f"mediapipe-c{model_complexity}"
         self.mp_pose = mp.solutions.pose
         self.pose = self.mp_pose.Pose(
             static_image_mode=False,
-            model_complexity=1,
+            model_complexity=model_complexity,
             smooth_landmarks=True,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
-        self.mp_drawing = mp.solutions.drawing_utils
 
-    def detect(self, frame):
+    def detect(self, frame, detections: list = None, frame_size: tuple = None) -> list:
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = self.pose.process(rgb)
-        landmarks = []
-        if results.pose_landmarks:
-            for lm in results.pose_landmarks.landmark:
-                landmarks.append({"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility})
-        return results.pose_landmarks, landmarks
+        if not results.pose_landmarks:
+            return []
+        return [[
+            {"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility}
+            for lm in results.pose_landmarks.landmark
+        ]]
 
     def cleanup(self):
         self.pose.close()
+
+
+class PoseLandmarkerDetector(PoseBackend):
+    """
+    MediaPipe Tasks PoseLandmarker in video mode, up to num_poses people
+    per frame. Needs a .task model bundle (pose_landmarker_lite / _full /
+    _heavy, same accuracy/latency ladder as complexity 0/1/2).
+    """
+
+    name = "mediapipe-tasks"
+    multi_person = True
+    stateful = True
+
+    def __init__(self, model_path: str, num_poses: int = 4):
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+
+        self.name = f"mediapipe-tasks:{os.path.splitext(os.path.basename(model_path))[0]}"
+        self.landmarker = vision.PoseLandmarker.create_from_options(vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=num_poses,
+            min_pose_detection_confidence=0.5,
+            min_pose_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        ))
+        self._last_ms = -1
+
+    def detect(self, frame, detections: list = None, frame_size: tuple = None) -> list:
+        # Video mode needs strictly increasing timestamps per instance
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_ms + 1)
+        self._last_ms = timestamp_ms
+
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        result = self.landmarker.detect_for_video(image, timestamp_ms)
+        return [
+            [
+                {"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility or 0.0}
+                for lm in person
+            ]
+            for person in result.pose_landmarks
+        ]
+
+    def cleanup(self):
+        self.landmarker.close()
+
+
+class YOLOPoseDetector(PoseBackend):
+    """
+    Ultralytics YOLO-pose: COCO-17 keypoints for every person in one
+    forward pass, mapped onto MediaPipe indices. COCO has no hand, foot or
+    inner face points and no depth, so those joints have visibility 0 and
+    z is 0 (wrist sub-scores are skipped, angles are 2D).
+
+    With shared=True no model runs at all: the keypoints come from the
+    detector's own pass, which then has to be a pose model
+    (YOLODetector.is_pose). Such a model only knows people, so there are no
+    PPE boxes; tracking follows its person class (YOLODetector.person_class_id).
+    """
+
+    multi_person = True
+
+    def __init__(self, model_path: str = None, device: str = None, shared: bool = False, conf: float = 0.25):
+        self.shares_detector = shared
+        self.name = "yolo-pose-shared" if shared else f"yolo-pose:{os.path.basename(model_path)}"
+        self.model = None
+        if not shared:
+            from ultralytics import YOLO
+            self.model = YOLO(model_path)
+            self.device = device
+            self.conf = conf
+            self._lock = threading.Lock()  # ultralytics models are not thread-safe
+
+    def detect(self, frame, detections: list = None, frame_size: tuple = None) -> list:
+        if self.shares_detector:
+            if not detections or frame_size is None:
+                return []
+            width, height = frame_size
+            people = [det["keypoints"] for det in detections if det.get("keypoints")]
+        else:
+            height, width = frame.shape[:2]
+            with self._lock:
+                results = self.model.predict(frame, device=self.device, conf=self.conf, verbose=False)
+            keypoints = results[0].keypoints
+            people = keypoints.data.cpu().numpy().tolist() if keypoints is not None else []
+        return [self._to_mediapipe(keypoints, width, height) for keypoints in people]
+
+    @staticmethod
+    def _to_mediapipe(keypoints: list, width: int, height: int) -> list:
+        landmarks = [{"x": 0.0, "y": 0.0, "z": 0.0, "visibility": 0.0} for _ in range(NUM_LANDMARKS)]
+        for (x, y, conf), index in zip(keypoints, COCO_TO_MEDIAPIPE):
+            landmarks[index] = {"x": x / width, "y": y / height, "z": 0.0, "visibility": float(conf)}
+        return landmarks
+
+
+POSE_BACKENDS = ("mediapipe", "mediapipe-tasks", "yolo-pose")
+
+
+def pose_backend_factory(name: str, model_complexity: int = 1, landmarker_model: str = None,
+                         num_poses: int = 4, yolo_model: str = None, detector=None):
+    """
+    Zero-argument constructor for a backend, as PosePool expects.
+    For yolo-pose, passing the YOLODetector shares its pass when it runs
+    a pose model, and its device otherwise.
+    """
+    if name == "mediapipe":
+        return lambda: PoseDetector(model_complexity)
+    if name == "mediapipe-tasks":
+        return lambda: PoseLandmarkerDetector(landmarker_model, num_poses)
+    if name == "yolo-pose":
+        shared = detector is not None and detector.is_pose
+        device = detector.device if detector is not None else None
+        return lambda: YOLOPoseDetector(yolo_model, device=device, shared=shared)
+    raise ValueError(f"Unknown pose backend {name!r}, expected one of: {', '.join(POSE_BACKENDS)}")
+
+
+# ----------------------------------------------------------------------
+# POOL
+# ----------------------------------------------------------------------
+
+class PosePool:
+    """
+    Per-stream pose backend instances.
+
+    A Pose graph carries state from frame to frame (landmark smoothing and
+    the person ROI found in the previous frame) and must not be called
+    from two threads at once. One shared instance serializes the webcam
+    handler and every CCTV thread, and mixes their tracking state.
+
+    Each stream checks out its own instance and keeps it between frames
+    (sticky). At most max_instances exist, which caps pose concurrency at
+    the core count by default. When all are taken, a new stream takes over
+    the least recently used idle instance, or waits for one. Instances
+    unused for idle_timeout seconds are closed (one stays warm).
+
+    Stateless backends (YOLO-pose) are not pooled: one instance serves
+    every stream and handles its own locking.
+    """
+
+    def __init__(self, max_instances: int = 0, idle_timeout: float = 60.0,
+                 wait_timeout: float = 5.0, factory=PoseDetector):
+        # Fail at startup rather than on the first frame
+        first = factory()
+        self.backend = first.name
+        self.stateful = first.stateful
+
+        self.max_instances = (max_instances or os.cpu_count() or 1) if self.stateful else 1
+        self.idle_timeout = idle_timeout
+
+        # Seconds a frame waits for an instance before giving up
+        self.wait_timeout = wait_timeout
+
+        self._factory = factory
+        self._cond = threading.Condition()
+
+        # Each slot: {"detector", "stream_id", "busy", "last_used"}
+        self._slots: list = []
+        self._by_stream: dict = {}
+
+        self._slots.append({"detector": first, "stream_id": None, "busy": False, "last_used": time.monotonic()})
+        self._shared = None if self.stateful else first
+
+    # ------------------------------------------------------------------
+    # DETECTION
+    # ------------------------------------------------------------------
+
+    def detect(self, frame, stream_id: str = "default", detections: list = None, frame_size: tuple = None) -> list:
+        """Backend detect() on the stream's own instance; a list of people"""
+        if self._shared is not None:
+            return self._shared.detect(frame, detections, frame_size)
+        slot = self._acquire(stream_id)
+        try:
+            return slot["detector"].detect(frame, detections, frame_size)
+        finally:
+            self._release(slot)
+
+    def _acquire(self, stream_id: str) -> dict:
+        create = False
+        deadline = time.monotonic() + self.wait_timeout
+        with self._cond:
+            while True:
+                slot = self._by_stream.get(stream_id)
+                if slot is None:
+                    slot = self._claim(stream_id)
+                    create = slot is not None and slot["detector"] is None
+                if slot is not None and (create or not slot["busy"]):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No pose instance free for {stream_id} after {self.wait_timeout}s")
+                self._cond.wait(remaining)
+            slot["busy"] = True
+
+        if create:
+            # Graph construction is slow; done outside the lock
+            try:
+                slot["detector"] = self._factory()
+            except Exception:
+                with self._cond:
+                    self._drop(slot)
+                    self._cond.notify_all()
+                raise
+        return slot
+
+    def _claim(self, stream_id: str):
+        """Give the stream a slot: an unowned one, a new one, or the LRU idle one"""
+        idle = [slot for slot in self._slots if not slot["busy"] and slot["detector"] is not None]
+        unowned = [slot for slot in idle if slot["stream_id"] is None]
+        if unowned:
+            slot = unowned[0]
+        elif len(self._slots) < self.max_instances:
+            slot = {"detector": None, "stream_id": None, "busy": False, "last_used": time.monotonic()}
+            self._slots.append(slot)
+        elif idle:
+            slot = min(idle, key=lambda s: s["last_used"])
+            self._by_stream.pop(slot["stream_id"], None)
+        else:
+            return None
+
+        slot["stream_id"] = stream_id
+        self._by_stream[stream_id] = slot
+        return slot
+
+    def _release(self, slot: dict):
+        now = time.monotonic()
+        closing = []
+        with self._cond:
+            slot["busy"] = False
+            slot["last_used"] = now
+            # Close instances idle too long, keeping one warm
+            for other in list(self._slots):
+                # _drop() removes the slot, so len(self._slots) is already current
+                if len(self._slots) <= 1:
+                    break
+                if not other["busy"] and other["detector"] is not None and now - other["last_used"] > self.idle_timeout:
+                    self._drop(other)
+                    closing.append(other["detector"])
+            self._cond.notify_all()
+
+        for detector in closing:
+            detector.cleanup()
+
+    def _drop(self, slot: dict):
+        if slot in self._slots:
+            self._slots.remove(slot)
+        if self._by_stream.get(slot["stream_id"]) is slot:
+            del self._by_stream[slot["stream_id"]]
+
+    # ------------------------------------------------------------------
+    # STATE
+    # ------------------------------------------------------------------
+
+    @property
+    def loaded(self) -> bool:
+        return any(slot["detector"] is not None for slot in self._slots)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "backend": self.backend,
+                "instances": len(self._slots),
+                "max_instances": self.max_instances,
+                "busy": sum(1 for slot in self._slots if slot["busy"]),
+                "streams": len(self._by_stream),
+            }
+
+    def release_stream(self, stream_id: str):
+        """Unbind a stream; its instance stays open for the next stream"""
+        with self._cond:
+            slot = self._by_stream.pop(stream_id, None)
+            if slot is not None:
+                slot["stream_id"] = None
+            self._cond.notify_all()
+
+    def cleanup(self):
+        with self._cond:
+            detectors = [slot["detector"] for slot in self._slots if slot["detector"] is not None]
+            self._slots.clear()
+            self._by_stream.clear()
+            self._shared = None
+        for detector in detectors:
+            detector.cleanup()
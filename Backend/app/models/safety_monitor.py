@@ -2,20 +2,53 @@ import cv2
 import traceback
 import time
 from .yolo_detector import YOLODetector
-from .pose_detector import PoseDetector
+from .pose_detector import PosePool, POSE_CONNECTIONS, pose_backend_factory
 from .ergonomic_analyzer import ErgonomicAnalyzer
-from app.utils.drawing_utils import draw_detections
+from .keyframe_tracker import KeyframeTracker
+from app.utils.drawing_utils import draw_detections, draw_pose
 from app.utils.fps_counter import FPSCounter
+from app.utils.motion_gate import MotionGate
+from app.utils.landmark_filter import LandmarkFilter
+from app.utils.preprocessing import PreparedFrame
+from app.utils.video_decoder import VideoDecoder
+from app.core.config import settings
 from app.services.worker_tracking_service import worker_tracking_service
+from app.services.ppe_compliance_service import ppe_compliance_service
+from app.services.zone_service import zone_service
+from app.services.thumbnail_cache import thumbnail_cache
+from app.services.exposure_service import exposure_service
+from app.services.safety_event_writer import safety_event_writer
+from app.services.inference_scheduler import inference_scheduler, Priority, FrameDropped
+from app.db_models.safety_session import SafetyEventType, EventSeverity
 
 class SafetyMonitor:
     def __init__(self, yolo_model_path):
         print("🔧 Initializing SafetyMonitor components...")
         self.yolo = YOLODetector(yolo_model_path)
         print("✅ YOLO initialized")
+
+        # Tracking, PPE and keyframes follow the model's own "person" class
+        # (a COCO pose model labels people 0, the PPE model 5)
+        self.person_class_id = self.yolo.person_class_id
+        if self.person_class_id is None:
+            raise ValueError(f"YOLO model {yolo_model_path} has no 'person' class to track workers with")
+        worker_tracking_service.person_class_id = self.person_class_id
+        ppe_compliance_service.person_class_id = self.person_class_id
         
-        self.pose_detector = PoseDetector()
-        print("✅ PoseDetector initialized")
+        # Stateful backends get one instance per stream, created on demand up to the pool size
+        self.pose_detector = PosePool(
+            max_instances=settings.POSE_POOL_SIZE,
+            idle_timeout=settings.POSE_POOL_IDLE_TIMEOUT,
+            factory=pose_backend_factory(
+                settings.POSE_BACKEND,
+                model_complexity=settings.POSE_MODEL_COMPLEXITY,
+                landmarker_model=settings.POSE_LANDMARKER_MODEL,
+                num_poses=settings.POSE_MAX_PEOPLE,
+                yolo_model=settings.POSE_YOLO_MODEL,
+                detector=self.yolo
+            )
+        )
+        print(f"✅ PosePool initialized ({self.pose_detector.backend}, up to {self.pose_detector.max_instances} instances)")
         
         self.ergonomic = ErgonomicAnalyzer()
         print("✅ ErgonomicAnalyzer initialized")
@@ -23,30 +56,102 @@ class SafetyMonitor:
         self.fps_counter = FPSCounter()
         print("✅ FPSCounter initialized")
 
-    def process_frame(self, frame):
+        self.motion_gate = MotionGate(
+            threshold=settings.MOTION_THRESHOLD,
+            max_skip=settings.MOTION_MAX_SKIP
+        ) if settings.MOTION_GATE_ENABLED else None
+
+        self.keyframes = KeyframeTracker(
+            max_interval=settings.KEYFRAME_MAX_INTERVAL
+        ) if settings.KEYFRAME_DETECTION_ENABLED else None
+
+        self.landmark_filter = LandmarkFilter(
+            min_cutoff=settings.LANDMARK_MIN_CUTOFF,
+            beta=settings.LANDMARK_BETA,
+            min_visibility=settings.LANDMARK_MIN_VISIBILITY
+        ) if settings.LANDMARK_FILTER_ENABLED else None
+
+        # stream_id -> last fully processed result, reused for static frames
+        self._last_results: dict = {}
+
+        # streams currently above the ergonomic alert thresholds
+        self._ergonomic_alerting: set = set()
+
+    def process_frame(self, frame, stream_id: str = "default", camera_id: str = None):
         """Process frame and return two separate outputs:
         - object_frame: YOLO bounding boxes
         - pose_frame: Mediapipe skeleton overlay
+
+        stream_id keys per-stream state (motion reference, cached result),
+        camera_id keys per-camera config such as ROI masks.
         """
-        # Resize for performance
-        frame_resized = cv2.resize(frame, (640, 480))
+        camera_id = camera_id or stream_id
+
+        # One resize per consumer, straight from the source: display frame
+        # (annotations + returned boxes), letterboxed detector input, pose input
+        prepared = PreparedFrame(
+            frame,
+            detect_size=settings.DETECT_INPUT_SIZE,
+            pose_width=settings.POSE_INPUT_WIDTH,
+            display_width=settings.DISPLAY_MAX_WIDTH,
+            display_height=settings.DISPLAY_MAX_HEIGHT
+        )
+        frame_resized = prepared.display
+        display_h, display_w = prepared.display_size
+
+        # ---------------------
+        # 0. MOTION GATE
+        # ---------------------
+        if self.motion_gate:
+            moving = self.motion_gate.should_process(stream_id, frame_resized, camera_id)
+            if not moving and stream_id in self._last_results:
+                return self._reuse_result(stream_id)
         # t1 = time.time()
         # ---------------------
         # 1. YOLO OBJECT FRAME
         # ---------------------
-        detections = self.yolo.detect(frame_resized.copy())
+        detections = None
+        is_keyframe = True
+        if self.keyframes and not self.keyframes.needs_keyframe(stream_id):
+            # Between keyframes: shift last boxes with optical flow.
+            # None means flow lost a box, so fall through to the detector.
+            detections = self.keyframes.propagate(stream_id, frame_resized)
+            is_keyframe = detections is None
+
+        if detections is None:
+            detections = prepared.to_display(
+                self.yolo.detect(prepared.detect_input, imgsz=prepared.detect_size)
+            )
+            if self.motion_gate:
+                detections = self.motion_gate.filter_detections(detections, camera_id, display_h, display_w)
+            if self.keyframes:
+                self.keyframes.set_keyframe(stream_id, frame_resized, detections, self.person_class_id)
         # print(f"YOLO: {(time.time()-t1)*1000:.1f}ms")
 
         # ---------------------
         # 2. TRACKING UPDATE
         # ---------------------
-        tracking_result = worker_tracking_service.update_tracks(detections)
+        tracking_result = worker_tracking_service.update_tracks(detections, frame_resized)
+
+        # Raw crops for the assignment modal; encoded only when requested
+        thumbnail_cache.update(stream_id, frame_resized, tracking_result["active_tracks"])
+
+        # PPE boxes -> person tracks, with per-track compliance state
+        ppe_result = ppe_compliance_service.update(
+            detections,
+            self.yolo.model.names,
+            active_tracks=tracking_result["active_tracks"]
+        )
+
+        # Foot points -> camera zones (enter / exit / dwell / unauthorized)
+        zone_result = zone_service.update(camera_id, tracking_result["active_tracks"], display_h, display_w)
 
         object_frame = draw_detections(
             frame_resized.copy(),
             detections,
             self.yolo.model.names,
-            track_mappings=tracking_result["active_tracks"]
+            track_mappings=tracking_result["active_tracks"],
+            ppe_status=ppe_result["tracks"]
         )
         # t2 = time.time()
 
@@ -54,27 +159,23 @@ class SafetyMonitor:
         # 3. POSE FRAME
         # ---------------------
         try:
-            # Create a fresh copy for pose detection
-            pose_input = frame_resized.copy()
-            pose_landmarks, landmarks = self.pose_detector.detect(pose_input)
-            # print(f"MediaPipe: {(time.time()-t2)*1000:.1f}ms")
+            # Own lower resolution; landmarks are normalized so they draw at any size.
+            # Shared-pass backends read keypoints from the display-space detections.
+            people = self.pose_detector.detect(
+                prepared.pose_input, stream_id, detections=detections, frame_size=(display_w, display_h)
+            )
+            # print(f"Pose: {(time.time()-t2)*1000:.1f}ms")
             # Start with original frame copy
             pose_frame = frame_resized.copy()
-            
-            if pose_landmarks:
-                # Draw landmarks on pose_frame
-                self.pose_detector.mp_drawing.draw_landmarks(
-                    pose_frame,
-                    pose_landmarks,
-                    self.pose_detector.mp_pose.POSE_CONNECTIONS,
-                    self.pose_detector.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    self.pose_detector.mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
-                )
-                
+
+            if people:
+                for landmarks in people:
+                    draw_pose(pose_frame, landmarks, POSE_CONNECTIONS)
+
                 # Add text overlay to confirm pose detection
                 cv2.putText(
                     pose_frame, 
-                    "POSE DETECTED", 
+                    "POSE DETECTED" if len(people) == 1 else f"{len(people)} POSES DETECTED", 
                     (10, 30), 
                     cv2.FONT_HERSHEY_SIMPLEX, 
                     0.7, 
@@ -97,7 +198,7 @@ class SafetyMonitor:
             import traceback
             traceback.print_exc()
             pose_frame = frame_resized.copy()
-            landmarks = []
+            people = []
             cv2.putText(
                 pose_frame, 
                 f"POSE ERROR: {str(e)[:30]}", 
@@ -111,15 +212,44 @@ class SafetyMonitor:
         # ---------------------
         # 4. ERGONOMIC ANALYSIS
         # ---------------------
-        posture_results = None
+        postures = []
         # t3 = time.time()
-        if landmarks:
+        pose_h, pose_w = prepared.pose_input.shape[:2]
+        aspect = pose_w / pose_h
+        for index, landmarks in enumerate(people):
             try:
-                posture_results = self.ergonomic.analyze_posture(landmarks)
+                track_id = exposure_service.match_track(
+                    landmarks, tracking_result["active_tracks"], display_w, display_h
+                )
+
+                # Smoothed, with unreliable joints flagged so their sub-scores are skipped
+                if self.landmark_filter:
+                    person = track_id if track_id is not None else f"pose:{index}"
+                    landmarks = self.landmark_filter.filter(stream_id, landmarks, person=person)
+
+                # Repetition / lifting from this person's movement history,
+                # fed into the scores and the worker's shift exposure
+                observation = exposure_service.observe(stream_id, track_id, landmarks, aspect)
+                posture = self.ergonomic.analyze_posture(
+                    landmarks, aspect=aspect, modifiers=observation["modifiers"]
+                )
+                if track_id is not None:
+                    exposure_service.accumulate(
+                        tracking_result["active_tracks"][track_id]["worker"], observation, posture
+                    )
+                if posture:
+                    postures.append({"track_id": track_id, "posture": posture})
                 # print(f"Ergonomic Analysis: {(time.time()-t3)*1000:.1f}ms")
             except Exception as e:
                 print(f"⚠️ Error in ergonomic analysis: {e}")
 
+        # Headline posture is the highest-risk person's
+        posture_results = max(
+            (entry["posture"] for entry in postures),
+            key=lambda posture: (posture["reba"]["score"], posture["rula"]["score"]),
+            default=None
+        )
+
         # ---------------------
         # 5. FPS
         # ---------------------
@@ -127,33 +257,151 @@ class SafetyMonitor:
 
         # print(f"Total Frame Processing Time: {(time.time()-t1)*1000:.1f}ms | FPS: {fps:.1f}")
 
-        return {
+        # ---------------------
+        # 6. EVENT LOG (buffered, written by a background thread)
+        # ---------------------
+        self._record_events(stream_id, tracking_result, ppe_result, zone_result, posture_results)
+
+        result = {
             "object_frame": object_frame,
             "pose_frame": pose_frame,
             "detections": detections,
             "posture": posture_results,
+            "postures": postures,
             "fps": fps,
-            "tracking": tracking_result
+            "frame_size": [display_w, display_h],
+            "tracking": tracking_result,
+            "ppe": ppe_result,
+            "zones": zone_result,
+            "inference_skipped": False,
+            "keyframe": is_keyframe
         }
+        self._last_results[stream_id] = result
+        return result
 
-    def process_video_stream(self, video_path):
-        """Process video file frame by frame"""
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print(f"Error: Cannot open video {video_path}")
-            return
+    def _reuse_result(self, stream_id: str):
+        """Return the last processed result for a static frame.
+        Tracks are left untouched so static workers are not counted as lost,
+        and one-shot notifications are not re-sent."""
+        cached = self._last_results[stream_id]
+        return {
+            **cached,
+            "fps": self.fps_counter.update(),
+            "tracking": {**cached["tracking"], "lost_workers": [], "reidentified_workers": []},
+            "ppe": {**cached["ppe"], "events": []},
+            "zones": {**cached["zones"], "events": []},
+            "inference_skipped": True
+        }
+
+    def _record_events(self, stream_id, tracking_result, ppe_result, zone_result, posture_results):
+        for event in ppe_result["events"]:
+            worker = event.get("worker") or {}
+            safety_event_writer.record(
+                SafetyEventType.PPE_VIOLATION if event["type"] == "ppe_violation" else SafetyEventType.PPE_RESOLVED,
+                EventSeverity.HIGH if event["type"] == "ppe_violation" else EventSeverity.LOW,
+                worker_id=worker.get("worker_id"),
+                track_id=event["track_id"],
+                stream_id=stream_id,
+                details={"item": event["item"], "worker_name": worker.get("name")}
+            )
+
+        for lost in tracking_result["lost_workers"]:
+            worker = lost["worker"]
+            safety_event_writer.record(
+                SafetyEventType.LOST_WORKER,
+                EventSeverity.MEDIUM,
+                worker_id=worker.get("worker_id"),
+                track_id=lost["track_id"],
+                stream_id=stream_id,
+                details={"worker_name": worker.get("name")}
+            )
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
+        for event in zone_result["events"]:
+            if event["type"] not in ("zone_unauthorized", "zone_dwell"):
+                continue
+            worker = event.get("worker") or {}
+            unauthorized = event["type"] == "zone_unauthorized"
+            safety_event_writer.record(
+                SafetyEventType.ZONE_UNAUTHORIZED if unauthorized else SafetyEventType.ZONE_DWELL,
+                EventSeverity.HIGH if unauthorized else EventSeverity.MEDIUM,
+                worker_id=worker.get("worker_id"),
+                track_id=event["track_id"],
+                stream_id=stream_id,
+                details={
+                    "zone_id": event["zone_id"],
+                    "zone_name": event["zone_name"],
+                    "worker_name": worker.get("name"),
+                    "dwell_seconds": event.get("dwell_seconds"),
+                }
+            )
+
+        # Same thresholds as the frontend alert panel; logged once per episode
+        high_risk = bool(posture_results) and (
+            posture_results["rula"]["score"] >= 5 or posture_results["reba"]["score"] >= 8
+        )
+        if high_risk and stream_id not in self._ergonomic_alerting:
+            self._ergonomic_alerting.add(stream_id)
+            safety_event_writer.record(
+                SafetyEventType.ERGONOMIC_ALERT,
+                EventSeverity.HIGH if posture_results["reba"]["score"] >= 11 else EventSeverity.MEDIUM,
+                stream_id=stream_id,
+                details={"rula": posture_results["rula"], "reba": posture_results["reba"]}
+            )
+        elif not high_risk:
+            self._ergonomic_alerting.discard(stream_id)
 
-            result = self.process_frame(frame)
-            yield result["object_frame"], result
+    def release_stream(self, stream_id: str):
+        """Drop per-stream state when a client disconnects or a stream stops"""
+        self._last_results.pop(stream_id, None)
+        self._ergonomic_alerting.discard(stream_id)
+        thumbnail_cache.release_stream(stream_id)
+        exposure_service.release_stream(stream_id)
+        self.pose_detector.release_stream(stream_id)
+        if self.motion_gate:
+            self.motion_gate.reset(stream_id)
+        if self.keyframes:
+            self.keyframes.reset(stream_id)
+        if self.landmark_filter:
+            self.landmark_filter.release(stream_id)
 
-        cap.release()
+    def process_video_stream(self, video_path, every_nth: int = 1, keyframes_only: bool = False,
+                             start_frame: int = 0, end_frame: int = None, priority: Priority = Priority.BATCH):
+        """Process video file frame by frame (or every Nth / keyframes / a frame range).
+        Frames go through the inference scheduler; batch jobs only use capacity live streams leave."""
+        stream_id = f"file:{video_path}"
+        try:
+            decoder = VideoDecoder(
+                video_path,
+                every_nth=every_nth,
+                keyframes_only=keyframes_only,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                max_width=settings.DECODE_MAX_WIDTH,
+                threads=settings.DECODE_THREADS
+            )
+        except Exception as e:
+            print(f"Error: Cannot open video {video_path}: {e}")
+            return
+
+        # try/finally so a consumer that stops early still releases the file
+        try:
+            for _, frame in decoder:
+                try:
+                    result = inference_scheduler.run(priority, stream_id, self.process_frame, frame, stream_id=stream_id)
+                except FrameDropped:
+                    continue
+                yield result["object_frame"], result
+        finally:
+            decoder.close()
+            self.release_stream(stream_id)
 
     def cleanup(self):
         print("🧹 Cleaning up SafetyMonitor...")
         self.pose_detector.cleanup()
-        worker_tracking_service.reset()
\ No newline at end of file
+        if self.landmark_filter:
+            self.landmark_filter.reset()
+        worker_tracking_service.reset()
+        ppe_compliance_service.reset()
+        zone_service.reset()
+        thumbnail_cache.reset()
+        exposure_service.reset()
\ No newline at end of file
@@ -14,8 +14,24 @@ class YOLODetector:
         self.device = device
         print(f"Switched YOLO device to: {self.device}")
 
-    def detect(self, frame):
-        """Run YOLO tracking on a frame and return detections with track IDs"""
+    @property
+    def is_pose(self) -> bool:
+        """True for a YOLO-pose model: detections then carry COCO-17 keypoints"""
+        return getattr(self.model, "task", None) == "pose"
+
+    @property
+    def person_class_id(self):
+        """Class id labelled "person" in this model (5 in the PPE model, 0 in COCO), or None"""
+        names = self.model.names
+        for class_id, name in (names.items() if isinstance(names, dict) else enumerate(names)):
+            if str(name).lower() == "person":
+                return int(class_id)
+        return None
+
+    def detect(self, frame, imgsz: int = None):
+        """Run YOLO tracking on a frame and return detections with track IDs.
+        Pass imgsz for an already letterboxed square input so it isn't resized again."""
+        options = {"imgsz": imgsz} if imgsz else {}
         with self._lock:
             results = self.model.track(
                 frame,
@@ -23,10 +39,15 @@ class YOLODetector:
                 persist=True,
                 tracker="botsort.yaml",
                 verbose=False,
-                conf=0.1
+                conf=0.1,
+                **options
             )
+        # Pose models return keypoints alongside the boxes, [x, y, conf] per joint
+        keypoints = results[0].keypoints
+        keypoints = keypoints.data.cpu().numpy().tolist() if keypoints is not None else None
+
         detections = []
-        for det in results[0].boxes:
+        for i, det in enumerate(results[0].boxes):
             x1, y1, x2, y2 = det.xyxy[0].cpu().numpy()
             conf = float(det.conf[0])
             cls = int(det.cls[0])
@@ -38,4 +59,6 @@ class YOLODetector:
                 "class_id": cls,
                 "track_id": track_id
             })
+            if keypoints is not None:
+                detections[-1]["keypoints"] = keypoints[i]
         return detections
\ No newline at end of file
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from app.models import safety_monitor
+from app.services.zone_service import zone_service
+
+router = APIRouter(prefix="/cameras", tags=["Cameras"])
+
+
+# ------------------------------------------------------------------
+# SCHEMAS
+# ------------------------------------------------------------------
+
+class ROIRequest(BaseModel):
+    camera_id: str                          # "webcam", or the CCTV video path / camera_id
+    polygons: List[List[List[float]]] = []  # [[[x, y], ...], ...] normalized 0-1
+
+class ZoneDefinition(BaseModel):
+    zone_id: str                            # matches WorkerProfile.zone_assignment
+    name: Optional[str] = None
+    polygon: List[List[float]]              # [[x, y], ...] normalized 0-1
+    restricted: bool = False                # only workers assigned to this zone may enter
+    max_dwell: Optional[float] = None       # seconds before a dwell alert
+
+class ZonesRequest(BaseModel):
+    camera_id: str
+    zones: List[ZoneDefinition] = []
+
+
+# ------------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------------
+
+def _validate_polygon(polygon, label: str):
+    if len(polygon) < 3:
+        raise HTTPException(status_code=400, detail=f"Each {label} polygon needs at least 3 points")
+    for point in polygon:
+        if len(point) != 2 or not all(0.0 <= v <= 1.0 for v in point):
+            raise HTTPException(status_code=400, detail=f"{label} points must be [x, y] pairs normalized to 0-1")
+
+
+def _require_motion_gate():
+    if safety_monitor.motion_gate is None:
+        raise HTTPException(status_code=409, detail="Motion gate is disabled (MOTION_GATE_ENABLED=false)")
+    return safety_monitor.motion_gate
+
+
+# ------------------------------------------------------------------
+# ROUTES
+# ------------------------------------------------------------------
+
+@router.get("/roi")
+def get_roi(camera_id: str):
+    """Returns the ROI polygons configured for a camera (empty = whole frame)"""
+    gate = _require_motion_gate()
+    return {"camera_id": camera_id, "polygons": gate.get_roi(camera_id)}
+
+
+@router.put("/roi")
+def set_roi(payload: ROIRequest):
+    """
+    Sets the region of interest for a camera.
+    Motion outside the ROI is ignored and detections whose centre
+    falls outside it are dropped. Send an empty list to clear.
+    """
+    for polygon in payload.polygons:
+        _validate_polygon(polygon, "ROI")
+
+    gate = _require_motion_gate()
+    gate.set_roi(payload.camera_id, payload.polygons)
+    return {"status": "updated", "camera_id": payload.camera_id, "polygons": gate.get_roi(payload.camera_id)}
+
+
+@router.delete("/roi")
+def clear_roi(camera_id: str):
+    gate = _require_motion_gate()
+    gate.set_roi(camera_id, [])
+    return {"status": "cleared", "camera_id": camera_id}
+
+
+@router.get("/zones")
+def get_zones(camera_id: str):
+    """Returns the zones configured for a camera"""
+    return {"camera_id": camera_id, "zones": zone_service.get_zones(camera_id)}
+
+
+@router.put("/zones")
+def set_zones(payload: ZonesRequest):
+    """
+    Replaces the zones for a camera. Tracked workers are located by the
+    bottom-centre of their box; entering a restricted zone without a
+    matching zone_assignment raises a zone_unauthorized event.
+    Send an empty list to clear.
+    """
+    if len(payload.zones) > zone_service.MAX_ZONES:
+        raise HTTPException(status_code=400, detail=f"At most {zone_service.MAX_ZONES} zones per camera")
+    zone_ids = [zone.zone_id for zone in payload.zones]
+    if len(set(zone_ids)) != len(zone_ids):
+        raise HTTPException(status_code=400, detail="zone_id must be unique per camera")
+    for zone in payload.zones:
+        _validate_polygon(zone.polygon, "Zone")
+
+    zone_service.set_zones(payload.camera_id, [zone.model_dump() for zone in payload.zones])
+    return {"status": "updated", "camera_id": payload.camera_id, "zones": zone_service.get_zones(payload.camera_id)}
+
+
+@router.delete("/zones")
+def clear_zones(camera_id: str):
+    zone_service.set_zones(camera_id, [])
+    return {"status": "cleared", "camera_id": camera_id}
+
+
+@router.get("/zones/occupancy")
+def get_zone_occupancy(camera_id: Optional[str] = None):
+    """Tracks currently inside each zone, with how long they have been there"""
+    return {"occupancy": zone_service.get_occupancy(camera_id)}
\ No newline at end of file
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException
+from app.services.exposure_service import exposure_service
+from app.utils.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/ergonomics", tags=["Ergonomics"], default_response_class=FastJSONResponse)
+
+
+# ------------------------------------------------------------------
+# ROUTES
+# ------------------------------------------------------------------
+
+@router.get("/exposure")
+def get_exposure():
+    """
+    Cumulative ergonomic exposure of every assigned worker seen this
+    shift: seconds observed, in a flexed / severely flexed trunk, with
+    arms raised, static and at high risk, plus bend, lift and arm-cycle
+    counts and the peak RULA / REBA scores.
+    """
+    workers = exposure_service.get_exposure()
+    return {"shift": exposure_service.shift, "count": len(workers), "workers": workers}
+
+
+@router.get("/exposure/{worker_id}")
+def get_worker_exposure(worker_id: str):
+    exposure = exposure_service.get_exposure(worker_id)
+    if exposure is None:
+        raise HTTPException(status_code=404, detail=f"No exposure recorded for worker {worker_id} this shift")
+    return {"shift": exposure_service.shift, **exposure}
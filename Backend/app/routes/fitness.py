@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from uuid import UUID
+from app.database import get_async_db
+from app.services.fitness_ingest import bulk_upsert_fitness, get_fitness_series, FITNESS_METRICS
+from app.utils.db_utils import max_rows_per_statement
+from app.utils.security import get_current_admin_user
+from app.utils.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/fitness", tags=["Fitness"], default_response_class=FastJSONResponse)
+
+
+# ------------------------------------------------------------------
+# SCHEMAS
+# ------------------------------------------------------------------
+
+class FitnessRow(BaseModel):
+    user_id: UUID
+    date: date
+    steps: Optional[int] = None
+    distance_meters: Optional[float] = None
+    calories: Optional[int] = None
+    active_minutes: Optional[int] = None
+    heart_rate_avg: Optional[int] = None
+    heart_rate_max: Optional[int] = None
+    heart_rate_resting: Optional[int] = None
+    sleep_hours: Optional[float] = None
+
+class BulkIngestRequest(BaseModel):
+    rows: List[FitnessRow]
+    batch_size: int = 1000
+
+
+# ------------------------------------------------------------------
+# ROUTES
+# ------------------------------------------------------------------
+
+@router.post("/bulk")
+async def bulk_ingest(
+    payload: BulkIngestRequest,
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    """
+    Upserts many days of fitness data for many workers in batched
+    INSERT ... ON CONFLICT statements. Used by the nightly Google Fit sync.
+    """
+    # A full row binds id, user_id, date and every metric
+    max_batch = max_rows_per_statement(db, 3 + len(FITNESS_METRICS))
+    if not 1 <= payload.batch_size <= max_batch:
+        raise HTTPException(status_code=400, detail=f"batch_size must be between 1 and {max_batch}")
+
+    # exclude_unset: metrics missing from a row keep their stored value
+    rows = [row.model_dump(exclude_unset=True) for row in payload.rows]
+    return await bulk_upsert_fitness(db, rows, batch_size=payload.batch_size)
+
+
+@router.get("/series")
+async def fitness_series(
+    start: date,
+    end: date,
+    user_id: Optional[List[UUID]] = Query(None),
+    metric: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    """
+    Returns per-worker fitness series between start and end (inclusive),
+    as columnar arrays keyed by user_id. Filter with repeated
+    ?user_id=...&metric=steps&metric=sleep_hours.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    try:
+        series = await get_fitness_series(db, start, end, user_ids=user_id, metrics=metric)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"start": start.isoformat(), "end": end.isoformat(), "series": series}
@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 from app.models import safety_monitor
+from app.services.inference_scheduler import inference_scheduler
+from app.utils.jpeg_encoder import jpeg_encoder
 router = APIRouter()
 
 @router.get("/")
@@ -11,5 +13,8 @@ async def health():
     return {
         "status": "healthy",
         "yolo_model_loaded": safety_monitor.yolo is not None,
-        "mediapipe_loaded": safety_monitor.pose_detector.pose is not None
+        "mediapipe_loaded": safety_monitor.pose_detector.loaded,
+        "pose_pool": safety_monitor.pose_detector.stats(),
+        "inference_scheduler": inference_scheduler.stats(),
+        "jpeg_encoder": jpeg_encoder.stats()
     }
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.database import get_async_db
+from app.db_models.worker_readiness import ReadinessStatus
+from app.services.readiness_service import get_zone_readiness, refresh_readiness
+from app.utils.security import get_current_admin_user
+from app.utils.serialization import FastJSONResponse
+
+router = APIRouter(prefix="/readiness", tags=["Readiness"], default_response_class=FastJSONResponse)
+
+
+@router.get("")
+async def zone_readiness(
+    zone: Optional[str] = None,
+    readiness: Optional[ReadinessStatus] = None,
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    """
+    Pre-shift roster: readiness of every active worker in a zone
+    (all zones if omitted), from the precomputed snapshot table.
+    Filter with ?readiness=not_ready etc.
+    """
+    workers = await get_zone_readiness(db, zone, readiness)
+    summary = {}
+    for worker in workers:
+        summary[worker["readiness"]] = summary.get(worker["readiness"], 0) + 1
+    return {"zone": zone, "summary": summary, "workers": workers}
+
+
+@router.post("/refresh")
+async def rebuild_readiness(
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    """
+    Recomputes every worker's snapshot. Only needed for the initial
+    backfill or after writes that bypassed this backend.
+    """
+    refreshed = await db.run_sync(refresh_readiness)
+    await db.commit()
+    return {"status": "refreshed", "workers": refreshed}
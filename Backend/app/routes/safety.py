@@ -0,0 +1,175 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import datetime, timezone
+from uuid import UUID
+from app.database import get_async_db
+from app.db_models.safety_session import SafetySession, SafetyEvent, SessionStatus, SafetyEventType, EventSeverity
+from app.schemas.safety import (
+    SafetySessionResponse,
+    SafetyEventResponse,
+    SafetyEventCreate,
+    SessionStartRequest,
+    SessionStartResponse,
+    SessionStopResponse,
+    EventLogResponse
+)
+from app.services.safety_event_writer import safety_event_writer
+from app.utils.security import get_current_admin_user
+
+router = APIRouter(prefix="/safety", tags=["Safety"])
+
+
+# ------------------------------------------------------------------
+# SESSIONS
+# ------------------------------------------------------------------
+
+@router.post("/sessions/start", response_model=SessionStartResponse)
+async def start_session(
+    payload: SessionStartRequest,
+    db: AsyncSession = Depends(get_async_db),
+    admin=Depends(get_current_admin_user)
+):
+    """
+    Starts a monitoring session. Events recorded from now on are
+    attached to it until it is stopped.
+    """
+    session = SafetySession(
+        admin_id=admin.id,
+        source=payload.source,
+        camera_id=payload.camera_id,
+        status=SessionStatus.ACTIVE,
+        started_at=datetime.now(timezone.utc)
+    )
+    db.add(session)
+    await db.commit()
+
+    safety_event_writer.active_session_id = session.id
+    return SessionStartResponse(session_id=session.id, status=session.status.value, started_at=session.started_at)
+
+
+@router.post("/sessions/{session_id}/stop", response_model=SessionStopResponse)
+async def stop_session(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    session = await db.get(SafetySession, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if safety_event_writer.active_session_id == session_id:
+        safety_event_writer.active_session_id = None
+    # Make sure the event count below includes everything still buffered
+    await run_in_threadpool(safety_event_writer.flush)
+
+    if session.status == SessionStatus.ACTIVE:
+        session.status = SessionStatus.STOPPED
+        session.ended_at = datetime.now(timezone.utc)
+        await db.commit()
+
+    event_count = await db.scalar(
+        select(func.count()).select_from(SafetyEvent).where(SafetyEvent.session_id == session_id)
+    )
+    return SessionStopResponse(
+        session_id=session.id,
+        status=session.status.value,
+        started_at=session.started_at,
+        ended_at=session.ended_at,
+        duration_seconds=(session.ended_at - session.started_at).total_seconds(),
+        event_count=event_count or 0
+    )
+
+
+@router.get("/sessions")
+async def list_sessions(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    result = await db.execute(select(SafetySession).order_by(SafetySession.started_at.desc()).limit(limit))
+    return {
+        "active_session_id": safety_event_writer.stats()["active_session_id"],
+        "sessions": [SafetySessionResponse.model_validate(s) for s in result.scalars().all()]
+    }
+
+
+# ------------------------------------------------------------------
+# EVENTS
+# ------------------------------------------------------------------
+
+@router.post("/events", status_code=202)
+def create_event(payload: SafetyEventCreate, _admin=Depends(get_current_admin_user)):
+    """Queues an event (e.g. raised from the frontend). Written on the next flush."""
+    try:
+        event_type = SafetyEventType(payload.event_type)
+        severity = EventSeverity(payload.severity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    safety_event_writer.record(
+        event_type,
+        severity,
+        worker_id=payload.worker_id,
+        track_id=payload.track_id,
+        stream_id=payload.stream_id,
+        details=payload.details,
+        occurred_at=payload.occurred_at
+    )
+    return {"status": "queued"}
+
+
+@router.get("/events", response_model=EventLogResponse)
+async def get_event_log(
+    session_id: Optional[UUID] = None,
+    worker_id: Optional[UUID] = None,
+    event_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin_user)
+):
+    """
+    Event log filtered by session, worker and/or time range, newest first.
+    Each filter combination is served by the (session|worker, occurred_at) indexes.
+    """
+    filters = []
+    if session_id is not None:
+        filters.append(SafetyEvent.session_id == session_id)
+    if worker_id is not None:
+        filters.append(SafetyEvent.worker_id == worker_id)
+    if event_type is not None:
+        try:
+            filters.append(SafetyEvent.event_type == SafetyEventType(event_type))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if start is not None:
+        filters.append(SafetyEvent.occurred_at >= start)
+    if end is not None:
+        filters.append(SafetyEvent.occurred_at <= end)
+
+    total = await db.scalar(select(func.count()).select_from(SafetyEvent).where(*filters))
+    result = await db.execute(
+        select(SafetyEvent)
+        .where(*filters)
+        .order_by(SafetyEvent.occurred_at.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+    return EventLogResponse(
+        total=total or 0,
+        limit=limit,
+        offset=offset,
+        events=[SafetyEventResponse.model_validate(e) for e in result.scalars().all()]
+    )
+
+
+@router.get("/writer")
+def writer_stats(_admin=Depends(get_current_admin_user)):
+    """Buffer depth and write counters of the background event writer"""
+    return safety_event_writer.stats()
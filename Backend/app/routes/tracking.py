@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
-from app.database import get_db
-from app.db_models.user import User, UserRole
+from uuid import UUID
+from app.database import get_async_db
+from app.db_models.worker_profile import WorkerProfile
 from app.services.worker_tracking_service import worker_tracking_service
+from app.services.ppe_compliance_service import ppe_compliance_service
+from app.services.zone_service import zone_service
+from app.services.thumbnail_cache import thumbnail_cache
+from app.services.roster_cache import roster_cache
+from app.utils.serialization import FastJSONResponse
 
-router = APIRouter(prefix="/tracking", tags=["Tracking"])
+router = APIRouter(prefix="/tracking", tags=["Tracking"], default_response_class=FastJSONResponse)
 
 
 # ------------------------------------------------------------------
@@ -25,35 +32,87 @@ class UnassignRequest(BaseModel):
     track_id: int
 
 
+# ------------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------------
+
+def _thumbnail_url(track_id: int):
+    return f"/tracking/thumbnails/{track_id}" if thumbnail_cache.has(track_id) else None
+
+
 # ------------------------------------------------------------------
 # ROUTES
 # ------------------------------------------------------------------
 
 @router.get("/active")
-def get_active_tracks():
+def get_active_tracks(thumbnails: bool = False):
     """
     Returns all currently visible track_ids with their
     bounding boxes and assigned worker info (if any).
     Used by frontend modal to render clickable bounding boxes.
+    With ?thumbnails=true every track also gets a thumbnail_url
+    (None until a crop has been captured).
     """
+    mappings = worker_tracking_service.get_all_mappings()
+    assignable_tracks = worker_tracking_service.get_assignable_tracks()
+
+    if thumbnails:
+        for track_id, mapping in mappings.items():
+            mapping["thumbnail_url"] = _thumbnail_url(int(track_id))
+        for track in assignable_tracks:
+            track["thumbnail_url"] = _thumbnail_url(track["track_id"])
+
     return {
-        "mappings": worker_tracking_service.get_all_mappings(),
-        "assignable_tracks": worker_tracking_service.get_assignable_tracks(),
+        "mappings": mappings,
+        "assignable_tracks": assignable_tracks,
         "assigned_worker_ids": worker_tracking_service.get_assigned_worker_ids()
     }
 
 
+@router.get("/thumbnails/{track_id}")
+def get_track_thumbnail(track_id: int, request: Request, stream_id: Optional[str] = None):
+    """
+    Small JPEG crop of a track, refreshed about once a second.
+    Supports If-None-Match, so an unchanged crop costs a 304.
+    """
+    etag = thumbnail_cache.etag(track_id, stream_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail=f"No thumbnail for track_id {track_id}")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    jpeg, etag = thumbnail_cache.get_jpeg(track_id, stream_id)
+    if jpeg is None:
+        raise HTTPException(status_code=404, detail=f"No thumbnail for track_id {track_id}")
+    return Response(
+        content=jpeg,
+        media_type="image/jpeg",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+
+@router.get("/ppe")
+def get_ppe_violations():
+    """
+    Returns tracks currently in PPE violation, with the assigned
+    worker (if any) so the frontend doesn't need any box geometry.
+    """
+    mappings = worker_tracking_service.get_all_mappings()
+    violations = ppe_compliance_service.get_violations()
+    for violation in violations:
+        mapping = mappings.get(str(violation["track_id"]))
+        violation["worker"] = mapping["worker"] if mapping else None
+    return {"violations": violations}
+
+
 @router.get("/workers")
-def get_assignable_workers(db: Session = Depends(get_db)):
+async def get_assignable_workers(db: AsyncSession = Depends(get_async_db)):
     """
-    Returns list of all active workers from DB.
+    Returns list of all active workers (from the roster cache, DB on miss).
     Used to populate the dropdown in the assignment modal.
     Already assigned workers are flagged so frontend can grey them out.
     """
-    users = db.query(User).filter(
-        User.is_active == True,
-        User.role == UserRole.WORKER
-    ).all()
+    users = await roster_cache.get_workers(db)
 
     assigned_ids = worker_tracking_service.get_assigned_worker_ids()
 
@@ -74,12 +133,26 @@ def get_assignable_workers(db: Session = Depends(get_db)):
 
 
 @router.post("/assign")
-def assign_worker(payload: AssignWorkerRequest):
+async def assign_worker(payload: AssignWorkerRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Links a track_id to a worker.
     Called when admin clicks a bounding box and selects a worker.
+    The worker's zone_assignment is attached so zone checks need no DB.
+    Role markers ("not_worker_<track>", "supervisor_<track>") aren't users
+    and get no zone.
     Returns 400 if track_id is not currently visible in frame.
     """
+    try:
+        worker_uuid = UUID(payload.worker_id)
+    except ValueError:
+        worker_uuid = None
+
+    zone_assignment = None
+    if worker_uuid is not None:
+        zone_assignment = await db.scalar(
+            select(WorkerProfile.zone_assignment).where(WorkerProfile.user_id == worker_uuid)
+        )
+
     success = worker_tracking_service.assign_worker(
         track_id=payload.track_id,
         worker={
@@ -87,7 +160,8 @@ def assign_worker(payload: AssignWorkerRequest):
             "google_id": payload.google_id,
             "name": payload.name,
             "profile_picture": payload.profile_picture,
-            "role": payload.role
+            "role": payload.role,
+            "zone_assignment": zone_assignment
         }
     )
     if not success:
@@ -115,4 +189,7 @@ def reset_tracking():
     Same as sending reset_tracking over WebSocket but via HTTP.
     """
     worker_tracking_service.reset()
+    ppe_compliance_service.reset()
+    zone_service.reset()
+    thumbnail_cache.reset()
     return {"status": "reset"}
\ No newline at end of file
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, UploadFile, File
 from fastapi.responses import StreamingResponse
 from app.models import safety_monitor
-import os, cv2
+from app.utils.jpeg_encoder import jpeg_encoder, QUALITY_TIERS
+from app.utils.video_decoder import VideoDecoder
+from typing import Optional
+import os
 
 router = APIRouter()
 
@@ -14,14 +17,47 @@ async def upload_video(file: UploadFile = File(...)):
     return {"status": "success", "filename": file.filename}
 
 @router.get("/process/{filename}")
-async def process_video(filename: str):
+async def process_video(filename: str, every_nth: int = 1, keyframes_only: bool = False,
+                        start_frame: int = 0, end_frame: Optional[int] = None):
     path = os.path.join("app/uploads", filename)
     if not os.path.exists(path):
         return {"error": "file not found"}
 
     def stream():
-        for frame, _ in safety_monitor.process_video_stream(path):
-            _, buf = cv2.imencode(".jpg", frame)
-            yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + buf.tobytes() + b"\r\n")
+        high = QUALITY_TIERS["high"]
+        frames = safety_monitor.process_video_stream(
+            path,
+            every_nth=every_nth,
+            keyframes_only=keyframes_only,
+            start_frame=start_frame,
+            end_frame=end_frame
+        )
+        for frame, _ in frames:
+            jpeg = jpeg_encoder.encode(frame, quality=high["quality"], subsampling=high["subsampling"])
+            yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + bytes(jpeg) + b"\r\n")
 
     return StreamingResponse(stream(), media_type="multipart/x-mixed-replace; boundary=frame")
+
+
+@router.get("/process/{filename}/chunks")
+def get_video_chunks(filename: str, chunks: int = 4):
+    """
+    Splits a video into contiguous frame ranges, each usable as
+    start_frame / end_frame on /process for chunked processing.
+    """
+    path = os.path.join("app/uploads", filename)
+    if not os.path.exists(path):
+        return {"error": "file not found"}
+
+    with VideoDecoder(path) as decoder:
+        info = {"fps": decoder.fps, "frame_count": decoder.frame_count,
+                "width": decoder.width, "height": decoder.height, "backend": decoder.backend}
+    if not info["frame_count"]:
+        return {**info, "chunks": []}
+    return {
+        **info,
+        "chunks": [
+            {"start_frame": start, "end_frame": end}
+            for start, end in VideoDecoder.chunk_ranges(info["frame_count"], chunks)
+        ]
+    }
\ No newline at end of file
@@ -0,0 +1,104 @@
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.services.video_stream_service import video_stream_service
+
+router = APIRouter(prefix="/stream", tags=["Video Stream"])
+
+
+# ------------------------------------------------------------------
+# SCHEMAS
+# ------------------------------------------------------------------
+
+class StartStreamRequest(BaseModel):
+    filename: str    # an uploaded file, same as /process/{filename}
+
+
+# ------------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------------
+
+def _require_stream(stream_id: str):
+    stream = video_stream_service.get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found or already finished")
+    return stream
+
+
+async def _drain(stream, subscriber):
+    try:
+        while True:
+            item = await subscriber.queue.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        stream.unsubscribe(subscriber)
+
+
+# ------------------------------------------------------------------
+# ROUTES
+# ------------------------------------------------------------------
+
+@router.post("/start")
+def start_stream(payload: StartStreamRequest):
+    """
+    Starts processing an uploaded video into an H.264 fragmented-MP4 stream.
+    Annotated frames go to video_url; detections, tracks and PPE state for
+    each frame go to metadata_url as server-sent events with pts_ms, the
+    same millisecond timestamp as the video frame they belong to.
+    """
+    if not video_stream_service.available:
+        raise HTTPException(status_code=503, detail="PyAV is not installed; use /process for MJPEG instead")
+
+    path = os.path.join("app/uploads", payload.filename)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="file not found")
+
+    stream = video_stream_service.start(path)
+    return {
+        "stream_id": stream.stream_id,
+        "video_url": f"/stream/{stream.stream_id}/video.mp4",
+        "metadata_url": f"/stream/{stream.stream_id}/metadata",
+    }
+
+
+@router.get("")
+def list_streams():
+    return {"streams": video_stream_service.list()}
+
+
+@router.get("/{stream_id}/video.mp4")
+async def stream_video(stream_id: str):
+    """
+    Fragmented MP4: the init segment, then one fragment per keyframe.
+    Viewers joining late start at the next fragment.
+    """
+    stream = _require_stream(stream_id)
+    subscriber = stream.subscribe_video(asyncio.get_running_loop())
+    return StreamingResponse(
+        _drain(stream, subscriber),
+        media_type="video/mp4",
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+@router.get("/{stream_id}/metadata")
+async def stream_metadata(stream_id: str):
+    """Per-frame detection metadata as server-sent events, keyed by pts_ms"""
+    stream = _require_stream(stream_id)
+    subscriber = stream.subscribe_metadata(asyncio.get_running_loop())
+    return StreamingResponse(
+        _drain(stream, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+@router.post("/{stream_id}/stop")
+def stop_stream(stream_id: str):
+    if not video_stream_service.stop(stream_id):
+        raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found or already finished")
+    return {"status": "stopping", "stream_id": stream_id}
@@ -5,11 +5,20 @@ from app.services.websocket_manager import ConnectionManager
 from app.services.cctv_service import start_cctv, stop_cctv, cleanup_cctv
 from app.models import safety_monitor
 from app.services.worker_tracking_service import worker_tracking_service
+from app.services.ppe_compliance_service import ppe_compliance_service
+from app.services.zone_service import zone_service
+from app.services.thumbnail_cache import thumbnail_cache
+from app.services.inference_scheduler import inference_scheduler, Priority, FrameDropped
+from app.utils.jpeg_encoder import jpeg_encoder, QUALITY_TIERS
 
 router = APIRouter()
 manager = ConnectionManager()
 last_process_time = {}
 
+async def _frame_dropped(websocket: WebSocket, reason: str):
+    """Answer a webcam frame that produced no result, so the sender's backpressure count recovers"""
+    await manager.send_json({"type": "frame_dropped", "reason": reason}, websocket)
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
@@ -28,6 +37,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 try:
                     current_time = time.time()
                     if current_time - last_process_time[client_id] < 0.1:
+                        await _frame_dropped(websocket, "throttled")
                         continue
                     last_process_time[client_id] = current_time
 
@@ -38,27 +48,55 @@ async def websocket_endpoint(websocket: WebSocket):
                     nparr = np.frombuffer(frame_bytes, np.uint8)
                     frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
                     if frame is None:
+                        await _frame_dropped(websocket, "undecodable")
                         continue
 
-                    result = safety_monitor.process_frame(frame)
+                    # Highest priority; dropped rather than answered late
+                    stream_id = f"webcam:{client_id}"
+                    try:
+                        result = await asyncio.wrap_future(inference_scheduler.submit(
+                            Priority.LIVE, stream_id, safety_monitor.process_frame,
+                            frame,
+                            stream_id=stream_id,
+                            camera_id=message.get("camera_id", "webcam")
+                        ))
+                    except FrameDropped:
+                        # The client counts frames in flight, so every frame gets an answer
+                        await _frame_dropped(websocket, "deadline")
+                        continue
 
-                    _, buf1 = cv2.imencode(".jpg", result["object_frame"], [cv2.IMWRITE_JPEG_QUALITY, 60])
-                    _, buf2 = cv2.imencode(".jpg", result["pose_frame"], [cv2.IMWRITE_JPEG_QUALITY, 60])
+                    # Quality tier follows this client's bandwidth unless pinned
+                    tier = manager.get_quality_tier(websocket)
+                    (frame_object, frame_pose), encode_ms = jpeg_encoder.encode_data_urls(
+                        [result["object_frame"], result["pose_frame"]], tier
+                    )
 
                     tracking = result["tracking"]
 
-                    await manager.send_json({
+                    await manager.send_result({
                         "type": "result",
-                        "frame_object": f"data:image/jpeg;base64,{base64.b64encode(buf1).decode()}",
-                        "frame_pose": f"data:image/jpeg;base64,{base64.b64encode(buf2).decode()}",
+                        "frame_object": frame_object,
+                        "frame_pose": frame_pose,
+                        "quality_tier": tier,
+                        "frame_scale": QUALITY_TIERS[tier]["scale"],
+                        "frame_size": result["frame_size"],
+                        "encode_ms": encode_ms,
                         "detections": result["detections"],
                         "posture": result["posture"],
                         "fps": result["fps"],
                         "source": "webcam",
+                        "inference_skipped": result["inference_skipped"],
                         # --- tracking ---
                         "active_tracks": tracking["active_tracks"],
                         "new_untracked": tracking["new_untracked"],
                         "lost_workers": tracking["lost_workers"],
+                        "reidentified_workers": tracking["reidentified_workers"],
+                        # --- per-track PPE compliance ---
+                        "ppe_status": result["ppe"]["tracks"],
+                        "ppe_events": result["ppe"]["events"],
+                        # --- zone occupancy ---
+                        "zone_occupancy": result["zones"]["occupancy"],
+                        "zone_events": result["zones"]["events"],
                     }, websocket)
                     
                     # ── print end-to-end time ──
@@ -67,13 +105,15 @@ async def websocket_endpoint(websocket: WebSocket):
                 except Exception as e:
                     print(f"❌ Frame error: {e}")
                     traceback.print_exc()
+                    await _frame_dropped(websocket, "error")
                     await manager.send_json({"type": "error", "message": str(e)}, websocket)
 
             # 2. START CCTV
             elif msg_type == "start_cctv":
                 video_path = message.get("path", "app/uploads/test.mp4")
+                camera_id = message.get("camera_id", video_path)
                 loop = asyncio.get_event_loop()
-                started = start_cctv(client_id, video_path, websocket, manager, loop)
+                started = start_cctv(client_id, video_path, websocket, manager, loop, camera_id)
                 status = "started" if started else "already_running"
                 await manager.send_json({"type": "cctv_status", "status": status, "path": video_path}, websocket)
 
@@ -82,18 +122,55 @@ async def websocket_endpoint(websocket: WebSocket):
                 stop_cctv(client_id)
                 await manager.send_json({"type": "cctv_status", "status": "stopped"}, websocket)
 
-            # 4. PING
+            # 4. SUBSCRIBE — pick full or delta-encoded result messages
+            elif msg_type == "subscribe":
+                protocol = message.get("protocol", "full")
+                encoding = message.get("encoding")
+                quality = message.get("quality")
+                try:
+                    if encoding:
+                        manager.set_encoding(websocket, encoding)
+                    if quality:
+                        manager.set_quality(websocket, quality)
+                except ValueError as e:
+                    await manager.send_json({"type": "error", "message": str(e)}, websocket)
+                    continue
+                manager.set_protocol(websocket, protocol)
+                await manager.send_json({
+                    "type": "subscribed",
+                    "protocol": protocol,
+                    "encoding": manager.serializers[websocket].name,
+                    "quality": manager.quality_tiers[websocket]
+                }, websocket)
+
+            # 5. RESYNC — client saw a seq gap, next result is a full snapshot
+            elif msg_type == "resync":
+                manager.request_snapshot(websocket)
+
+            # 6. PING
             elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send_json({"type": "pong"}, websocket)
+
+            # 6b. BANDWIDTH — client-measured downlink, overrides the send-time estimate
+            elif msg_type == "bandwidth":
+                try:
+                    manager.report_bandwidth(websocket, float(message["kbps"]))
+                except (KeyError, TypeError, ValueError):
+                    await manager.send_json({"type": "error", "message": "bandwidth needs a numeric kbps"}, websocket)
 
-            # 5. RESET TRACKING — admin can reset all assignments manually
+            # 7. RESET TRACKING — admin can reset all assignments manually
             elif msg_type == "reset_tracking":
                 worker_tracking_service.reset()
-                await manager.send_json({"type": "tracking_reset", "status": "ok"}, websocket)
+                ppe_compliance_service.reset()
+                zone_service.reset()
+                thumbnail_cache.reset()
+                # Tracking state is shared, so every connected client is told
+                await manager.broadcast({"type": "tracking_reset", "status": "ok"})
 
     except WebSocketDisconnect:
         stop_cctv(client_id)
         cleanup_cctv(client_id)
+        safety_monitor.release_stream(f"webcam:{client_id}")
         last_process_time.pop(client_id, None)
         manager.disconnect(websocket)
         print("❌ WebSocket client disconnected")
@@ -102,5 +179,6 @@ async def websocket_endpoint(websocket: WebSocket):
         traceback.print_exc()
         stop_cctv(client_id)
         cleanup_cctv(client_id)
+        safety_monitor.release_stream(f"webcam:{client_id}")
         last_process_time.pop(client_id, None)
         manager.disconnect(websocket)
\ No newline at end of file
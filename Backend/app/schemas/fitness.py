@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+from uuid import UUID
+
+class FitnessDataBase(BaseModel):
+    date: date
+    steps: Optional[int] = 0
+    distance_meters: Optional[float] = 0.0
+    calories: Optional[int] = 0
+    active_minutes: Optional[int] = 0
+    heart_rate_avg: Optional[int] = None
+    heart_rate_max: Optional[int] = None
+    heart_rate_resting: Optional[int] = None
+    sleep_hours: Optional[float] = None
+
+class FitnessDataResponse(FitnessDataBase):
+    id: UUID
+    user_id: UUID
+    sync_timestamp: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,62 @@
+from pydantic import BaseModel
+from typing import Optional, List, Any
+from datetime import datetime
+from uuid import UUID
+
+class SafetySessionResponse(BaseModel):
+    id: UUID
+    admin_id: UUID
+    source: Optional[str]
+    camera_id: Optional[str]
+    status: str
+    started_at: datetime
+    ended_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+class SessionStartRequest(BaseModel):
+    source: Optional[str] = None
+    camera_id: Optional[str] = None
+
+class SessionStartResponse(BaseModel):
+    session_id: UUID
+    status: str
+    started_at: datetime
+
+class SessionStopResponse(BaseModel):
+    session_id: UUID
+    status: str
+    started_at: datetime
+    ended_at: datetime
+    duration_seconds: float
+    event_count: int
+
+class SafetyEventCreate(BaseModel):
+    event_type: str
+    severity: str = "medium"
+    worker_id: Optional[UUID] = None
+    track_id: Optional[int] = None
+    stream_id: Optional[str] = None
+    details: Optional[dict[str, Any]] = None
+    occurred_at: Optional[datetime] = None
+
+class SafetyEventResponse(BaseModel):
+    id: UUID
+    session_id: Optional[UUID]
+    worker_id: Optional[UUID]
+    event_type: str
+    severity: str
+    track_id: Optional[int]
+    stream_id: Optional[str]
+    details: Optional[dict[str, Any]]
+    occurred_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class EventLogResponse(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    events: List[SafetyEventResponse]
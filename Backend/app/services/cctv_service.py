@@ -2,56 +2,83 @@ import cv2, base64, numpy as np
 import asyncio, threading, time, traceback
 from app.models import safety_monitor
 from app.services.worker_tracking_service import worker_tracking_service
+from app.utils.jpeg_encoder import jpeg_encoder, QUALITY_TIERS
+from app.services.inference_scheduler import inference_scheduler, Priority, FrameDropped
+from app.utils.video_decoder import VideoDecoder
+from app.core.config import settings
 
 cctv_active = {}
 cctv_threads = {}
 
-def cctv_stream_thread(client_id: int, video_path: str, websocket, manager, loop):
-    cap = cv2.VideoCapture(video_path)
-
-    if not cap.isOpened():
-        print(f"❌ Failed to open video: {video_path}")
+def cctv_stream_thread(client_id: int, video_path: str, websocket, manager, loop, camera_id: str = None):
+    stream_id = f"cctv:{client_id}"
+    try:
+        # Threaded decode, downscaled by the decoder, looping like a live feed
+        decoder = VideoDecoder(
+            video_path,
+            max_width=settings.DECODE_MAX_WIDTH,
+            threads=settings.DECODE_THREADS,
+            loop=True
+        )
+    except Exception as e:
+        print(f"❌ Failed to open video: {video_path} ({e})")
         asyncio.run_coroutine_threadsafe(
             manager.send_json({"type": "error", "message": f"Failed to open video: {video_path}"}, websocket),
             loop
         )
         return
 
-    print(f"✅ CCTV stream started: {video_path}")
+    print(f"✅ CCTV stream started: {video_path} ({decoder.backend} decode)")
 
-    while cctv_active.get(client_id, False):
-        ret, frame = cap.read()
-        if not ret:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            continue
+    for _, frame in decoder:
+        if not cctv_active.get(client_id, False):
+            break
 
         time.sleep(0.1)
 
         try:
-            result = safety_monitor.process_frame(frame)
-
-            _, buf1 = cv2.imencode(".jpg", result["object_frame"], [cv2.IMWRITE_JPEG_QUALITY, 60])
-            frame_object_b64 = base64.b64encode(buf1).decode("utf-8")
-
-            _, buf2 = cv2.imencode(".jpg", result["pose_frame"], [cv2.IMWRITE_JPEG_QUALITY, 60])
-            frame_pose_b64 = base64.b64encode(buf2).decode("utf-8")
+            try:
+                result = inference_scheduler.run(
+                    Priority.NEAR_LIVE, stream_id, safety_monitor.process_frame,
+                    frame, stream_id=stream_id, camera_id=camera_id or video_path
+                )
+            except FrameDropped:
+                continue
+
+            # Quality tier follows this client's bandwidth unless pinned
+            tier = manager.get_quality_tier(websocket)
+            (frame_object, frame_pose), encode_ms = jpeg_encoder.encode_data_urls(
+                [result["object_frame"], result["pose_frame"]], tier
+            )
 
             tracking = result["tracking"]
 
             asyncio.run_coroutine_threadsafe(
-                manager.send_json(
+                manager.send_result(
                     {
                         "type": "result",
-                        "frame_object": f"data:image/jpeg;base64,{frame_object_b64}",
-                        "frame_pose": f"data:image/jpeg;base64,{frame_pose_b64}",
+                        "frame_object": frame_object,
+                        "frame_pose": frame_pose,
+                        "quality_tier": tier,
+                        "frame_scale": QUALITY_TIERS[tier]["scale"],
+                        "frame_size": result["frame_size"],
+                        "encode_ms": encode_ms,
                         "detections": result["detections"],
                         "posture": result["posture"],
                         "fps": result["fps"],
                         "source": "cctv",
+                        "inference_skipped": result["inference_skipped"],
                         # --- tracking ---
                         "active_tracks": tracking["active_tracks"],
                         "new_untracked": tracking["new_untracked"],
                         "lost_workers": tracking["lost_workers"],
+                        "reidentified_workers": tracking["reidentified_workers"],
+                        # --- per-track PPE compliance ---
+                        "ppe_status": result["ppe"]["tracks"],
+                        "ppe_events": result["ppe"]["events"],
+                        # --- zone occupancy ---
+                        "zone_occupancy": result["zones"]["occupancy"],
+                        "zone_events": result["zones"]["events"],
                     },
                     websocket,
                 ),
@@ -61,17 +88,18 @@ def cctv_stream_thread(client_id: int, video_path: str, websocket, manager, loop
             print(f"❌ CCTV frame error: {e}")
             traceback.print_exc()
 
-    cap.release()
+    decoder.close()
+    safety_monitor.release_stream(stream_id)
     print(f"🛑 CCTV stream stopped for client {client_id}")
 
 
-def start_cctv(client_id, video_path, websocket, manager, loop):
+def start_cctv(client_id, video_path, websocket, manager, loop, camera_id=None):
     if cctv_active.get(client_id, False):
         return False
     cctv_active[client_id] = True
     thread = threading.Thread(
         target=cctv_stream_thread,
-        args=(client_id, video_path, websocket, manager, loop),
+        args=(client_id, video_path, websocket, manager, loop, camera_id),
         daemon=True
     )
     cctv_threads[client_id] = thread
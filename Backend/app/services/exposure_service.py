@@ -0,0 +1,215 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.utils.kinematics import TrackKinematics
+
+
+class ExposureService:
+    """
+    Shift-long ergonomic exposure per worker.
+
+    Each tracked person on each stream gets a TrackKinematics (constant
+    memory: peak detectors and fixed ring buffers), which supplies the
+    repetition / load modifiers for RULA and REBA. For assigned workers the
+    service also accumulates counters for the current shift: time observed,
+    time in flexed / severely flexed trunk, time with arms raised, time at
+    high risk, and the number of bends, lifts and arm cycles.
+
+    Time is accumulated between consecutive samples, capped at max_gap, so
+    a worker out of view for a while is not charged for the gap. Counters
+    roll over at shift_start_hour local time.
+    """
+
+    # Same thresholds as the ergonomic alerts
+    HIGH_RULA = 5
+    HIGH_REBA = 8
+
+    def __init__(self, shift_start_hour: int = 0, max_gap: float = 1.0, ttl: float = 30.0):
+        self.shift_start_hour = shift_start_hour
+
+        # Longest interval between two samples that counts as continuous exposure
+        self.max_gap = max_gap
+
+        # Seconds before an unseen track's kinematics are dropped
+        self.ttl = ttl
+
+        # (stream_id, track_id) -> TrackKinematics. Streams run on several
+        # scheduler threads, so the dict is only touched under _lock; one
+        # stream's kinematics are never updated concurrently
+        self._tracks: dict = {}
+
+        # worker_id -> counters for the current shift
+        self._workers: dict = {}
+        self._shift = self._shift_id()
+
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    # ------------------------------------------------------------------
+    # TRACK MATCHING
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def match_track(landmarks: list, active_tracks: dict, width: int, height: int):
+        """
+        Track whose box contains the pose's torso centre (landmarks are
+        normalized over the whole frame); the smallest box wins when
+        several overlap. None when no track contains it.
+        """
+        torso = [
+            landmarks[i] for i in (11, 12, 23, 24)
+            if landmarks[i].get("reliable", landmarks[i]["visibility"] >= 0.5)
+        ]
+        if not torso or not active_tracks:
+            return None
+        cx = sum(lm["x"] for lm in torso) / len(torso) * width
+        cy = sum(lm["y"] for lm in torso) / len(torso) * height
+
+        best, best_area = None, None
+        for track_id, track in active_tracks.items():
+            bbox = track.get("bbox")
+            if not bbox:
+                continue
+            x1, y1, x2, y2 = bbox
+            if x1 <= cx <= x2 and y1 <= cy <= y2:
+                area = (x2 - x1) * (y2 - y1)
+                if best_area is None or area < best_area:
+                    best, best_area = track_id, area
+        return best
+
+    # ------------------------------------------------------------------
+    # UPDATE
+    # ------------------------------------------------------------------
+
+    def observe(self, stream_id: str, track_id, landmarks: list, aspect: float = 1.0, now: float = None) -> dict:
+        """
+        Feed one pose sample for a track (None = the stream's untracked
+        pose). Returns its signals, completed events and score modifiers.
+        """
+        now = time.monotonic() if now is None else now
+        key = (stream_id, track_id)
+        with self._lock:
+            kinematics = self._tracks.get(key)
+            if kinematics is None:
+                kinematics = self._tracks[key] = TrackKinematics()
+
+            self._calls += 1
+            if self._calls % 256 == 0:
+                self._expire(now)
+
+        result = kinematics.update(landmarks, aspect, now)
+        result["modifiers"] = kinematics.modifiers(now)
+        return result
+
+    def accumulate(self, worker: dict, observation: dict, posture: dict, now: float = None):
+        """Add one sample to an assigned worker's shift counters"""
+        if not worker or not worker.get("worker_id"):
+            return
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            shift = self._shift_id()
+            if shift != self._shift:
+                self._shift = shift
+                self._workers.clear()
+
+            worker_id = str(worker["worker_id"])
+            counters = self._workers.get(worker_id)
+            if counters is None:
+                counters = self._workers[worker_id] = self._new_counters(worker)
+            dt = min(now - counters["_last"], self.max_gap) if counters["_last"] is not None else 0.0
+            counters["_last"] = now
+            counters["last_seen"] = datetime.now().isoformat()
+
+            signals = observation["signals"]
+            trunk = signals["trunk_flexion"]
+            arms = [a for a in signals["arm_elevation"] if a == a]  # drop NaN
+            high_risk = bool(posture) and (
+                posture["rula"]["score"] >= self.HIGH_RULA or posture["reba"]["score"] >= self.HIGH_REBA
+            )
+
+            counters["observed_seconds"] += dt
+            if trunk == trunk:
+                counters["trunk_flexed_seconds"] += dt if trunk > 20 else 0.0
+                counters["trunk_severe_seconds"] += dt if trunk > 60 else 0.0
+            counters["arms_raised_seconds"] += dt if arms and max(arms) > 90 else 0.0
+            counters["high_risk_seconds"] += dt if high_risk else 0.0
+            counters["static_seconds"] += dt if observation["modifiers"]["static"] else 0.0
+
+            for event in observation["events"]:
+                counters[f"{event}s"] += 1
+            if posture:
+                counters["peak_rula"] = max(counters["peak_rula"], posture["rula"]["score"])
+                counters["peak_reba"] = max(counters["peak_reba"], posture["reba"]["score"])
+
+    # ------------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------------
+
+    def get_exposure(self, worker_id: str = None):
+        """Shift counters for one worker (None if unseen) or all workers"""
+        with self._lock:
+            if worker_id is not None:
+                counters = self._workers.get(str(worker_id))
+                return self._public(counters) if counters else None
+            return [self._public(counters) for counters in self._workers.values()]
+
+    @property
+    def shift(self) -> str:
+        return self._shift
+
+    # ------------------------------------------------------------------
+    # STATE
+    # ------------------------------------------------------------------
+
+    def _shift_id(self) -> str:
+        """Local date the current shift started on"""
+        return (datetime.now() - timedelta(hours=self.shift_start_hour)).date().isoformat()
+
+    @staticmethod
+    def _new_counters(worker: dict) -> dict:
+        return {
+            "worker_id": str(worker["worker_id"]),
+            "name": worker.get("name"),
+            "observed_seconds": 0.0,
+            "trunk_flexed_seconds": 0.0,
+            "trunk_severe_seconds": 0.0,
+            "arms_raised_seconds": 0.0,
+            "high_risk_seconds": 0.0,
+            "static_seconds": 0.0,
+            "bends": 0,
+            "lifts": 0,
+            "arm_cycles": 0,
+            "peak_rula": 0,
+            "peak_reba": 0,
+            "last_seen": None,
+            "_last": None,
+        }
+
+    @staticmethod
+    def _public(counters: dict) -> dict:
+        return {
+            key: round(value, 1) if isinstance(value, float) else value
+            for key, value in counters.items() if not key.startswith("_")
+        }
+
+    def _expire(self, now: float):
+        """Drop kinematics for tracks unseen for ttl; call with the lock held"""
+        for key in [key for key, k in self._tracks.items() if now - k.last_t > self.ttl]:
+            del self._tracks[key]
+
+    def release_stream(self, stream_id: str):
+        """Drop kinematics for a stream; shift counters are kept"""
+        with self._lock:
+            for key in [key for key in self._tracks if key[0] == stream_id]:
+                del self._tracks[key]
+
+    def reset(self):
+        with self._lock:
+            self._tracks.clear()
+            self._workers.clear()
+
+
+# Singleton instance — import this everywhere
+exposure_service = ExposureService(shift_start_hour=settings.EXPOSURE_SHIFT_START_HOUR)
@@ -0,0 +1,112 @@
+import time
+import uuid
+from datetime import date
+from typing import Optional
+from sqlalchemy import select, func
+from app.db_models.fitness_data import FitnessData
+from app.utils.db_utils import dialect_insert, chunked, max_rows_per_statement
+from app.services.readiness_service import refresh_readiness
+
+# Metric columns that an ingest may overwrite and a series query may return
+FITNESS_METRICS = (
+    "steps",
+    "distance_meters",
+    "calories",
+    "active_minutes",
+    "heart_rate_avg",
+    "heart_rate_max",
+    "heart_rate_resting",
+    "sleep_hours",
+)
+
+
+async def bulk_upsert_fitness(db, rows: list, batch_size: int = 1000) -> dict:
+    """
+    Upsert daily fitness rows with INSERT ... ON CONFLICT (user_id, date)
+    DO UPDATE, batch_size rows per statement (fewer if the driver's
+    bound-parameter limit requires it), in one transaction.
+
+    rows are dicts with user_id, date and any of FITNESS_METRICS.
+    Duplicate (user_id, date) pairs in the payload are collapsed (last wins),
+    since Postgres refuses to update the same row twice in one statement.
+    """
+    started = time.perf_counter()
+
+    deduped = {}
+    for row in rows:
+        deduped[(row["user_id"], row["date"])] = row
+    rows = list(deduped.values())
+
+    # Rows are grouped by which metrics they carry, so a metric missing
+    # from a row keeps its stored value instead of being nulled
+    groups = {}
+    for row in rows:
+        present = tuple(metric for metric in FITNESS_METRICS if metric in row)
+        groups.setdefault(present, []).append({
+            "id": uuid.uuid4(),  # only used when the row is new
+            "user_id": row["user_id"],
+            "date": row["date"],
+            **{metric: row[metric] for metric in present},
+        })
+
+    insert = dialect_insert(db)
+    table = FitnessData.__table__
+    batches = 0
+
+    for present, values in groups.items():
+        # id, user_id, date + one parameter per metric, for every row
+        size = min(batch_size, max_rows_per_statement(db, 3 + len(present)))
+        for batch in chunked(values, size):
+            stmt = insert(table).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.date],
+                set_={
+                    **{metric: stmt.excluded[metric] for metric in present},
+                    "sync_timestamp": func.now(),
+                },
+            )
+            await db.execute(stmt)
+            batches += 1
+
+    # Core upserts bypass the ORM hooks, so refresh readiness explicitly
+    await db.run_sync(refresh_readiness, {row["user_id"] for row in rows})
+    await db.commit()
+
+    return {
+        "rows": len(rows),
+        "batches": batches,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def get_fitness_series(db, start: date, end: date, user_ids: Optional[list] = None,
+                             metrics: Optional[list] = None) -> dict:
+    """
+    Per-worker time series for a date range, as columnar arrays:
+    {user_id: {"date": [...], "steps": [...], ...}}
+    One ordered range scan over the (user_id, date) unique index.
+    """
+    metrics = list(metrics or FITNESS_METRICS)
+    unknown = [metric for metric in metrics if metric not in FITNESS_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown fitness metrics: {', '.join(unknown)}")
+
+    columns = [FitnessData.user_id, FitnessData.date] + [getattr(FitnessData, metric) for metric in metrics]
+    stmt = select(*columns).where(FitnessData.date >= start, FitnessData.date <= end)
+    if user_ids:
+        stmt = stmt.where(FitnessData.user_id.in_(user_ids))
+    stmt = stmt.order_by(FitnessData.user_id, FitnessData.date)
+
+    result = await db.execute(stmt)
+
+    series = {}
+    current_id, current = None, None
+    for row in result.all():
+        if row[0] != current_id:
+            current_id = row[0]
+            current = series[str(current_id)] = {"date": [], **{metric: [] for metric in metrics}}
+        current["date"].append(row[1].isoformat())
+        for index, metric in enumerate(metrics, start=2):
+            current[metric].append(row[index])
+
+    return series
@@ -0,0 +1,271 @@
+import enum
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError
+from app.core.config import settings
+
+
+class Priority(str, enum.Enum):
+    LIVE = "live"            # webcam frames: stale ones are worthless
+    NEAR_LIVE = "near_live"  # CCTV / watched streams: a little lag is fine
+    BATCH = "batch"          # offline /process jobs: leftover capacity only
+
+
+# Dispatch order, most urgent first
+PRIORITY_ORDER = (Priority.LIVE, Priority.NEAR_LIVE, Priority.BATCH)
+
+
+class FrameDropped(Exception):
+    """A queued frame was dropped: past its deadline, or replaced by a newer one"""
+
+
+class InferenceScheduler:
+    """
+    Central queue in front of the safety monitor, shared by the webcam
+    handler, CCTV threads and offline video jobs.
+
+    Work is dispatched strictly by priority class. Within a class every
+    stream has its own queue and streams are served round-robin, so one
+    busy stream can't monopolise its class. A stream never has two jobs
+    running at once, since per-stream state (tracks, pose instance,
+    filters) is updated frame by frame.
+
+    - LIVE / NEAR_LIVE jobs carry a deadline; a job still queued past it is
+      dropped with FrameDropped instead of being run late, and only the
+      newest max_pending frames per stream are kept.
+    - BATCH jobs never expire, run only when no live work is waiting, and
+      at most batch_workers of them run at once so a worker is always left
+      free for live frames.
+    """
+
+    def __init__(self, workers: int = 2, batch_workers: int = 0,
+                 deadlines: dict = None, max_pending: dict = None):
+        self.workers = max(1, workers)
+
+        # 0 = all but one worker (at least one)
+        self.batch_workers = batch_workers or max(1, self.workers - 1)
+
+        # Seconds a job may wait in the queue; None = no deadline
+        self.deadlines = deadlines or {Priority.LIVE: 0.25, Priority.NEAR_LIVE: 1.0, Priority.BATCH: None}
+
+        # Queued jobs kept per stream; older ones are dropped first. None = unbounded
+        self.max_pending = max_pending or {Priority.LIVE: 1, Priority.NEAR_LIVE: 2, Priority.BATCH: None}
+
+        # priority -> stream_id -> deque of jobs; stream order is the round-robin order
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_ORDER}
+        self._running_streams = set()
+        self._running_batch = 0
+
+        self._cond = threading.Condition()
+        self._stop = False
+        self._threads = []
+
+        self._stats = {
+            priority: {"submitted": 0, "completed": 0, "failed": 0, "dropped": 0, "wait_ms": 0.0}
+            for priority in PRIORITY_ORDER
+        }
+
+    # ------------------------------------------------------------------
+    # SUBMISSION
+    # ------------------------------------------------------------------
+
+    def submit(self, priority: Priority, stream_id: str, fn, /, *args, deadline: float = None, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) for a stream. Returns a Future; await it
+        from async code with asyncio.wrap_future. deadline overrides the
+        class default (seconds from now).
+        """
+        self.start()
+        priority = Priority(priority)
+        now = time.monotonic()
+        timeout = deadline if deadline is not None else self.deadlines.get(priority)
+        job = {
+            "future": Future(),
+            "fn": fn,
+            "args": args,
+            "kwargs": kwargs,
+            "stream_id": stream_id,
+            "priority": priority,
+            "queued_at": now,
+            "deadline": now + timeout if timeout is not None else None,
+        }
+
+        dropped = []
+        with self._cond:
+            stats = self._stats[priority]
+            stats["submitted"] += 1
+            queue = self._queues[priority].setdefault(stream_id, deque())
+            queue.append(job)
+            limit = self.max_pending.get(priority)
+            while limit is not None and len(queue) > limit:
+                dropped.append(queue.popleft())
+                stats["dropped"] += 1
+            self._cond.notify()
+
+        for old in dropped:
+            self._drop(old, "replaced by a newer frame")
+        return job["future"]
+
+    def run(self, priority: Priority, stream_id: str, fn, /, *args, **kwargs):
+        """submit() and block until the result; for code already on a thread"""
+        return self.submit(priority, stream_id, fn, *args, **kwargs).result()
+
+    # ------------------------------------------------------------------
+    # DISPATCH
+    # ------------------------------------------------------------------
+
+    def _next_job(self, now: float, expired: list):
+        """Highest-priority runnable job, round-robin across streams; call with the lock held"""
+        for priority in PRIORITY_ORDER:
+            if priority is Priority.BATCH:
+                live_waiting = any(
+                    stream_id not in self._running_streams
+                    for p in PRIORITY_ORDER[:-1] for stream_id in self._queues[p]
+                )
+                if live_waiting or self._running_batch >= self.batch_workers:
+                    return None
+
+            streams = self._queues[priority]
+            for stream_id in list(streams):
+                if stream_id in self._running_streams:
+                    continue
+                queue = streams[stream_id]
+                job = None
+                while queue:
+                    candidate = queue.popleft()
+                    if candidate["deadline"] is not None and now > candidate["deadline"]:
+                        expired.append(candidate)
+                        continue
+                    job = candidate
+                    break
+                # Served (or emptied) streams go to the back of the line
+                if queue:
+                    streams.move_to_end(stream_id)
+                else:
+                    del streams[stream_id]
+                if job is not None:
+                    return job
+        return None
+
+    def _worker(self):
+        while True:
+            expired = []
+            with self._cond:
+                while True:
+                    if self._stop:
+                        return
+                    job = self._next_job(time.monotonic(), expired)
+                    if job is not None or expired:
+                        break
+                    self._cond.wait()
+
+                for old in expired:
+                    self._stats[old["priority"]]["dropped"] += 1
+                if job is not None:
+                    self._running_streams.add(job["stream_id"])
+                    if job["priority"] is Priority.BATCH:
+                        self._running_batch += 1
+
+            for old in expired:
+                self._drop(old, "missed its deadline")
+            if job is not None:
+                self._execute(job)
+
+    @staticmethod
+    def _drop(job: dict, reason: str):
+        try:
+            job["future"].set_exception(FrameDropped(f"{job['stream_id']}: {reason}"))
+        except InvalidStateError:
+            pass  # the caller already cancelled it
+
+    def _execute(self, job: dict):
+        future = job["future"]
+        started = time.monotonic()
+        outcome = "dropped"  # cancelled by the caller before it ran
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(job["fn"](*job["args"], **job["kwargs"]))
+                    outcome = "completed"
+                except Exception as e:
+                    outcome = "failed"
+                    future.set_exception(e)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self._cond:
+                self._running_streams.discard(job["stream_id"])
+                if job["priority"] is Priority.BATCH:
+                    self._running_batch -= 1
+                stats = self._stats[job["priority"]]
+                stats[outcome] += 1
+                if outcome != "dropped":
+                    stats["wait_ms"] += (started - job["queued_at"]) * 1000
+                # The stream (and maybe a batch slot) is free again
+                self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._threads and not self._stop:
+                return
+            self._stop = False
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the workers; anything still queued fails with FrameDropped"""
+        with self._cond:
+            self._stop = True
+            pending = [job for streams in self._queues.values() for queue in streams.values() for job in queue]
+            for streams in self._queues.values():
+                streams.clear()
+            self._cond.notify_all()
+        for job in pending:
+            self._drop(job, "scheduler stopped")
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self) -> dict:
+        with self._cond:
+            classes = {}
+            for priority in PRIORITY_ORDER:
+                stats = self._stats[priority]
+                finished = stats["completed"] + stats["failed"]
+                classes[priority.value] = {
+                    "queued": sum(len(queue) for queue in self._queues[priority].values()),
+                    "streams": len(self._queues[priority]),
+                    "submitted": stats["submitted"],
+                    "completed": stats["completed"],
+                    "failed": stats["failed"],
+                    "dropped": stats["dropped"],
+                    "avg_wait_ms": round(stats["wait_ms"] / finished, 1) if finished else 0.0,
+                }
+            return {
+                "workers": self.workers,
+                "batch_workers": self.batch_workers,
+                "running": len(self._running_streams),
+                "classes": classes,
+            }
+
+
+# Singleton instance — import this everywhere
+inference_scheduler = InferenceScheduler(
+    workers=settings.INFERENCE_WORKERS,
+    batch_workers=settings.INFERENCE_BATCH_WORKERS,
+    deadlines={
+        Priority.LIVE: settings.INFERENCE_LIVE_DEADLINE,
+        Priority.NEAR_LIVE: settings.INFERENCE_NEAR_LIVE_DEADLINE,
+        Priority.BATCH: None,
+    }
+)
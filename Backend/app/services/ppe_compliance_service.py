@@ -0,0 +1,210 @@
+import numpy as np
+from datetime import datetime
+
+
+class PPEComplianceService:
+    """
+    Links PPE detections to the person track they belong to and keeps a
+    per-track compliance state with hysteresis.
+
+    Association is one NumPy pass per frame: an (persons x ppe) intersection
+    matrix is built by broadcasting, each PPE box goes to the person that
+    contains most of it, and the result is reduced to one observation per
+    (track, item): "worn", "missing" or nothing.
+
+    The state machine only flips a track to "violation" after enter_frames
+    consecutive "missing" observations, and back to "compliant" after
+    exit_frames consecutive "worn" ones, so a single missed hardhat box
+    does not raise an alert.
+    """
+
+    # PPE item -> (positive class name, negative class name)
+    ITEMS = {
+        "hardhat": ("hardhat", "no-hardhat"),
+        "mask": ("mask", "no-mask"),
+        "vest": ("safety vest", "no-safety vest"),
+    }
+
+    def __init__(self, person_class_id: int = 5, min_containment: float = 0.6,
+                 enter_frames: int = 3, exit_frames: int = 5, forget_after: int = 60):
+        self.person_class_id = person_class_id
+
+        # Fraction of a PPE box that must lie inside a person box
+        self.min_containment = min_containment
+
+        self.enter_frames = enter_frames
+        self.exit_frames = exit_frames
+
+        # Drop per-track state after this many updates without the track
+        self.forget_after = forget_after
+
+        # track_id -> {item -> {"state", "streak", "evidence", "since"}, "_missing": int}
+        self.track_states: dict = {}
+
+        # Cached class_id -> (item index, is_violation) lookup, rebuilt when names change
+        self._class_names = None
+        self._item_lookup = None
+        self._item_names = list(self.ITEMS.keys())
+
+    # ------------------------------------------------------------------
+    # ASSOCIATION
+    # ------------------------------------------------------------------
+
+    def _build_lookup(self, class_names):
+        # ultralytics model.names is a dict, but plain lists work too
+        named = list(class_names.items() if isinstance(class_names, dict) else enumerate(class_names))
+        lookup = np.full((max(class_id for class_id, _ in named) + 1, 2), -1, dtype=np.int32)
+
+        for class_id, name in named:
+            name = name.lower()
+            for item_index, (positive, negative) in enumerate(self.ITEMS.values()):
+                if name == positive:
+                    lookup[class_id] = (item_index, 0)
+                elif name == negative:
+                    lookup[class_id] = (item_index, 1)
+
+        self._class_names = class_names
+        self._item_lookup = lookup
+
+    def associate(self, detections: list, class_names) -> dict:
+        """
+        Match PPE boxes to person boxes.
+        Returns track_id -> array of per-item observations
+        (1 = worn, -1 = missing, 0 = no evidence this frame).
+        """
+        if self._item_lookup is None or class_names is not self._class_names:
+            self._build_lookup(class_names)
+
+        persons = [det for det in detections
+                   if det.get("class_id") == self.person_class_id and det.get("track_id") is not None]
+        if not persons:
+            return {}
+
+        n_items = len(self.ITEMS)
+        observations = np.zeros((len(persons), n_items), dtype=np.int8)
+
+        class_ids = np.array([det["class_id"] for det in detections], dtype=np.int32)
+        in_range = class_ids < len(self._item_lookup)
+        item_info = np.full((len(detections), 2), -1, dtype=np.int32)
+        item_info[in_range] = self._item_lookup[class_ids[in_range]]
+        ppe_mask = item_info[:, 0] >= 0
+
+        if ppe_mask.any():
+            person_boxes = np.array([det["bbox"] for det in persons], dtype=np.float32)
+            ppe_boxes = np.array([det["bbox"] for det in detections], dtype=np.float32)[ppe_mask]
+            ppe_items = item_info[ppe_mask]
+
+            # (persons x ppe) intersection areas
+            ix1 = np.maximum(person_boxes[:, None, 0], ppe_boxes[None, :, 0])
+            iy1 = np.maximum(person_boxes[:, None, 1], ppe_boxes[None, :, 1])
+            ix2 = np.minimum(person_boxes[:, None, 2], ppe_boxes[None, :, 2])
+            iy2 = np.minimum(person_boxes[:, None, 3], ppe_boxes[None, :, 3])
+            inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+            ppe_area = (ppe_boxes[:, 2] - ppe_boxes[:, 0]) * (ppe_boxes[:, 3] - ppe_boxes[:, 1])
+            containment = inter / np.maximum(ppe_area, 1.0)[None, :]
+
+            owner = containment.argmax(axis=0)
+            matched = containment[owner, np.arange(len(ppe_boxes))] >= self.min_containment
+
+            owners, items = owner[matched], ppe_items[matched, 0]
+            negative = ppe_items[matched, 1] == 1
+
+            missing = np.zeros_like(observations, dtype=bool)
+            worn = np.zeros_like(observations, dtype=bool)
+            missing[owners[negative], items[negative]] = True
+            worn[owners[~negative], items[~negative]] = True
+
+            # A "no-X" box wins over an "X" box for the same person and item
+            observations[worn] = 1
+            observations[missing] = -1
+
+        return {det["track_id"]: observations[i] for i, det in enumerate(persons)}
+
+    # ------------------------------------------------------------------
+    # FRAME UPDATE — call this every frame after tracking
+    # ------------------------------------------------------------------
+
+    def update(self, detections: list, class_names, active_tracks: dict = None) -> dict:
+        """
+        Returns a dict with:
+        - tracks: track_id -> {item: "compliant" | "violation" | "unknown"}
+        - events: ppe_violation / ppe_resolved transitions this frame,
+                  tagged with the assigned worker if there is one
+        """
+        observations = self.associate(detections, class_names)
+        active_tracks = active_tracks or {}
+        now = datetime.utcnow().isoformat()
+        events = []
+
+        for track_id, observed in observations.items():
+            state = self.track_states.setdefault(track_id, {"_missing": 0})
+            state["_missing"] = 0
+
+            for item_index, item in enumerate(self._item_names):
+                item_state = state.setdefault(item, {"state": "unknown", "streak": 0, "evidence": 0, "since": None})
+                value = int(observed[item_index])
+                if value == 0:
+                    continue
+
+                if value == item_state["evidence"]:
+                    item_state["streak"] += 1
+                else:
+                    item_state["evidence"] = value
+                    item_state["streak"] = 1
+
+                if value < 0 and item_state["state"] != "violation" and item_state["streak"] >= self.enter_frames:
+                    item_state["state"] = "violation"
+                    item_state["since"] = now
+                    events.append(self._event("ppe_violation", track_id, item, active_tracks, now))
+                elif value > 0 and item_state["state"] != "compliant" and (
+                        item_state["state"] == "unknown" or item_state["streak"] >= self.exit_frames):
+                    was_violation = item_state["state"] == "violation"
+                    item_state["state"] = "compliant"
+                    item_state["since"] = now
+                    if was_violation:
+                        events.append(self._event("ppe_resolved", track_id, item, active_tracks, now))
+
+        # Forget tracks that have been gone for a while
+        for track_id in list(self.track_states.keys()):
+            if track_id in observations:
+                continue
+            self.track_states[track_id]["_missing"] += 1
+            if self.track_states[track_id]["_missing"] > self.forget_after:
+                del self.track_states[track_id]
+
+        tracks = {
+            track_id: {
+                item: self.track_states[track_id].get(item, {}).get("state", "unknown")
+                for item in self._item_names
+            }
+            for track_id in observations
+        }
+
+        return {"tracks": tracks, "events": events}
+
+    def get_violations(self) -> list:
+        """All tracks currently in violation, for HTTP polling"""
+        return [
+            {"track_id": track_id, "item": item, "since": state[item]["since"]}
+            for track_id, state in self.track_states.items()
+            for item in self._item_names
+            if item in state and state[item]["state"] == "violation"
+        ]
+
+    def reset(self):
+        self.track_states.clear()
+
+    def _event(self, event_type, track_id, item, active_tracks, timestamp):
+        track = active_tracks.get(track_id) or {}
+        return {
+            "type": event_type,
+            "track_id": track_id,
+            "item": item,
+            "worker": track.get("worker"),
+            "timestamp": timestamp,
+        }
+
+
+# Singleton instance — import this everywhere
+ppe_compliance_service = PPEComplianceService()
@@ -0,0 +1,290 @@
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import chain
+from sqlalchemy import event, select, delete, func, and_
+from sqlalchemy.orm import Session
+from app.db_models.user import User, UserRole
+from app.db_models.worker_profile import WorkerProfile, FitnessStatus
+from app.db_models.cognitive_assessment import CognitiveAssessment, CognitiveResult
+from app.db_models.fitness_data import FitnessData
+from app.db_models.worker_readiness import WorkerReadiness, ReadinessStatus
+from app.utils.db_utils import dialect_insert, chunked
+
+# Only fitness data this recent counts towards readiness
+FITNESS_LOOKBACK_DAYS = 2
+MIN_SLEEP_HOURS = 5.0
+MAX_RESTING_HEART_RATE = 100
+
+_SEVERITY = {
+    ReadinessStatus.READY: 0,
+    ReadinessStatus.SUPERVISION_REQUIRED: 1,
+    ReadinessStatus.NOT_READY: 2,
+}
+
+
+# ------------------------------------------------------------------
+# SCORING
+# ------------------------------------------------------------------
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def evaluate_readiness(fitness_status, cognitive_result, cognitive_valid_until,
+                       sleep_hours, heart_rate_resting, now: datetime = None):
+    """Combine the three sources into (ReadinessStatus, reasons). Worst source wins."""
+    now = now or datetime.now(timezone.utc)
+    status = ReadinessStatus.READY
+    reasons = []
+
+    def flag(level, reason):
+        nonlocal status
+        reasons.append(reason)
+        if _SEVERITY[level] > _SEVERITY[status]:
+            status = level
+
+    # Medical fitness
+    if fitness_status == FitnessStatus.UNFIT:
+        flag(ReadinessStatus.NOT_READY, "Medically unfit")
+    elif fitness_status == FitnessStatus.RESTRICTED:
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, "Medical restrictions")
+    elif fitness_status in (None, FitnessStatus.PENDING):
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, "Medical clearance pending")
+
+    # Cognitive assessment
+    if cognitive_result is None:
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, "No cognitive assessment")
+    elif cognitive_valid_until is not None and _as_utc(cognitive_valid_until) < now:
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, "Cognitive assessment expired")
+    elif cognitive_result == CognitiveResult.UNFIT:
+        flag(ReadinessStatus.NOT_READY, "Failed cognitive assessment")
+    elif cognitive_result == CognitiveResult.SUPERVISION_REQUIRED:
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, "Cognitive assessment requires supervision")
+
+    # Recent wearable data (missing data is not held against the worker)
+    if sleep_hours is not None and sleep_hours < MIN_SLEEP_HOURS:
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, f"Short sleep ({sleep_hours:.1f}h)")
+    if heart_rate_resting is not None and heart_rate_resting > MAX_RESTING_HEART_RATE:
+        flag(ReadinessStatus.SUPERVISION_REQUIRED, f"High resting heart rate ({heart_rate_resting} bpm)")
+
+    return status, reasons
+
+
+def _fitness_since() -> date:
+    return date.today() - timedelta(days=FITNESS_LOOKBACK_DAYS)
+
+
+def _stale_at(cognitive_valid_until, fitness_date, now: datetime):
+    """
+    When a snapshot's status would change with no new source rows: its
+    cognitive assessment expiring, or its fitness day leaving the lookback
+    window. None if neither can happen.
+    """
+    candidates = []
+    if cognitive_valid_until is not None and _as_utc(cognitive_valid_until) > now:
+        candidates.append(_as_utc(cognitive_valid_until))
+    if fitness_date is not None:
+        # Local midnight of the first day the data no longer counts
+        aged_out = datetime.combine(fitness_date + timedelta(days=FITNESS_LOOKBACK_DAYS + 1), time.min)
+        candidates.append(aged_out.astimezone(timezone.utc))
+    return min(candidates, default=None)
+
+
+# ------------------------------------------------------------------
+# REFRESH — sync, so it can run inside ORM session events
+# ------------------------------------------------------------------
+
+def refresh_readiness(session: Session, user_ids=None, batch_size: int = 500) -> int:
+    """
+    Recompute the readiness snapshot for the given users (all users if None).
+    Three set-based queries per batch, then one upsert. Snapshots of users
+    who are no longer workers are deleted.
+    """
+    if user_ids is None:
+        user_ids = session.execute(select(User.id)).scalars().all()
+    user_ids = [user_id for user_id in user_ids if user_id is not None]
+
+    refreshed = 0
+    for batch in chunked(list(set(user_ids)), batch_size):
+        rows = _build_snapshot_rows(session, batch)
+        former = set(batch) - {row["user_id"] for row in rows}
+        if former:
+            session.execute(delete(WorkerReadiness).where(WorkerReadiness.user_id.in_(former)))
+        if not rows:
+            continue
+        insert = dialect_insert(session)
+        table = WorkerReadiness.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={
+                **{column: stmt.excluded[column] for column in rows[0] if column != "user_id"},
+                "refreshed_at": func.now(),
+            },
+        )
+        session.execute(stmt)
+        refreshed += len(rows)
+    return refreshed
+
+
+def _build_snapshot_rows(session: Session, user_ids: list) -> list:
+    profiles = {
+        row.user_id: row for row in session.execute(
+            select(WorkerProfile.user_id, WorkerProfile.zone_assignment, WorkerProfile.fitness_status)
+            .where(WorkerProfile.user_id.in_(user_ids))
+        )
+    }
+
+    latest_assessment = (
+        select(CognitiveAssessment.user_id, func.max(CognitiveAssessment.taken_at).label("taken_at"))
+        .where(CognitiveAssessment.user_id.in_(user_ids))
+        .group_by(CognitiveAssessment.user_id)
+        .subquery()
+    )
+    assessments = {
+        row.user_id: row for row in session.execute(
+            select(CognitiveAssessment.user_id, CognitiveAssessment.result,
+                   CognitiveAssessment.score, CognitiveAssessment.valid_until)
+            .join(latest_assessment, and_(
+                CognitiveAssessment.user_id == latest_assessment.c.user_id,
+                CognitiveAssessment.taken_at == latest_assessment.c.taken_at,
+            ))
+        )
+    }
+
+    since = _fitness_since()
+    latest_fitness = (
+        select(FitnessData.user_id, func.max(FitnessData.date).label("date"))
+        .where(FitnessData.user_id.in_(user_ids), FitnessData.date >= since)
+        .group_by(FitnessData.user_id)
+        .subquery()
+    )
+    fitness = {
+        row.user_id: row for row in session.execute(
+            select(FitnessData.user_id, FitnessData.date, FitnessData.sleep_hours, FitnessData.heart_rate_resting)
+            .join(latest_fitness, and_(
+                FitnessData.user_id == latest_fitness.c.user_id,
+                FitnessData.date == latest_fitness.c.date,
+            ))
+        )
+    }
+
+    workers = set(session.execute(
+        select(User.id).where(User.id.in_(user_ids), User.role == UserRole.WORKER)
+    ).scalars().all())
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for user_id in user_ids:
+        if user_id not in workers:
+            continue
+        profile = profiles.get(user_id)
+        assessment = assessments.get(user_id)
+        day = fitness.get(user_id)
+
+        values = {
+            "user_id": user_id,
+            "zone_assignment": profile.zone_assignment if profile else None,
+            "fitness_status": profile.fitness_status if profile else None,
+            "cognitive_result": assessment.result if assessment else None,
+            "cognitive_score": assessment.score if assessment else None,
+            "cognitive_valid_until": assessment.valid_until if assessment else None,
+            "fitness_date": day.date if day else None,
+            "sleep_hours": day.sleep_hours if day else None,
+            "heart_rate_resting": day.heart_rate_resting if day else None,
+        }
+        values["readiness"], values["reasons"] = evaluate_readiness(
+            values["fitness_status"],
+            values["cognitive_result"],
+            values["cognitive_valid_until"],
+            values["sleep_hours"],
+            values["heart_rate_resting"],
+            now=now,
+        )
+        values["stale_at"] = _stale_at(values["cognitive_valid_until"], values["fitness_date"], now)
+        rows.append(values)
+    return rows
+
+
+# ------------------------------------------------------------------
+# QUERIES
+# ------------------------------------------------------------------
+
+async def get_zone_readiness(db, zone: str = None, readiness: ReadinessStatus = None) -> list:
+    """
+    Pre-shift roster for a zone (all zones if None), optionally only one
+    readiness status, in one indexed query on the snapshot table.
+    Snapshots whose status has gone stale since they were computed
+    (cognitive assessment expired, wearable data aged out of the lookback
+    window) are re-materialized first, so the stored status stays the
+    source of truth.
+    """
+    now = datetime.now(timezone.utc)
+    stale = (await db.execute(
+        select(WorkerReadiness.user_id).where(WorkerReadiness.stale_at <= now)
+    )).scalars().all()
+    if stale:
+        await db.run_sync(refresh_readiness, stale)
+        await db.commit()
+
+    stmt = (
+        select(WorkerReadiness, User.full_name, User.employee_id, User.profile_picture)
+        .join(User, User.id == WorkerReadiness.user_id)
+        .where(User.is_active == True, User.role == UserRole.WORKER)
+        .order_by(User.full_name)
+    )
+    if zone is not None:
+        stmt = stmt.where(WorkerReadiness.zone_assignment == zone)
+    if readiness is not None:
+        stmt = stmt.where(WorkerReadiness.readiness == readiness)
+
+    roster = []
+    for snapshot, full_name, employee_id, profile_picture in (await db.execute(stmt)).all():
+        roster.append({
+            "worker_id": str(snapshot.user_id),
+            "name": full_name,
+            "employee_id": employee_id,
+            "profile_picture": profile_picture,
+            "zone_assignment": snapshot.zone_assignment,
+            "readiness": snapshot.readiness.value,
+            "reasons": snapshot.reasons or [],
+            "fitness_status": snapshot.fitness_status.value if snapshot.fitness_status else None,
+            "cognitive_result": snapshot.cognitive_result.value if snapshot.cognitive_result else None,
+            "cognitive_valid_until": snapshot.cognitive_valid_until.isoformat() if snapshot.cognitive_valid_until else None,
+            "fitness_date": snapshot.fitness_date.isoformat() if snapshot.fitness_date else None,
+            "sleep_hours": snapshot.sleep_hours,
+            "heart_rate_resting": snapshot.heart_rate_resting,
+            "refreshed_at": snapshot.refreshed_at.isoformat() if snapshot.refreshed_at else None,
+        })
+    return roster
+
+
+# ------------------------------------------------------------------
+# INCREMENTAL REFRESH HOOKS
+# ------------------------------------------------------------------
+
+_SOURCE_MODELS = (WorkerProfile, CognitiveAssessment, FitnessData)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Remember which users had readiness source rows written in this transaction"""
+    changed = session.info.setdefault("readiness_dirty", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _SOURCE_MODELS):
+            changed.add(obj.user_id)
+        elif isinstance(obj, User) and obj not in session.deleted:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_changed_users(session):
+    session.flush()
+    changed = session.info.pop("readiness_dirty", None)
+    if changed:
+        refresh_readiness(session, changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("readiness_dirty", None)
@@ -0,0 +1,194 @@
+import time
+import cv2
+import numpy as np
+
+
+class ReIDGallery:
+    """
+    Appearance memory for assigned workers, used to carry an assignment over
+    when the same person comes back with a new BoT-SORT id.
+
+    The embedding is a colour histogram: hue x saturation for the upper and
+    lower half of the person box (shirt / vest vs trousers), square-rooted
+    and L2-normalised so a dot product is the Hellinger similarity of the
+    two distributions. It is cheap (one small resize + two calcHist calls)
+    and stable under the small pose changes between a worker leaving and
+    re-entering the frame.
+
+    - live tracks keep an exponential moving average of their embedding
+    - when an assigned track is lost its embedding moves into the gallery
+    - new unassigned tracks are matched against the whole gallery with one
+      matrix product; a match needs min_similarity and a margin over the
+      runner-up, and every gallery entry is used at most once
+    - a track can only inherit a worker who was last seen before the track
+      first appeared, so someone already in view when a worker leaves is
+      never mistaken for them
+    """
+
+    H_BINS = 16
+    S_BINS = 8
+    PATCH_SIZE = (32, 64)  # (w, h) the crop is resized to before histogramming
+
+    def __init__(self, min_similarity: float = 0.85, min_margin: float = 0.05,
+                 ttl: float = 120.0, momentum: float = 0.8):
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+
+        # Seconds a lost worker stays matchable
+        self.ttl = ttl
+
+        # Weight of the running embedding when a new observation arrives
+        self.momentum = momentum
+
+        # track_id -> running embedding of a live assigned track
+        self.track_embeddings: dict = {}
+
+        # Lost workers: parallel lists plus a stacked (n x dim) matrix
+        self._entries: list = []      # {"track_id", "worker", "left_at", "last_seen"}
+        self._vectors: list = []
+        self._matrix = None
+
+    @property
+    def dim(self) -> int:
+        return 2 * self.H_BINS * self.S_BINS
+
+    # ------------------------------------------------------------------
+    # EMBEDDING
+    # ------------------------------------------------------------------
+
+    def embed(self, frame, bbox) -> np.ndarray:
+        """Embedding for one person box, or None if the box is degenerate"""
+        if frame is None or bbox is None:
+            return None
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = (int(v) for v in bbox)
+        x1, y1 = max(x1, 0), max(y1, 0)
+        x2, y2 = min(x2, w), min(y2, h)
+        if x2 - x1 < 8 or y2 - y1 < 16:
+            return None
+
+        patch = cv2.resize(frame[y1:y2, x1:x2], self.PATCH_SIZE, interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(patch, cv2.COLOR_BGR2HSV)
+        half = self.PATCH_SIZE[1] // 2
+
+        parts = []
+        for region in (hsv[:half], hsv[half:]):
+            hist = cv2.calcHist([region], [0, 1], None, [self.H_BINS, self.S_BINS], [0, 180, 0, 256])
+            parts.append(hist.ravel())
+
+        vector = np.sqrt(np.concatenate(parts).astype(np.float32))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def observe(self, track_id: int, embedding: np.ndarray):
+        """Fold a new observation into a live track's running embedding"""
+        if embedding is None:
+            return
+        previous = self.track_embeddings.get(track_id)
+        if previous is None:
+            self.track_embeddings[track_id] = embedding
+            return
+        blended = self.momentum * previous + (1.0 - self.momentum) * embedding
+        self.track_embeddings[track_id] = blended / np.linalg.norm(blended)
+
+    def forget_track(self, track_id: int):
+        self.track_embeddings.pop(track_id, None)
+
+    # ------------------------------------------------------------------
+    # GALLERY
+    # ------------------------------------------------------------------
+
+    def add_lost(self, track_id: int, worker: dict, last_seen: float = None):
+        """Move a lost track's embedding into the gallery (last_seen: monotonic time it was last visible)"""
+        embedding = self.track_embeddings.pop(track_id, None)
+        if embedding is None or not worker:
+            return
+        # One entry per worker: a newer departure replaces an older one
+        self.remove_worker(worker.get("worker_id"))
+        now = time.monotonic()
+        self._entries.append({
+            "track_id": track_id,
+            "worker": worker,
+            "left_at": now,
+            "last_seen": last_seen if last_seen is not None else now,
+        })
+        self._vectors.append(embedding)
+        self._matrix = None
+
+    def remove_worker(self, worker_id):
+        keep = [i for i, entry in enumerate(self._entries) if entry["worker"].get("worker_id") != worker_id]
+        if len(keep) != len(self._entries):
+            self._keep(keep)
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl
+        keep = [i for i, entry in enumerate(self._entries) if entry["left_at"] >= cutoff]
+        if len(keep) != len(self._entries):
+            self._keep(keep)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _keep(self, indices):
+        self._entries = [self._entries[i] for i in indices]
+        self._vectors = [self._vectors[i] for i in indices]
+        self._matrix = None
+
+    # ------------------------------------------------------------------
+    # MATCHING
+    # ------------------------------------------------------------------
+
+    def match(self, candidates: dict, first_seen: dict = None) -> list:
+        """
+        candidates: track_id -> embedding for new unassigned tracks, and
+        first_seen: track_id -> monotonic time each was first visible.
+        Returns [(track_id, gallery entry, similarity)] and removes the
+        matched entries from the gallery.
+        """
+        self.expire()
+        if not candidates or not self._entries:
+            return []
+
+        if self._matrix is None:
+            self._matrix = np.stack(self._vectors)
+
+        track_ids = list(candidates.keys())
+        queries = np.stack([candidates[track_id] for track_id in track_ids])
+
+        # (tracks x gallery) cosine similarities in one product
+        similarity = queries @ self._matrix.T
+
+        # A track visible while the worker still was can't be that worker
+        if first_seen:
+            appeared = np.array([first_seen.get(track_id, np.inf) for track_id in track_ids])
+            last_seen = np.array([entry["last_seen"] for entry in self._entries])
+            similarity[appeared[:, None] < last_seen[None, :]] = -1.0
+
+        # Margin over the runner-up for each track, so two similar-looking
+        # workers in the gallery never get guessed between
+        if similarity.shape[1] > 1:
+            top2 = np.partition(similarity, -2, axis=1)[:, -2:]
+            margin = top2[:, 1] - top2[:, 0]
+        else:
+            margin = np.full(len(track_ids), np.inf, dtype=np.float32)
+
+        # Greedy one-to-one assignment, best pairs first
+        matches, used_tracks, used_entries = [], set(), set()
+        rows, cols = np.nonzero(similarity >= self.min_similarity)
+        for index in np.argsort(-similarity[rows, cols]):
+            row, col = rows[index], cols[index]
+            if row in used_tracks or col in used_entries or margin[row] < self.min_margin:
+                continue
+            used_tracks.add(row)
+            used_entries.add(col)
+            matches.append((track_ids[row], self._entries[col], float(similarity[row, col])))
+
+        if used_entries:
+            self._keep([i for i in range(len(self._entries)) if i not in used_entries])
+        return matches
+
+    def reset(self):
+        self.track_embeddings.clear()
+        self._entries.clear()
+        self._vectors.clear()
+        self._matrix = None
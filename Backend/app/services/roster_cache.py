@@ -0,0 +1,216 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event, select
+from sqlalchemy.engine import make_url
+from app.db_models.user import User, UserRole
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    """Detached, read-only copy of the User columns auth and tracking need"""
+    id: uuid.UUID
+    email: str
+    full_name: str
+    role: UserRole
+    employee_id: Optional[str]
+    google_id: str
+    profile_picture: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserRecord":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            employee_id=user.employee_id,
+            google_id=user.google_id,
+            profile_picture=user.profile_picture,
+            is_active=user.is_active,
+        )
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RosterCache:
+    """
+    In-memory cache of user rows for auth checks and of the active worker
+    roster for the assignment modal.
+
+    Invalidation, in order of reach:
+    - in-process: SQLAlchemy mapper events on User fire on every insert,
+      update or delete made through this app's ORM (the local stand-in)
+    - cross-process: a Postgres trigger sends NOTIFY roster_changed with the
+      user id, so writes from the auth server or scripts also invalidate
+    - the TTL bounds staleness if a notification is ever missed
+
+    A version counter guards against caching a roster that was loaded while
+    an invalidation happened.
+    """
+
+    CHANNEL = "roster_changed"
+
+    def __init__(self, user_ttl: float = 60.0, roster_ttl: float = 30.0, maxsize: int = 2048):
+        self.users = TTLCache(maxsize=maxsize, ttl=user_ttl)
+        self.roster_ttl = roster_ttl
+
+        self._roster = None
+        self._roster_expires_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+        self._listener = None
+
+        # Called with a user id (None = everyone) whose credentials must be
+        # re-checked: the user was deactivated, deleted or changed elsewhere
+        self._revocation_listeners = []
+
+    # ------------------------------------------------------------------
+    # LOOKUPS
+    # ------------------------------------------------------------------
+
+    async def get_user(self, db, user_id: uuid.UUID) -> Optional[UserRecord]:
+        record = self.users.get(user_id)
+        if record is not None:
+            return record
+
+        version = self._version
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+
+        record = UserRecord.from_model(user)
+        if version == self._version:
+            self.users.set(user_id, record)
+        return record
+
+    async def get_workers(self, db) -> list:
+        """All active workers, as UserRecords"""
+        with self._lock:
+            if self._roster is not None and self._roster_expires_at > time.monotonic():
+                return self._roster
+
+        version = self._version
+        result = await db.execute(
+            select(User).where(
+                User.is_active == True,
+                User.role == UserRole.WORKER
+            )
+        )
+        roster = [UserRecord.from_model(user) for user in result.scalars().all()]
+
+        with self._lock:
+            if version == self._version:
+                self._roster = roster
+                self._roster_expires_at = time.monotonic() + self.roster_ttl
+        return roster
+
+    # ------------------------------------------------------------------
+    # INVALIDATION
+    # ------------------------------------------------------------------
+
+    def invalidate_user(self, user_id=None):
+        """Drop one user (or all, if user_id is None) and the roster"""
+        with self._lock:
+            self._version += 1
+            self._roster = None
+        if user_id is None:
+            self.users.clear()
+            return
+        try:
+            self.users.pop(user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id)))
+        except ValueError:
+            self.users.clear()
+
+    def revoke_user(self, user_id=None):
+        """Invalidate a user and tell revocation listeners (the token cache)"""
+        self.invalidate_user(user_id)
+        for listener in self._revocation_listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                print(f"⚠️ Revocation listener failed: {e}")
+
+    def on_revoke(self, listener):
+        self._revocation_listeners.append(listener)
+
+    def clear(self):
+        self.invalidate_user(None)
+
+    async def listen_for_changes(self, database_url: str):
+        """Subscribe to NOTIFY roster_changed on Postgres. No-op for other backends."""
+        url = make_url(database_url)
+        if url.get_backend_name() != "postgresql":
+            return
+
+        import asyncpg
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._listener = await asyncpg.connect(dsn, statement_cache_size=0)
+        await self._listener.add_listener(self.CHANNEL, self._on_notify)
+
+    async def stop_listening(self):
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        # The trigger doesn't say what changed, so cached tokens are re-checked too
+        self.revoke_user(payload or None)
+
+
+# Singleton instance — import this everywhere
+roster_cache = RosterCache()
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_change(mapper, connection, target):
+    if target.is_active:
+        roster_cache.invalidate_user(target.id)
+    else:
+        roster_cache.revoke_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _revoke_on_user_delete(mapper, connection, target):
+    roster_cache.revoke_user(target.id)
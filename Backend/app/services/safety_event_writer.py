@@ -0,0 +1,216 @@
+import threading
+import traceback
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError, InterfaceError, TimeoutError as PoolTimeoutError
+from app.database import SessionLocal
+from app.db_models.user import User
+from app.db_models.safety_session import SafetySession, SafetyEvent, SafetyEventType, EventSeverity
+
+# Errors worth retrying later (database down, connection lost, pool
+# exhausted); anything else means the row itself can't be inserted
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError)
+
+
+class SafetyEventWriter:
+    """
+    Buffers safety events in memory and writes them to Postgres in batched
+    inserts from a background thread.
+
+    The frame loop only ever calls record(), which is a deque append, so a
+    slow or unreachable database never adds latency to a frame. If the
+    database stays down the buffer is capped at max_buffer and the oldest
+    events are dropped.
+
+    Worker / session ids are checked before the insert: an id with no row
+    (free-form worker ids, deleted sessions) is nulled, and a worker id is
+    kept in details. If a batch still fails, it is retried row by row;
+    rows that fail on their own are quarantined (logged and dropped), and
+    rows hit by transient errors are retried at most max_retries times.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, batch_size: int = 500, max_buffer: int = 20000,
+                 max_retries: int = 30):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+
+        self._buffer = deque(maxlen=max_buffer)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+        # Session new events are attached to (set by /safety/sessions/start)
+        self.active_session_id = None
+
+        self.written = 0
+        self.dropped = 0
+
+        # Rows that could not be written, kept for inspection
+        self.quarantined = 0
+        self._quarantine = deque(maxlen=100)
+
+    # ------------------------------------------------------------------
+    # RECORDING — called from the frame loop, never touches the DB
+    # ------------------------------------------------------------------
+
+    def record(self, event_type: SafetyEventType, severity: EventSeverity = EventSeverity.MEDIUM,
+               worker_id=None, track_id: int = None, stream_id: str = None,
+               details: dict = None, occurred_at: datetime = None):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+
+        self._buffer.append({
+            "id": uuid.uuid4(),
+            "session_id": self.active_session_id,
+            "worker_id": _as_uuid(worker_id),
+            "event_type": event_type,
+            "severity": severity,
+            "track_id": track_id,
+            "stream_id": stream_id,
+            "details": details,
+            "occurred_at": occurred_at or datetime.now(timezone.utc),
+            "_attempts": 0,
+        })
+
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # BACKGROUND WRITER
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="safety-event-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered so far. Safe to call from any thread."""
+        written = 0
+        with self._flush_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                try:
+                    with SessionLocal() as db:
+                        self._check_references(db, batch)
+                        db.execute(insert(SafetyEvent.__table__), [_columns(row) for row in batch])
+                        db.commit()
+                    written += len(batch)
+                    continue
+                except TRANSIENT_ERRORS as e:
+                    print(f"⚠️ Safety event flush failed, will retry: {e}")
+                    retry = self._retry_or_quarantine(batch, e)
+                except Exception as e:
+                    print(f"⚠️ Safety event batch rejected, inserting row by row: {e}")
+                    try:
+                        ok, retry = self._insert_rows(batch)
+                        written += ok
+                    except Exception as e:
+                        traceback.print_exc()
+                        retry = self._retry_or_quarantine(batch, e)
+
+                if retry:
+                    # Put them back in order; newest events fall off if full
+                    self._buffer.extendleft(reversed(retry))
+                    break
+        self.written += written
+        return written
+
+    def _check_references(self, db, batch: list):
+        """Null worker / session ids that have no row, so the FKs can't reject the batch"""
+        worker_ids = {row["worker_id"] for row in batch if row["worker_id"] is not None}
+        session_ids = {row["session_id"] for row in batch if row["session_id"] is not None}
+        known_workers = set(db.execute(select(User.id).where(User.id.in_(worker_ids))).scalars()) if worker_ids else set()
+        known_sessions = set(
+            db.execute(select(SafetySession.id).where(SafetySession.id.in_(session_ids))).scalars()
+        ) if session_ids else set()
+
+        for row in batch:
+            if row["worker_id"] is not None and row["worker_id"] not in known_workers:
+                row["details"] = {**(row["details"] or {}), "unknown_worker_id": str(row["worker_id"])}
+                row["worker_id"] = None
+            if row["session_id"] is not None and row["session_id"] not in known_sessions:
+                row["session_id"] = None
+
+    def _insert_rows(self, batch: list):
+        """Insert one row at a time; returns (written, rows to retry)"""
+        written = 0
+        with SessionLocal() as db:
+            for i, row in enumerate(batch):
+                try:
+                    db.execute(insert(SafetyEvent.__table__), [_columns(row)])
+                    db.commit()
+                    written += 1
+                except TRANSIENT_ERRORS as e:
+                    db.rollback()
+                    # Database went away mid-way: retry the rest later
+                    return written, self._retry_or_quarantine(batch[i:], e)
+                except Exception as e:
+                    db.rollback()
+                    self._quarantine_row(row, e)
+        return written, []
+
+    def _retry_or_quarantine(self, rows: list, error) -> list:
+        retry = []
+        for row in rows:
+            row["_attempts"] += 1
+            if row["_attempts"] > self.max_retries:
+                self._quarantine_row(row, error)
+            else:
+                retry.append(row)
+        return retry
+
+    def _quarantine_row(self, row: dict, error):
+        self.quarantined += 1
+        self._quarantine.append({**_columns(row), "error": str(error)})
+        print(f"⚠️ Safety event quarantined ({row['event_type']}, worker {row['worker_id']}): {error}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._buffer:
+                self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "quarantined": self.quarantined,
+            "active_session_id": str(self.active_session_id) if self.active_session_id else None,
+        }
+
+
+def _columns(row: dict) -> dict:
+    """Row without the writer's bookkeeping keys"""
+    return {key: value for key, value in row.items() if not key.startswith("_")}
+
+
+def _as_uuid(value):
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+# Singleton instance — import this everywhere
+safety_event_writer = SafetyEventWriter()
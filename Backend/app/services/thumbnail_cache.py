@@ -0,0 +1,135 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+import cv2
+from app.utils.jpeg_encoder import jpeg_encoder
+
+
+class ThumbnailCache:
+    """
+    Small per-track crops for the assignment modal, so the frontend can show
+    who each track is without pulling a full frame.
+
+    The frame loop only stores a downscaled crop (a slice + resize) per
+    visible track, and at most every refresh_interval seconds. JPEG encoding
+    happens lazily on the first request for a crop version and is cached
+    with it, so tracks nobody opens are never encoded.
+
+    Entries are keyed by (stream_id, track_id) in an LRU bounded by maxsize.
+    Each refresh takes a new version from a global counter, so
+    "track_id-version" is a unique ETag across streams.
+    """
+
+    def __init__(self, maxsize: int = 256, refresh_interval: float = 1.0,
+                 height: int = 128, quality: int = 80):
+        self.maxsize = maxsize
+        self.refresh_interval = refresh_interval
+        self.height = height
+        self.quality = quality
+
+        # (stream_id, track_id) -> {"crop", "version", "updated", "jpeg" (None until requested)}
+        self._entries: OrderedDict = OrderedDict()
+
+        # track_id -> stream_id it was last captured on (track ids are global)
+        self._latest_stream: dict = {}
+
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # CAPTURE — called from the frame loop, never encodes
+    # ------------------------------------------------------------------
+
+    def update(self, stream_id: str, frame, active_tracks: dict):
+        now = time.monotonic()
+        h, w = frame.shape[:2]
+        for track_id, track in active_tracks.items():
+            bbox = track.get("bbox")
+            if not bbox:
+                continue
+            key = (stream_id, track_id)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry["updated"] < self.refresh_interval:
+                continue
+
+            x1, y1, x2, y2 = (int(v) for v in bbox)
+            x1, y1, x2, y2 = max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+            scale = min(1.0, self.height / (y2 - y1))
+            crop = cv2.resize(
+                frame[y1:y2, x1:x2],
+                (max(1, int((x2 - x1) * scale)), max(1, int((y2 - y1) * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+
+            with self._lock:
+                self._entries[key] = {
+                    "crop": crop, "version": next(self._versions), "updated": now, "jpeg": None,
+                }
+                self._entries.move_to_end(key)
+                self._latest_stream[track_id] = stream_id
+                while len(self._entries) > self.maxsize:
+                    (old_stream, old_track), _ = self._entries.popitem(last=False)
+                    if self._latest_stream.get(old_track) == old_stream:
+                        del self._latest_stream[old_track]
+
+    # ------------------------------------------------------------------
+    # SERVING
+    # ------------------------------------------------------------------
+
+    def etag(self, track_id: int, stream_id: str = None):
+        """ETag for a track's current crop, or None if there is no crop"""
+        key = self._key(track_id, stream_id)
+        entry = self._entries.get(key) if key else None
+        if entry is None:
+            return None
+        return f'"{track_id}-{entry["version"]}"'
+
+    def get_jpeg(self, track_id: int, stream_id: str = None):
+        """(jpeg bytes, etag) for a track, encoding only if the crop changed since the last request"""
+        with self._lock:
+            key = self._key(track_id, stream_id)
+            entry = self._entries.get(key) if key else None
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+            crop, version, jpeg = entry["crop"], entry["version"], entry["jpeg"]
+
+        if jpeg is None:
+            # Copied out of the encoder's reused buffer, since it is cached
+            try:
+                jpeg = bytes(jpeg_encoder.encode(crop, quality=self.quality))
+            except ValueError:
+                return None, None
+            with self._lock:
+                current = self._entries.get(key)
+                if current is not None and current["version"] == version:
+                    current["jpeg"] = jpeg
+
+        return jpeg, f'"{track_id}-{version}"'
+
+    def has(self, track_id: int) -> bool:
+        return track_id in self._latest_stream
+
+    def release_stream(self, stream_id: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == stream_id]:
+                del self._entries[key]
+            self._latest_stream = {
+                track_id: stream for track_id, stream in self._latest_stream.items() if stream != stream_id
+            }
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._latest_stream.clear()
+
+    def _key(self, track_id: int, stream_id: str = None):
+        stream_id = stream_id or self._latest_stream.get(track_id)
+        return (stream_id, track_id) if stream_id is not None else None
+
+
+# Singleton instance — import this everywhere
+thumbnail_cache = ThumbnailCache()
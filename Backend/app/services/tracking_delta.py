@@ -0,0 +1,146 @@
+class TrackingDeltaEncoder:
+    """
+    Turns full result messages into incremental ones for a single
+    connection + source.
+
+    The first message (and every snapshot_every-th after it, or whenever the
+    client asks for a resync) is sent as a full "snapshot". Everything in
+    between is a "delta" that only carries:
+    - track births (full entry), deaths (ids) and box moves above
+      move_threshold pixels, plus worker assignment changes
+    - the same births / deaths / moves for detections, keyed by track_id
+    - new_untracked and ppe_status only when they changed
+
+    Per-frame fields (frames, posture, fps, one-shot events) are always sent.
+    Every message carries a seq number; a client that sees a gap should send
+    {"type": "resync"} and will get a snapshot next.
+    """
+
+    # Fields the encoder diffs; everything else in the message is passed through
+    STATEFUL_FIELDS = ("detections", "active_tracks", "new_untracked", "ppe_status")
+
+    def __init__(self, move_threshold: int = 4, snapshot_every: int = 100):
+        self.move_threshold = move_threshold
+        self.snapshot_every = snapshot_every
+
+        self.seq = 0
+        self._since_snapshot = 0
+        self._force_snapshot = True
+
+        # Last state the client has, as sent (not as detected), so small
+        # drifts accumulate until they cross the threshold
+        self._tracks: dict = {}
+        self._detections: dict = {}
+        self._new_untracked: list = []
+        self._ppe_status: dict = {}
+
+    def request_snapshot(self):
+        self._force_snapshot = True
+
+    def encode(self, message: dict) -> dict:
+        self.seq += 1
+
+        if self._force_snapshot or self._since_snapshot >= self.snapshot_every:
+            return self._snapshot(message)
+
+        self._since_snapshot += 1
+        delta = {key: value for key, value in message.items() if key not in self.STATEFUL_FIELDS}
+        delta["type"] = "result_delta"
+        delta["seq"] = self.seq
+
+        # ---- tracks ----
+        tracks = message.get("active_tracks", {})
+        born, moved, assigned = {}, {}, {}
+        for track_id, track in tracks.items():
+            previous = self._tracks.get(track_id)
+            if previous is None:
+                born[track_id] = track
+                self._tracks[track_id] = {"bbox": track["bbox"], "worker": track["worker"]}
+                continue
+            if self._moved(previous["bbox"], track["bbox"]):
+                moved[track_id] = track["bbox"]
+                previous["bbox"] = track["bbox"]
+            if previous["worker"] != track["worker"]:
+                assigned[track_id] = track["worker"]
+                previous["worker"] = track["worker"]
+
+        died = [track_id for track_id in self._tracks if track_id not in tracks]
+        for track_id in died:
+            del self._tracks[track_id]
+
+        delta["tracks"] = {"born": born, "died": died, "moved": moved, "assigned": assigned}
+
+        # ---- detections ----
+        keyed, untracked = self._split_detections(message.get("detections", []))
+        det_born, det_moved = [], {}
+        for key, det in keyed.items():
+            previous = self._detections.get(key)
+            if previous is None or previous["class_id"] != det["class_id"]:
+                det_born.append(det)
+                self._detections[key] = dict(det)
+            elif self._moved(previous["bbox"], det["bbox"]):
+                det_moved[key] = det["bbox"]
+                previous["bbox"] = det["bbox"]
+
+        det_died = [key for key in self._detections if key not in keyed]
+        for key in det_died:
+            del self._detections[key]
+
+        delta["detections"] = {
+            "born": det_born,
+            "died": det_died,
+            "moved": det_moved,
+            "untracked": untracked,
+        }
+
+        # ---- derived lists, only when changed ----
+        new_untracked = message.get("new_untracked", [])
+        if sorted(new_untracked) != sorted(self._new_untracked):
+            delta["new_untracked"] = new_untracked
+            self._new_untracked = list(new_untracked)
+
+        ppe_status = message.get("ppe_status")
+        if ppe_status is not None:
+            changed = {
+                track_id: status for track_id, status in ppe_status.items()
+                if self._ppe_status.get(track_id) != status
+            }
+            if changed:
+                delta["ppe_status"] = changed
+            self._ppe_status = dict(ppe_status)
+
+        return delta
+
+    # ------------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------------
+
+    def _snapshot(self, message: dict) -> dict:
+        self._force_snapshot = False
+        self._since_snapshot = 0
+
+        self._tracks = {
+            track_id: {"bbox": track["bbox"], "worker": track["worker"]}
+            for track_id, track in message.get("active_tracks", {}).items()
+        }
+        keyed, _ = self._split_detections(message.get("detections", []))
+        self._detections = {key: dict(det) for key, det in keyed.items()}
+        self._new_untracked = list(message.get("new_untracked", []))
+        self._ppe_status = dict(message.get("ppe_status") or {})
+
+        return {**message, "seq": self.seq, "snapshot": True}
+
+    def _split_detections(self, detections: list):
+        keyed, untracked = {}, []
+        for det in detections:
+            track_id = det.get("track_id")
+            if track_id is None:
+                untracked.append(det)
+            else:
+                keyed[track_id] = det
+        return keyed, untracked
+
+    def _moved(self, old_bbox, new_bbox) -> bool:
+        if old_bbox is None or new_bbox is None:
+            return old_bbox != new_bbox
+        return max(abs(a - b) for a, b in zip(old_bbox, new_bbox)) > self.move_threshold
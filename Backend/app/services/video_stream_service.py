@@ -0,0 +1,354 @@
+import asyncio
+import threading
+import time
+import uuid
+from fractions import Fraction
+
+try:
+    import av
+except ImportError:  # optional — fragmented MP4 output is disabled without it
+    av = None
+
+from app.core.config import settings
+from app.services.inference_scheduler import Priority
+from app.utils.serialization import get_serializer
+
+# Millisecond timestamps for both the video and the metadata side channel
+TIME_BASE = Fraction(1, 1000)
+
+
+class FragmentedMP4Writer:
+    """
+    Encodes BGR frames to H.264 with PyAV and splits the muxer output into
+    an init segment (ftyp + moov) and self-contained fragments (moof + mdat).
+
+    The muxer runs with empty_moov + frag_keyframe, so every fragment starts
+    at a keyframe and a viewer can join at any fragment boundary after
+    receiving the init segment. The writer is its own output file object:
+    the muxer calls write() and complete top-level boxes are parsed out of
+    the byte stream as they arrive.
+    """
+
+    def __init__(self, width: int, height: int, fps: float, bitrate: int, gop: int, codec: str = "libx264"):
+        self.init_segment = None
+        self._init_parts = []
+        self._fragment = []
+        self._ready = []
+        self._buffer = bytearray()
+        self._last_pts = -1
+
+        self.container = av.open(self, mode="w", format="mp4", options={
+            "movflags": "frag_keyframe+empty_moov+default_base_moof",
+            "flush_packets": "1",
+        })
+        stream = self.container.add_stream(codec, rate=max(1, int(round(fps))))
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = "yuv420p"
+        stream.bit_rate = bitrate
+        stream.codec_context.gop_size = gop
+        stream.codec_context.time_base = TIME_BASE
+        stream.options = {"preset": "veryfast", "tune": "zerolatency"}
+        self.stream = stream
+
+    # ------------------------------------------------------------------
+    # ENCODING
+    # ------------------------------------------------------------------
+
+    def encode(self, image, pts_ms: int) -> list:
+        """Encode one frame; returns the fragments completed by it (often none)"""
+        # Timestamps must strictly increase
+        pts = max(int(pts_ms), self._last_pts + 1)
+        self._last_pts = pts
+
+        frame = av.VideoFrame.from_ndarray(image[:self.stream.height, :self.stream.width], format="bgr24")
+        frame.pts = pts
+        frame.time_base = TIME_BASE
+        for packet in self.stream.encode(frame):
+            self.container.mux(packet)
+        return self._take()
+
+    def close(self) -> list:
+        for packet in self.stream.encode():
+            self.container.mux(packet)
+        self.container.close()
+        return self._take()
+
+    def _take(self) -> list:
+        ready, self._ready = self._ready, []
+        return ready
+
+    # ------------------------------------------------------------------
+    # MUXER OUTPUT
+    # ------------------------------------------------------------------
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= 8:
+            size = int.from_bytes(self._buffer[0:4], "big")
+            if size == 1:
+                if len(self._buffer) < 16:
+                    break
+                size = int.from_bytes(self._buffer[8:16], "big")
+            elif size == 0:
+                # Box runs to end of file; only possible for a trailing box
+                break
+            if len(self._buffer) < size:
+                break
+
+            box_type = bytes(self._buffer[4:8])
+            box = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self._on_box(box_type, box)
+        return len(data)
+
+    def _on_box(self, box_type: bytes, box: bytes):
+        if self.init_segment is None:
+            self._init_parts.append(box)
+            if box_type == b"moov":
+                self.init_segment = b"".join(self._init_parts)
+                self._init_parts = []
+            return
+
+        # Anything outside a moof..mdat pair (e.g. the trailing mfra) is dropped
+        if box_type == b"moof":
+            self._fragment = [box]
+        elif self._fragment:
+            self._fragment.append(box)
+            if box_type == b"mdat":
+                self._ready.append(b"".join(self._fragment))
+                self._fragment = []
+
+
+class _Subscriber:
+    """Bounded asyncio queue fed from the producer thread. None ends the stream."""
+
+    def __init__(self, loop, maxsize: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def push(self, item):
+        self.loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Skipping fragments would corrupt the video, so a viewer that
+            # can't keep up is disconnected instead
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return
+        if item is None:
+            self.closed = True
+
+
+class VideoStream:
+    """
+    One processed source, encoded once and fanned out to any number of
+    fMP4 viewers and metadata (server-sent events) listeners.
+    """
+
+    def __init__(self, stream_id: str, path: str, service):
+        self.stream_id = stream_id
+        self.path = path
+        self.service = service
+
+        self.init_segment = None
+        self.frames = 0
+        self.started_at = time.monotonic()
+        self.last_active = self.started_at
+        self.finished = False
+
+        self._video_subscribers: list = []
+        self._metadata_subscribers: list = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"video-stream-{stream_id}", daemon=True)
+
+    # ------------------------------------------------------------------
+    # SUBSCRIPTIONS — called from the event loop
+    # ------------------------------------------------------------------
+
+    def subscribe_video(self, loop) -> _Subscriber:
+        subscriber = _Subscriber(loop, self.service.max_queue)
+        with self._lock:
+            if self.init_segment is not None:
+                subscriber.push(self.init_segment)
+            if self.finished:
+                subscriber.push(None)
+            else:
+                self._video_subscribers.append(subscriber)
+        return subscriber
+
+    def subscribe_metadata(self, loop) -> _Subscriber:
+        subscriber = _Subscriber(loop, self.service.max_queue * 8)
+        with self._lock:
+            if self.finished:
+                subscriber.push(None)
+            else:
+                self._metadata_subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        with self._lock:
+            for subscribers in (self._video_subscribers, self._metadata_subscribers):
+                if subscriber in subscribers:
+                    subscribers.remove(subscriber)
+
+    def stop(self):
+        self._stop.set()
+
+    def info(self) -> dict:
+        return {
+            "stream_id": self.stream_id,
+            "path": self.path,
+            "frames": self.frames,
+            "finished": self.finished,
+            "viewers": len(self._video_subscribers),
+            "metadata_listeners": len(self._metadata_subscribers),
+        }
+
+    # ------------------------------------------------------------------
+    # PRODUCER THREAD
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        from app.models import safety_monitor
+
+        writer = None
+        serializer = get_serializer()
+        # Someone is watching, so ahead of offline jobs
+        frames = safety_monitor.process_video_stream(self.path, priority=Priority.NEAR_LIVE)
+        try:
+            for object_frame, result in frames:
+                if self._stop.is_set() or self._idle():
+                    break
+
+                # Wall-clock timestamps, so playback runs at processing speed
+                pts_ms = int((time.monotonic() - self.started_at) * 1000)
+                if writer is None:
+                    height, width = object_frame.shape[:2]
+                    writer = FragmentedMP4Writer(
+                        width - width % 2, height - height % 2,
+                        fps=self.service.fps, bitrate=self.service.bitrate,
+                        gop=self.service.gop, codec=self.service.codec
+                    )
+
+                fragments = writer.encode(object_frame, pts_ms)
+                self._publish_video(writer, fragments)
+                self._publish_metadata(serializer, pts_ms, result)
+                self.frames += 1
+        except Exception as e:
+            print(f"❌ Video stream {self.stream_id} failed: {e}")
+        finally:
+            frames.close()
+            if writer is not None:
+                try:
+                    self._publish_video(writer, writer.close())
+                except Exception as e:
+                    print(f"⚠️ Video stream {self.stream_id} flush failed: {e}")
+            with self._lock:
+                self.finished = True
+                for subscriber in self._video_subscribers + self._metadata_subscribers:
+                    subscriber.push(None)
+                self._video_subscribers.clear()
+                self._metadata_subscribers.clear()
+            self.service._streams.pop(self.stream_id, None)
+            print(f"🛑 Video stream {self.stream_id} stopped after {self.frames} frames")
+
+    def _idle(self) -> bool:
+        now = time.monotonic()
+        if self._video_subscribers or self._metadata_subscribers:
+            self.last_active = now
+            return False
+        return now - self.last_active > self.service.idle_timeout
+
+    def _publish_video(self, writer, fragments):
+        with self._lock:
+            if self.init_segment is None and writer.init_segment is not None:
+                self.init_segment = writer.init_segment
+                for subscriber in self._video_subscribers:
+                    subscriber.push(self.init_segment)
+            for fragment in fragments:
+                for subscriber in self._video_subscribers:
+                    subscriber.push(fragment)
+
+    def _publish_metadata(self, serializer, pts_ms, result):
+        if not self._metadata_subscribers:
+            return
+        tracking = result["tracking"]
+        event = "data: " + serializer.dumps({
+            "pts_ms": pts_ms,
+            "frame": self.frames,
+            "detections": result["detections"],
+            "posture": result["posture"],
+            "active_tracks": tracking["active_tracks"],
+            "lost_workers": tracking["lost_workers"],
+            "ppe_status": result["ppe"]["tracks"],
+            "ppe_events": result["ppe"]["events"],
+            "zone_events": result["zones"]["events"],
+        }) + "\n\n"
+        with self._lock:
+            for subscriber in self._metadata_subscribers:
+                subscriber.push(event)
+
+
+class VideoStreamService:
+    """Registry of running fMP4 output streams"""
+
+    def __init__(self, bitrate: int = 800_000, gop: int = 20, fps: float = 10.0,
+                 codec: str = "libx264", idle_timeout: float = 30.0, max_queue: int = 64):
+        self.bitrate = bitrate
+        self.gop = gop
+        self.fps = fps
+        self.codec = codec
+
+        # Stop a stream nobody has watched for this many seconds
+        self.idle_timeout = idle_timeout
+
+        # Fragments buffered per viewer before it is dropped as too slow
+        self.max_queue = max_queue
+
+        self._streams: dict = {}
+
+    @property
+    def available(self) -> bool:
+        return av is not None
+
+    def start(self, path: str) -> VideoStream:
+        if av is None:
+            raise RuntimeError("PyAV is not installed; fragmented MP4 output is unavailable")
+        stream = VideoStream(uuid.uuid4().hex[:12], path, self)
+        self._streams[stream.stream_id] = stream
+        stream._thread.start()
+        return stream
+
+    def get(self, stream_id: str):
+        return self._streams.get(stream_id)
+
+    def list(self) -> list:
+        return [stream.info() for stream in self._streams.values()]
+
+    def stop(self, stream_id: str) -> bool:
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return False
+        stream.stop()
+        return True
+
+    def stop_all(self):
+        for stream in list(self._streams.values()):
+            stream.stop()
+
+
+# Singleton instance — import this everywhere
+video_stream_service = VideoStreamService(
+    bitrate=settings.VIDEO_STREAM_BITRATE,
+    gop=settings.VIDEO_STREAM_GOP
+)
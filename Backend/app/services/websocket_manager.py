@@ -1,17 +1,166 @@
+import time
 from fastapi import WebSocket
 from typing import List
+from app.services.tracking_delta import TrackingDeltaEncoder
+from app.utils.serialization import get_serializer
+from app.utils.jpeg_encoder import QUALITY_TIERS, DEFAULT_TIER, tier_for_bandwidth
+
+
+class BandwidthEstimator:
+    """
+    Rough per-client throughput from how long sends take.
+
+    A send only returns once the payload is in the transport buffer, so a
+    slow client shows up as slow sends (backpressure). Sends too fast to
+    time are counted at min_seconds so the estimate climbs back once the
+    backlog clears. A client-reported figure wins while it is fresh.
+
+    Fast sends only mean the kernel buffer had room, not that the link is
+    fast, so a measured figure can lower the tier but never raise it above
+    the default (see ConnectionManager.get_quality_tier).
+    """
+
+    def __init__(self, alpha: float = 0.2, min_seconds: float = 0.002, report_ttl: float = 10.0):
+        self.alpha = alpha
+        self.min_seconds = min_seconds
+        self.report_ttl = report_ttl
+
+        self.measured_kbps = None
+        self.reported_kbps = None
+        self._reported_at = 0.0
+
+    def observe(self, nbytes: int, seconds: float):
+        # Small messages (pongs, acks) say nothing about bandwidth
+        if nbytes < 4096:
+            return
+        kbps = nbytes * 8 / 1000 / max(seconds, self.min_seconds)
+        if self.measured_kbps is None:
+            self.measured_kbps = kbps
+        else:
+            self.measured_kbps += self.alpha * (kbps - self.measured_kbps)
+
+    def report(self, kbps: float):
+        self.reported_kbps = kbps
+        self._reported_at = time.monotonic()
+
+    @property
+    def reported(self) -> bool:
+        """Whether the current figure is a fresh client report"""
+        return self.reported_kbps is not None and time.monotonic() - self._reported_at < self.report_ttl
+
+    @property
+    def kbps(self):
+        if self.reported_kbps is not None and time.monotonic() - self._reported_at < self.report_ttl:
+            return self.reported_kbps
+        return self.measured_kbps
+
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
 
+        # websocket -> {source -> TrackingDeltaEncoder}, only for clients
+        # that subscribed with protocol "delta"
+        self.delta_encoders: dict = {}
+
+        # websocket -> serializer picked at subscribe (default: orjson if installed)
+        self.serializers: dict = {}
+
+        # websocket -> BandwidthEstimator, and the tier a client pinned ("auto" = by bandwidth)
+        self.bandwidth: dict = {}
+        self.quality_tiers: dict = {}
+
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.serializers[websocket] = get_serializer()
+        self.bandwidth[websocket] = BandwidthEstimator()
+        self.quality_tiers[websocket] = "auto"
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.delta_encoders.pop(websocket, None)
+        self.serializers.pop(websocket, None)
+        self.bandwidth.pop(websocket, None)
+        self.quality_tiers.pop(websocket, None)
+
+    def set_protocol(self, websocket: WebSocket, protocol: str):
+        """Switch a client between "full" result messages and "delta" tracking updates"""
+        if protocol == "delta":
+            self.delta_encoders[websocket] = {}
+        else:
+            self.delta_encoders.pop(websocket, None)
+
+    def set_encoding(self, websocket: WebSocket, encoding: str):
+        """Pick the wire encoding for a client: json, orjson or msgpack (binary frames)"""
+        self.serializers[websocket] = get_serializer(encoding)
+
+    def set_quality(self, websocket: WebSocket, tier: str):
+        """Pin a client's JPEG quality tier, or "auto" to follow its bandwidth"""
+        if tier != "auto" and tier not in QUALITY_TIERS:
+            raise ValueError(f"Unsupported quality '{tier}'. Available: auto, {', '.join(QUALITY_TIERS)}")
+        self.quality_tiers[websocket] = tier
+
+    def report_bandwidth(self, websocket: WebSocket, kbps: float):
+        estimator = self.bandwidth.get(websocket)
+        if estimator is not None:
+            estimator.report(kbps)
+
+    def get_quality_tier(self, websocket: WebSocket) -> str:
+        tier = self.quality_tiers.get(websocket, "auto")
+        if tier != "auto":
+            return tier
+        estimator = self.bandwidth.get(websocket)
+        if estimator is None:
+            return DEFAULT_TIER
+        tier = tier_for_bandwidth(estimator.kbps)
+        if estimator.reported:
+            return tier
+        # Send timing can't show spare bandwidth, only a client falling behind
+        order = list(QUALITY_TIERS)
+        return tier if order.index(tier) >= order.index(DEFAULT_TIER) else DEFAULT_TIER
+
+    def request_snapshot(self, websocket: WebSocket):
+        for encoder in self.delta_encoders.get(websocket, {}).values():
+            encoder.request_snapshot()
 
     async def send_json(self, data: dict, websocket: WebSocket):
-        await websocket.send_json(data)
+        serializer = self.serializers.get(websocket) or get_serializer()
+        await self._send_encoded(websocket, serializer, serializer.dumps(data))
+
+    async def send_result(self, data: dict, websocket: WebSocket):
+        """Send a result message, delta-encoded per source if the client subscribed to it"""
+        encoders = self.delta_encoders.get(websocket)
+        if encoders is not None:
+            source = data.get("source", "default")
+            encoder = encoders.get(source)
+            if encoder is None:
+                encoder = encoders[source] = TrackingDeltaEncoder()
+            data = encoder.encode(data)
+        await self.send_json(data, websocket)
+
+    async def broadcast(self, data: dict, websockets: List[WebSocket] = None):
+        """Send the same message to many clients, encoding it once per serializer"""
+        encoded = {}
+        for websocket in list(websockets if websockets is not None else self.active_connections):
+            serializer = self.serializers.get(websocket) or get_serializer()
+            if serializer.name not in encoded:
+                encoded[serializer.name] = serializer.dumps(data)
+            try:
+                await self._send_encoded(websocket, serializer, encoded[serializer.name])
+            except Exception as e:
+                # A closed client must not fail the broadcast for the others
+                # (or the handler that triggered it); its own loop cleans up the rest
+                print(f"⚠️ Broadcast to a client failed, dropping it: {e}")
+                self.disconnect(websocket)
+
+    async def _send_encoded(self, websocket: WebSocket, serializer, payload):
+        start = time.perf_counter()
+        if serializer.binary:
+            await websocket.send_bytes(payload)
+        else:
+            await websocket.send_text(payload)
+        estimator = self.bandwidth.get(websocket)
+        if estimator is not None:
+            estimator.observe(len(payload), time.perf_counter() - start)
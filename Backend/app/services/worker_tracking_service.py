@@ -1,24 +1,68 @@
+import heapq
+import time
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import event
+from app.core.config import settings
+from app.db_models.worker_profile import WorkerProfile
+from app.services.reid_gallery import ReIDGallery
 
 
 class WorkerTrackingService:
-    def __init__(self, lost_frame_threshold: int = 30):
+    """
+    Track -> worker assignments, with wall-clock expiry of lost tracks.
+
+    Every known track has exactly one entry in a min-heap keyed by the time
+    it would expire if it is never seen again. Seeing a track only updates
+    its last_seen timestamp; the heap entry is checked lazily when it
+    reaches the top, and pushed back with the new deadline if the track was
+    seen in the meantime. So per-frame work is proportional to the visible
+    tracks plus the few entries that come due, not to every track ever seen.
+    """
+
+    def __init__(self, lost_timeout: float = 5.0, reid: Optional[ReIDGallery] = None,
+                 reid_every: int = 5, reid_attempts: int = 10, person_class_id: int = 5):
+        # Detector class id of people (set from the loaded model's names)
+        self.person_class_id = person_class_id
+
         # track_id -> worker info mapping
         self.track_to_worker: dict = {}
         
-        # track_id -> consecutive frames where track was missing
-        self.lost_frame_counts: dict = {}
+        # track_id -> monotonic time the track was last visible
+        self.last_seen: dict = {}
+
+        # (deadline, track_id) min-heap, one entry per known track
+        self._expiry_heap: list = []
+
+        # Track ids visible in the previous update, for born/died changes
+        self._visible: set = set()
         
         # track_id -> last seen bbox (for modal snapshot)
         self.track_bboxes: dict = {}
         
-        # How many consecutive missing frames before we consider track lost
-        self.lost_frame_threshold = lost_frame_threshold
+        # Seconds a track may stay unseen before we consider it lost
+        self.lost_timeout = lost_timeout
         
         # Workers who left frame: track_id -> worker info (for notification)
         self.recently_left: dict = {}
 
+        # Appearance re-identification of lost workers (None = disabled)
+        self.reid = reid
+
+        # Refresh an assigned track's embedding every reid_every frames
+        self.reid_every = reid_every
+
+        # Frames a new track is matched against the gallery before giving up
+        self.reid_attempts = reid_attempts
+
+        # track_id -> gallery match attempts so far, counted from the
+        # track's first sighting whether or not anyone was lost yet
+        self.reid_attempt_counts: dict = {}
+
+        # track_id -> monotonic time the track first became visible
+        self.first_seen: dict = {}
+        self._frame_index = 0
+
     # ------------------------------------------------------------------
     # ASSIGNMENT
     # ------------------------------------------------------------------
@@ -38,58 +82,85 @@ class WorkerTrackingService:
         }
         # Clear from recently_left if they were there
         self.recently_left.pop(track_id, None)
+        if self.reid:
+            # A manual assignment wins over any pending automatic one
+            self.reid.remove_worker(worker.get("worker_id"))
+            self.reid.forget_track(track_id)
         return True
 
+    def update_worker_zone(self, worker_id, zone_assignment):
+        """Follow a zone_assignment change for a worker already assigned to a track"""
+        worker_id = str(worker_id)
+        for mapping in (self.track_to_worker, self.recently_left):
+            for track_id, worker in list(mapping.items()):
+                if str(worker.get("worker_id")) == worker_id:
+                    mapping[track_id] = {**worker, "zone_assignment": zone_assignment}
+
     def unassign_track(self, track_id: int):
         self.track_to_worker.pop(track_id, None)
+        if self.reid:
+            self.reid.forget_track(track_id)
 
     # ------------------------------------------------------------------
     # FRAME UPDATE — call this every frame with current detections
     # ------------------------------------------------------------------
 
-    def update_tracks(self, detections: list) -> dict:
+    def update_tracks(self, detections: list, frame=None, changes_only: bool = False) -> dict:
         """
-        Call every frame with YOLO detections.
+        Call every frame with YOLO detections, and the frame they were
+        detected on if re-identification should run.
         Returns a dict with:
         - active_tracks: current track_id -> {bbox, worker or None}
-        - lost_workers: workers who just crossed the lost threshold
+        - lost_workers: workers whose track just passed lost_timeout unseen
         - new_untracked: track_ids that are new and have no worker assigned
+        - reidentified_workers: lost workers matched to a new track this frame
+
+        With changes_only=True, active_tracks and new_untracked are replaced by
+        what changed since the previous update:
+        - born: track_id -> {bbox, worker} for tracks that became visible
+        - died: track_ids visible last update but not this one
+        - expired: track_ids dropped after lost_timeout
         """
+        now = time.monotonic()
+        self._frame_index += 1
         current_track_ids = set()
 
-        person_detections = [d for d in detections if d.get("class_id") == 5]
-
-        # Update bboxes for all currently visible tracks
-        for det in person_detections:
+        # Update bboxes and timestamps for all currently visible tracks
+        for det in detections:
+            if det.get("class_id") != self.person_class_id:
+                continue
             track_id = det.get("track_id")
             if track_id is None:
                 continue
             current_track_ids.add(track_id)
             self.track_bboxes[track_id] = det["bbox"]
-            # Reset lost counter since they're visible
-            self.lost_frame_counts.pop(track_id, None)
-
-        # Check previously known tracks that are missing this frame
-        lost_workers = []
-        all_known_track_ids = set(self.track_bboxes.keys())
-        missing_track_ids = all_known_track_ids - current_track_ids
-
-        for track_id in missing_track_ids:
-            self.lost_frame_counts[track_id] = self.lost_frame_counts.get(track_id, 0) + 1
-
-            if self.lost_frame_counts[track_id] >= self.lost_frame_threshold:
-                # Track is officially lost
-                worker_info = self.track_to_worker.get(track_id)
-                if worker_info:
-                    self.recently_left[track_id] = worker_info
-                    lost_workers.append({
-                        "track_id": track_id,
-                        "worker": worker_info
-                    })
-                # Clean up
-                self.track_to_worker.pop(track_id, None)
-                self.track_bboxes.pop(track_id, None)
-                self.lost_frame_counts.pop(track_id, None)
+            if track_id not in self.last_seen:
+                heapq.heappush(self._expiry_heap, (now + self.lost_timeout, track_id))
+                self.first_seen[track_id] = now
+            self.last_seen[track_id] = now
+
+        # Only the heap entries that have come due are looked at
+        lost_workers, expired = self._expire(now)
+
+        reidentified_workers = []
+        if self.reid and frame is not None:
+            reidentified_workers = self._reidentify(frame, current_track_ids)
+
+        previous_visible, self._visible = self._visible, current_track_ids
+        if changes_only:
+            return {
+                "born": {
+                    track_id: {
+                        "bbox": self.track_bboxes.get(track_id),
+                        "worker": self.track_to_worker.get(track_id, None)
+                    }
+                    for track_id in current_track_ids - previous_visible
+                },
+                "died": list(previous_visible - current_track_ids),
+                "expired": expired,
+                "lost_workers": lost_workers,
+                "reidentified_workers": reidentified_workers
+            }
 
         # New untracked: visible but no worker assigned
         new_untracked = [
@@ -108,9 +179,91 @@ class WorkerTrackingService:
         return {
             "active_tracks": active_tracks,
             "lost_workers": lost_workers,
-            "new_untracked": new_untracked
+            "new_untracked": new_untracked,
+            "reidentified_workers": reidentified_workers
         }
 
+    def _expire(self, now: float):
+        """Pop due heap entries; drop tracks unseen for lost_timeout, reschedule the rest"""
+        lost_workers, expired = [], []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, track_id = heapq.heappop(self._expiry_heap)
+            last_seen = self.last_seen.get(track_id)
+            if last_seen is None:
+                continue
+
+            deadline = last_seen + self.lost_timeout
+            if deadline > now:
+                # Seen since this entry was pushed
+                heapq.heappush(self._expiry_heap, (deadline, track_id))
+                continue
+
+            # Track is officially lost
+            expired.append(track_id)
+            worker_info = self.track_to_worker.get(track_id)
+            if worker_info:
+                self.recently_left[track_id] = worker_info
+                lost_workers.append({
+                    "track_id": track_id,
+                    "worker": worker_info
+                })
+            if self.reid:
+                # Keep their appearance so a new track can pick them up
+                self.reid.add_lost(track_id, worker_info, last_seen)
+                self.reid.forget_track(track_id)
+            # Clean up
+            self.track_to_worker.pop(track_id, None)
+            self.track_bboxes.pop(track_id, None)
+            self.last_seen.pop(track_id, None)
+            self.reid_attempt_counts.pop(track_id, None)
+            self.first_seen.pop(track_id, None)
+        return lost_workers, expired
+
+    # ------------------------------------------------------------------
+    # RE-IDENTIFICATION
+    # ------------------------------------------------------------------
+
+    def _reidentify(self, frame, current_track_ids: set) -> list:
+        """Refresh embeddings of assigned tracks and match new tracks to lost workers"""
+        candidates = {}
+        for track_id in current_track_ids:
+            bbox = self.track_bboxes[track_id]
+            if track_id in self.track_to_worker:
+                # Staggered by track id so refreshes spread across frames
+                if (track_id not in self.reid.track_embeddings
+                        or (self._frame_index + track_id) % self.reid_every == 0):
+                    self.reid.observe(track_id, self.reid.embed(frame, bbox))
+                continue
+
+            # Attempts run out on the same schedule with or without a gallery,
+            # so a long-visible stranger never becomes a "new" candidate
+            attempts = self.reid_attempt_counts.get(track_id, 0)
+            if attempts >= self.reid_attempts:
+                continue
+            self.reid_attempt_counts[track_id] = attempts + 1
+            if not len(self.reid):
+                continue
+            embedding = self.reid.embed(frame, bbox)
+            if embedding is not None:
+                candidates[track_id] = embedding
+
+        reidentified = []
+        for track_id, entry, similarity in self.reid.match(candidates, self.first_seen):
+            self.track_to_worker[track_id] = {
+                **entry["worker"],
+                "assigned_at": datetime.utcnow().isoformat()
+            }
+            self.reid.track_embeddings[track_id] = candidates[track_id]
+            self.recently_left.pop(entry["track_id"], None)
+            self.reid_attempt_counts.pop(track_id, None)
+            reidentified.append({
+                "track_id": track_id,
+                "previous_track_id": entry["track_id"],
+                "worker": self.track_to_worker[track_id],
+                "similarity": round(similarity, 3)
+            })
+        return reidentified
+
     # ------------------------------------------------------------------
     # GETTERS — used by HTTP routes
     # ------------------------------------------------------------------
@@ -141,10 +294,29 @@ class WorkerTrackingService:
 
     def reset(self):
         self.track_to_worker.clear()
-        self.lost_frame_counts.clear()
+        self.last_seen.clear()
+        self._expiry_heap.clear()
+        self._visible.clear()
         self.track_bboxes.clear()
         self.recently_left.clear()
+        self.reid_attempt_counts.clear()
+        self.first_seen.clear()
+        if self.reid:
+            self.reid.reset()
 
 
 # Singleton instance — import this everywhere
-worker_tracking_service = WorkerTrackingService(lost_frame_threshold=60)
\ No newline at end of file
+worker_tracking_service = WorkerTrackingService(
+    lost_timeout=settings.TRACK_LOST_TIMEOUT,
+    reid=ReIDGallery(
+        min_similarity=settings.REID_MIN_SIMILARITY,
+        ttl=settings.REID_GALLERY_TTL
+    ) if settings.REID_ENABLED else None
+)
+
+
+@event.listens_for(WorkerProfile, "after_insert")
+@event.listens_for(WorkerProfile, "after_update")
+def _follow_zone_assignment(mapper, connection, target):
+    # Zone checks re-run when a tracked worker's assignment changes
+    worker_tracking_service.update_worker_zone(target.user_id, target.zone_assignment)
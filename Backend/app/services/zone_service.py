@@ -0,0 +1,278 @@
+import time
+import cv2
+import numpy as np
+from datetime import datetime
+from app.core.config import settings
+
+
+class ZoneService:
+    """
+    Geofencing of tracked workers against per-camera polygon zones.
+
+    Zones are stored in normalized (0-1) coordinates and rasterized once per
+    (camera, frame size) into a single uint64 lookup grid where bit i is
+    set for pixels inside zone i. Locating every track is then one fancy-
+    indexing lookup of their foot points (bottom-centre of the box), no
+    matter how many zones overlap; a per-polygon test is never run per frame.
+
+    Per track the service keeps the bitmask of zones it was in last frame.
+    XOR with the new bitmask gives exactly the zones entered and exited, so
+    Python only loops over tracks whose zones actually changed.
+
+    Events:
+    - zone_enter / zone_exit (exit carries the dwell time)
+    - zone_dwell once per visit when a zone's max_dwell is exceeded
+    - zone_unauthorized when a track is in a restricted zone and its
+      worker's zone_assignment is not that zone (or nobody is assigned).
+      Checked on entry and again whenever the track's worker or that
+      worker's zone_assignment changes (assignment, re-ID), once per
+      unauthorized stay
+    """
+
+    MAX_ZONES = 64
+
+    def __init__(self, lookup_scale: float = 0.25, exit_timeout: float = 5.0):
+        # Lookup grid size relative to the frame; foot points don't need
+        # pixel precision and the smaller grid rasterizes faster
+        self.lookup_scale = lookup_scale
+
+        # Seconds a track may go unseen before it is treated as having left
+        self.exit_timeout = exit_timeout
+
+        # camera_id -> list of zone dicts (bit index = list position)
+        self.zones: dict = {}
+
+        # (camera_id, height, width) -> uint64 lookup grid
+        self._grid_cache: dict = {}
+
+        # camera_id -> restricted zones as a bitmask
+        self._restricted_bits: dict = {}
+
+        # camera_id -> track_id -> {"bits", "entered": {bit: t}, "dwell_alerted": set, "seen",
+        #                          "worker", "worker_key", "unauthorized": set of bits already flagged}
+        self._track_states: dict = {}
+
+    # ------------------------------------------------------------------
+    # ZONE CONFIG
+    # ------------------------------------------------------------------
+
+    def set_zones(self, camera_id: str, zones: list):
+        """
+        Replace the zones for a camera. Each zone is a dict with
+        zone_id, polygon ([[x, y], ...] in 0-1), and optionally name,
+        restricted and max_dwell (seconds). Empty list clears the camera.
+        """
+        if len(zones) > self.MAX_ZONES:
+            raise ValueError(f"At most {self.MAX_ZONES} zones per camera")
+
+        if zones:
+            self.zones[camera_id] = [
+                {
+                    "zone_id": zone["zone_id"],
+                    "name": zone.get("name") or zone["zone_id"],
+                    "polygon": [[float(x), float(y)] for x, y in zone["polygon"]],
+                    "restricted": bool(zone.get("restricted", False)),
+                    "max_dwell": zone.get("max_dwell"),
+                }
+                for zone in zones
+            ]
+            self._restricted_bits[camera_id] = sum(
+                1 << bit for bit, zone in enumerate(self.zones[camera_id]) if zone["restricted"]
+            )
+        else:
+            self.zones.pop(camera_id, None)
+            self._restricted_bits.pop(camera_id, None)
+
+        # Bit positions changed, so old per-track state is meaningless
+        self._track_states.pop(camera_id, None)
+        self._grid_cache = {
+            key: grid for key, grid in self._grid_cache.items() if key[0] != camera_id
+        }
+
+    def get_zones(self, camera_id: str) -> list:
+        return self.zones.get(camera_id, [])
+
+    def get_grid(self, camera_id: str, height: int, width: int):
+        """Rasterized zone bitmask grid for a frame size, or None if the camera has no zones"""
+        zones = self.zones.get(camera_id)
+        if not zones:
+            return None
+
+        key = (camera_id, height, width)
+        grid = self._grid_cache.get(key)
+        if grid is None:
+            grid_h = max(1, int(round(height * self.lookup_scale)))
+            grid_w = max(1, int(round(width * self.lookup_scale)))
+            scale = np.array([grid_w - 1, grid_h - 1], dtype=np.float32)
+
+            grid = np.zeros((grid_h, grid_w), dtype=np.uint64)
+            layer = np.zeros((grid_h, grid_w), dtype=np.uint8)
+            for bit, zone in enumerate(zones):
+                layer.fill(0)
+                points = np.round(np.asarray(zone["polygon"], dtype=np.float32) * scale).astype(np.int32)
+                cv2.fillPoly(layer, [points], 1)
+                grid[layer.astype(bool)] |= np.uint64(1 << bit)
+            self._grid_cache[key] = grid
+        return grid
+
+    # ------------------------------------------------------------------
+    # FRAME UPDATE — call this every frame after tracking
+    # ------------------------------------------------------------------
+
+    def locate(self, camera_id: str, active_tracks: dict, height: int, width: int) -> dict:
+        """track_id -> zone bitmask for every visible track with a box"""
+        grid = self.get_grid(camera_id, height, width)
+        if grid is None:
+            return {}
+
+        track_ids = [track_id for track_id, track in active_tracks.items() if track.get("bbox")]
+        if not track_ids:
+            return {}
+
+        boxes = np.array([active_tracks[track_id]["bbox"] for track_id in track_ids], dtype=np.float32)
+        grid_h, grid_w = grid.shape
+        xs = ((boxes[:, 0] + boxes[:, 2]) * 0.5 * (grid_w / width)).astype(np.int32)
+        ys = (boxes[:, 3] * (grid_h / height)).astype(np.int32)
+        bits = grid[np.clip(ys, 0, grid_h - 1), np.clip(xs, 0, grid_w - 1)]
+
+        return {track_id: int(value) for track_id, value in zip(track_ids, bits)}
+
+    def update(self, camera_id: str, active_tracks: dict, height: int, width: int) -> dict:
+        """
+        Returns a dict with:
+        - track_zones: track_id -> [zone_id, ...] for tracks inside a zone
+        - occupancy: zone_id -> [track_id, ...]
+        - events: enter / exit / dwell / unauthorized transitions this frame
+        """
+        zones = self.zones.get(camera_id)
+        if not zones:
+            return {"track_zones": {}, "occupancy": {}, "events": []}
+
+        now = time.monotonic()
+        timestamp = datetime.utcnow().isoformat()
+        located = self.locate(camera_id, active_tracks, height, width)
+        states = self._track_states.setdefault(camera_id, {})
+        restricted = self._restricted_bits.get(camera_id, 0)
+        events = []
+
+        for track_id, bits in located.items():
+            state = states.get(track_id)
+            if state is None:
+                state = states[track_id] = {
+                    "bits": 0, "entered": {}, "dwell_alerted": set(), "seen": now,
+                    "worker_key": None, "unauthorized": set(),
+                }
+            worker = active_tracks[track_id].get("worker")
+            worker_key = (worker.get("worker_id"), worker.get("zone_assignment")) if worker else None
+            state["seen"] = now
+            state["worker"] = worker
+
+            changed = state["bits"] ^ bits
+            if changed:
+                for bit in _bits(changed & state["bits"]):
+                    events.append(self._exit_event(zones[bit], track_id, worker, state, bit, now, timestamp))
+                for bit in _bits(changed & bits):
+                    state["entered"][bit] = now
+                    events.append(self._event("zone_enter", zones[bit], track_id, worker, timestamp))
+                state["bits"] = bits
+
+            # Authorization depends on the zones and on who the track is
+            if changed or worker_key != state["worker_key"]:
+                state["worker_key"] = worker_key
+                unauthorized = {
+                    bit for bit in _bits(bits & restricted) if not self._authorized(worker, zones[bit])
+                }
+                for bit in sorted(unauthorized - state["unauthorized"]):
+                    events.append(self._event("zone_unauthorized", zones[bit], track_id, worker, timestamp))
+                state["unauthorized"] = unauthorized
+
+            # Dwell limits, once per visit
+            for bit, entered in state["entered"].items():
+                max_dwell = zones[bit]["max_dwell"]
+                if max_dwell and bit not in state["dwell_alerted"] and now - entered >= max_dwell:
+                    state["dwell_alerted"].add(bit)
+                    event = self._event("zone_dwell", zones[bit], track_id, worker, timestamp)
+                    event["dwell_seconds"] = round(now - entered, 1)
+                    events.append(event)
+
+        # Tracks gone for longer than exit_timeout leave all their zones
+        for track_id in [t for t, state in states.items()
+                         if t not in located and now - state["seen"] >= self.exit_timeout]:
+            state = states.pop(track_id)
+            for bit in _bits(state["bits"]):
+                events.append(self._exit_event(zones[bit], track_id, state["worker"], state, bit, now, timestamp))
+
+        track_zones, occupancy = {}, {}
+        for track_id, state in states.items():
+            if not state["bits"]:
+                continue
+            zone_ids = [zones[bit]["zone_id"] for bit in _bits(state["bits"])]
+            track_zones[track_id] = zone_ids
+            for zone_id in zone_ids:
+                occupancy.setdefault(zone_id, []).append(track_id)
+
+        return {"track_zones": track_zones, "occupancy": occupancy, "events": events}
+
+    def get_occupancy(self, camera_id: str = None) -> dict:
+        """camera_id -> zone_id -> [{track_id, dwell_seconds}], for HTTP polling"""
+        now = time.monotonic()
+        cameras = [camera_id] if camera_id is not None else list(self.zones.keys())
+        occupancy = {}
+        for camera in cameras:
+            zones = self.zones.get(camera, [])
+            per_zone = {zone["zone_id"]: [] for zone in zones}
+            for track_id, state in self._track_states.get(camera, {}).items():
+                for bit in _bits(state["bits"]):
+                    per_zone[zones[bit]["zone_id"]].append({
+                        "track_id": track_id,
+                        "dwell_seconds": round(now - state["entered"].get(bit, now), 1),
+                    })
+            occupancy[camera] = per_zone
+        return occupancy
+
+    def reset(self, camera_id: str = None):
+        """Clear occupancy state (zones themselves are kept)"""
+        if camera_id is None:
+            self._track_states.clear()
+        else:
+            self._track_states.pop(camera_id, None)
+
+    # ------------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------------
+
+    def _authorized(self, worker: dict, zone: dict) -> bool:
+        if not worker:
+            return False
+        assigned = worker.get("zone_assignment")
+        return assigned is not None and assigned in (zone["zone_id"], zone["name"])
+
+    def _exit_event(self, zone, track_id, worker, state, bit, now, timestamp):
+        entered = state["entered"].pop(bit, now)
+        state["dwell_alerted"].discard(bit)
+        event = self._event("zone_exit", zone, track_id, worker, timestamp)
+        event["dwell_seconds"] = round(now - entered, 1)
+        return event
+
+    def _event(self, event_type, zone, track_id, worker, timestamp):
+        return {
+            "type": event_type,
+            "zone_id": zone["zone_id"],
+            "zone_name": zone["name"],
+            "restricted": zone["restricted"],
+            "track_id": track_id,
+            "worker": worker,
+            "timestamp": timestamp,
+        }
+
+
+def _bits(mask: int):
+    """Indices of the set bits in mask"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# Singleton instance — import this everywhere
+zone_service = ZoneService(exit_timeout=settings.TRACK_LOST_TIMEOUT)
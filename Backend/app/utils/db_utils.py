@@ -0,0 +1,32 @@
+import sqlite3
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Bound parameters allowed in one statement: asyncpg / the Postgres wire
+# protocol cap at 32767; SQLite before 3.32 at 999
+POSTGRES_MAX_PARAMS = 32767
+SQLITE_MAX_PARAMS = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+
+
+def dialect_insert(session):
+    """
+    Dialect-specific insert() with ON CONFLICT support.
+    Postgres in production, SQLite as the local stand-in.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upserts are not supported on '{dialect}'")
+
+
+def max_rows_per_statement(session, columns: int) -> int:
+    """Most rows a multi-row INSERT with this many bound columns per row can carry"""
+    dialect = session.get_bind().dialect.name
+    limit = SQLITE_MAX_PARAMS if dialect == "sqlite" else POSTGRES_MAX_PARAMS
+    return max(1, limit // columns)
+
+
+def chunked(rows: list, size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
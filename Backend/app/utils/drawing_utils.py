@@ -1,6 +1,6 @@
 import cv2
 
-def draw_detections(frame, detections, class_names, track_mappings=None):
+def draw_detections(frame, detections, class_names, track_mappings=None, ppe_status=None):
 
     # Class Groups
     positive_classes = ["hardhat", "helmet", "mask", "safety vest", "vest"]
@@ -56,6 +56,15 @@ def draw_detections(frame, detections, class_names, track_mappings=None):
         else:
             label = f"{class_names[cls]} {conf:.2f}"
 
+        # Append PPE violations linked to this person track
+        if class_name in person_classes and ppe_status and track_id in ppe_status:
+            missing = [item for item, state in ppe_status[track_id].items() if state == "violation"]
+            if missing:
+                label += " | NO " + ", ".join(item.upper() for item in missing)
+                color = (0, 0, 255)
+                text_color = (0, 255, 255)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+
         cv2.putText(
             frame, 
             label, 
@@ -66,4 +75,19 @@ def draw_detections(frame, detections, class_names, track_mappings=None):
             2
         )
         
-    return frame
\ No newline at end of file
+    return frame
+
+
+def draw_pose(frame, landmarks, connections, min_visibility: float = 0.5):
+    """Draw one person's skeleton from normalized landmarks, skipping joints below min_visibility"""
+    h, w = frame.shape[:2]
+    points = {
+        i: (int(lm["x"] * w), int(lm["y"] * h))
+        for i, lm in enumerate(landmarks) if lm["visibility"] >= min_visibility
+    }
+    for start, end in connections:
+        if start in points and end in points:
+            cv2.line(frame, points[start], points[end], (255, 0, 0), 2)
+    for point in points.values():
+        cv2.circle(frame, point, 2, (0, 255, 0), 2)
+    return frame
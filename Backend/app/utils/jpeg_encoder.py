@@ -0,0 +1,166 @@
+import base64
+import inspect
+import threading
+import time
+import cv2
+from app.core.config import settings
+
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_444, TJSAMP_422, TJSAMP_420, TJSAMP_GRAY, TJFLAG_FASTDCT
+except ImportError:  # optional — falls back to cv2.imencode
+    TurboJPEG = None
+
+
+# Per-client quality ladder, best first. min_kbps is the estimated
+# bandwidth a client needs for the tier to be picked automatically.
+# scale stays 1.0: boxes are sent in display pixels and the frontend draws
+# and hit-tests them against the image size without reading frame_scale.
+QUALITY_TIERS = {
+    "high":    {"quality": 80, "subsampling": "444", "scale": 1.0, "min_kbps": 6000},
+    "medium":  {"quality": 60, "subsampling": "420", "scale": 1.0, "min_kbps": 2500},
+    "low":     {"quality": 40, "subsampling": "420", "scale": 1.0, "min_kbps": 1000},
+    "minimal": {"quality": 25, "subsampling": "420", "scale": 1.0, "min_kbps": 0},
+}
+
+# Used until a client has a bandwidth estimate; matches the old fixed quality 60
+DEFAULT_TIER = "medium"
+
+
+def tier_for_bandwidth(kbps) -> str:
+    """Best tier a client with this estimated bandwidth can keep up with"""
+    if kbps is None:
+        return DEFAULT_TIER
+    for name, tier in QUALITY_TIERS.items():
+        if kbps >= tier["min_kbps"]:
+            return name
+    return "minimal"
+
+
+class JPEGEncoder:
+    """
+    JPEG encoding for outgoing frames, on libjpeg-turbo through PyTurboJPEG
+    when it is installed and loads, otherwise on cv2.imencode.
+
+    - subsampling: "444", "422", "420" or "gray" chroma subsampling
+    - scale: downscale before encoding (INTER_AREA into a reused buffer)
+    - fast_dct: faster, slightly less accurate DCT (turbo only)
+
+    Output and resize buffers are reused per thread, so the bytes returned by
+    encode() are only valid until the next encode() on the same thread; copy
+    them (bytes(...)) if they need to outlive that. Average encode time is
+    kept for /health.
+    """
+
+    def __init__(self, backend: str = "auto"):
+        self._turbo = None
+        if backend in ("auto", "turbo") and TurboJPEG is not None:
+            try:
+                self._turbo = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                # Python package present but the shared library is not
+                print(f"⚠️ libjpeg-turbo unavailable, using OpenCV JPEG: {e}")
+        if backend == "turbo" and self._turbo is None:
+            print("⚠️ JPEG_ENCODER=turbo requested but PyTurboJPEG is not usable, using OpenCV JPEG")
+
+        self.name = "turbojpeg" if self._turbo is not None else "opencv"
+
+        if self._turbo is not None:
+            self._turbo_subsampling = {
+                "444": TJSAMP_444, "422": TJSAMP_422, "420": TJSAMP_420, "gray": TJSAMP_GRAY,
+            }
+            # Newer PyTurboJPEG can encode into a caller-owned buffer
+            self._turbo_dst = "dst" in inspect.signature(self._turbo.encode).parameters
+        else:
+            self._cv2_subsampling = {
+                key: getattr(cv2, f"IMWRITE_JPEG_SAMPLING_FACTOR_{key}", None)
+                for key in ("444", "422", "420")
+            }
+
+        self._local = threading.local()
+
+        self.encoded = 0
+        self.avg_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # ENCODING
+    # ------------------------------------------------------------------
+
+    def encode(self, image, quality: int = 60, subsampling: str = "420",
+               scale: float = 1.0, fast_dct: bool = False):
+        """Encode a BGR frame; returns a bytes-like object (see class docstring)"""
+        start = time.perf_counter()
+        if scale != 1.0:
+            image = self._resize(image, scale)
+
+        if self._turbo is not None:
+            data = self._encode_turbo(image, quality, subsampling, fast_dct)
+        else:
+            data = self._encode_cv2(image, quality, subsampling)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.encoded += 1
+        self.avg_ms += (elapsed_ms - self.avg_ms) / min(self.encoded, 100)
+        return data
+
+    def encode_data_urls(self, images: list, tier: str = DEFAULT_TIER):
+        """([data URL per image], total encode ms) at a quality tier"""
+        options = {
+            key: value for key, value in QUALITY_TIERS.get(tier, QUALITY_TIERS[DEFAULT_TIER]).items()
+            if key != "min_kbps"
+        }
+        start = time.perf_counter()
+        urls = [
+            "data:image/jpeg;base64," + base64.b64encode(self.encode(image, **options)).decode("ascii")
+            for image in images
+        ]
+        return urls, round((time.perf_counter() - start) * 1000, 2)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "encoded": self.encoded, "avg_ms": round(self.avg_ms, 2)}
+
+    # ------------------------------------------------------------------
+    # BACKENDS
+    # ------------------------------------------------------------------
+
+    def _encode_turbo(self, image, quality, subsampling, fast_dct):
+        options = {
+            "quality": quality,
+            "jpeg_subsample": self._turbo_subsampling.get(subsampling, TJSAMP_420),
+            "flags": TJFLAG_FASTDCT if fast_dct else 0,
+        }
+        if not self._turbo_dst:
+            return self._turbo.encode(image, **options)
+
+        # Worst case for a JPEG is a little over the raw size
+        needed = image.shape[0] * image.shape[1] * 3 + 65536
+        dst = getattr(self._local, "dst", None)
+        if dst is None or len(dst) < needed:
+            dst = self._local.dst = bytearray(needed)
+        buffer, size = self._turbo.encode(image, dst=dst, **options)
+        return memoryview(buffer)[:size]
+
+    def _encode_cv2(self, image, quality, subsampling):
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        factor = self._cv2_subsampling.get(subsampling)
+        if factor is not None:
+            params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, factor]
+        ok, buf = cv2.imencode(".jpg", image, params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf
+
+    def _resize(self, image, scale):
+        h, w = image.shape[:2]
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        buffers = getattr(self._local, "resize", None)
+        if buffers is None:
+            buffers = self._local.resize = {}
+        key = (size, image.shape[2:], image.dtype)
+        dst = buffers.get(key)
+        dst = cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+        buffers[key] = dst
+        return dst
+
+
+# Shared instance — import this everywhere
+jpeg_encoder = JPEGEncoder(settings.JPEG_ENCODER)
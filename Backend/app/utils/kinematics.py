@@ -0,0 +1,249 @@
+import math
+import numpy as np
+
+# MediaPipe landmark indices used for kinematics
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+
+class RingBuffer:
+    """Fixed-capacity float buffer; the oldest value is overwritten when full"""
+
+    def __init__(self, capacity: int, width: int = 1):
+        self.values = np.full((capacity, width), np.nan, dtype=np.float64)
+        self.capacity = capacity
+        self.size = 0
+        self._head = 0
+
+    def push(self, *row):
+        self.values[self._head] = row
+        self._head = (self._head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def rows(self):
+        """Filled rows, in no particular order"""
+        return self.values[:self.size]
+
+    def count_since(self, t0: float) -> int:
+        """Rows whose first column (a timestamp) is >= t0"""
+        return int(np.count_nonzero(self.rows()[:, 0] >= t0))
+
+
+class PeakDetector:
+    """
+    Online peak detection with a prominence threshold: a maximum is
+    reported once the signal has fallen `prominence` below it, and the
+    next one can only start after it has risen `prominence` above the
+    trough in between. Noise smaller than the prominence never produces
+    a peak, and only a handful of floats are kept.
+    """
+
+    def __init__(self, prominence: float, min_height: float = -math.inf):
+        self.prominence = prominence
+        self.min_height = min_height
+
+        self._rising = False
+        self._extreme = None
+        self._extreme_t = None
+        self._extreme_aux = None
+
+    def update(self, value: float, t: float, aux=None):
+        """Feed one sample; returns (peak value, peak time, aux at the peak) when one is confirmed"""
+        if self._extreme is None:
+            self._extreme = value
+            return None
+
+        if self._rising:
+            if value > self._extreme:
+                self._extreme, self._extreme_t, self._extreme_aux = value, t, aux
+            elif value < self._extreme - self.prominence:
+                peak = (self._extreme, self._extreme_t, self._extreme_aux)
+                self._rising = False
+                self._extreme = value
+                return peak if peak[0] >= self.min_height else None
+        else:
+            if value < self._extreme:
+                self._extreme = value
+            elif value > self._extreme + self.prominence:
+                self._rising = True
+                self._extreme, self._extreme_t, self._extreme_aux = value, t, aux
+        return None
+
+
+class TrackKinematics:
+    """
+    Streaming movement analysis for one tracked person, in constant memory.
+
+    Per pose sample it measures trunk flexion, hand height relative to the
+    hips and each upper arm's elevation, and runs online peak detection on
+    them:
+    - bend: a trunk flexion peak above bend_angle
+    - lift: a bend whose hands reached below lift_hand_drop torso lengths
+      under the hips at the bottom of the bend
+    - arm_cycle: an upper-arm elevation peak above arm_cycle_angle
+
+    Event times go into ring buffers for per-minute rates; a downsampled
+    ring of recent angles detects static postures. modifiers() turns both
+    into the RULA muscle-use / force and REBA load / activity adjustments.
+    """
+
+    # Worksheet thresholds: repeated = more than 4 times a minute,
+    # static = held for more than a minute
+    REPEAT_PER_MINUTE = 4
+    STATIC_SECONDS = 60.0
+
+    def __init__(self, bend_angle: float = 45.0, bend_prominence: float = 20.0,
+                 lift_hand_drop: float = 0.8, arm_cycle_angle: float = 60.0,
+                 arm_prominence: float = 30.0, sample_interval: float = 0.5,
+                 static_range: float = 10.0, static_angle: float = 20.0, event_capacity: int = 64):
+        self.lift_hand_drop = lift_hand_drop
+        self.sample_interval = sample_interval
+        self.static_range = static_range
+        self.static_angle = static_angle
+
+        self._bend_peaks = PeakDetector(bend_prominence, min_height=bend_angle)
+        self._arm_peaks = [PeakDetector(arm_prominence, min_height=arm_cycle_angle) for _ in range(2)]
+
+        # Event timestamps; capacity only needs to cover one minute of events
+        self.bends = RingBuffer(event_capacity)
+        self.lifts = RingBuffer(event_capacity)
+        self.arm_cycles = [RingBuffer(event_capacity) for _ in range(2)]
+
+        # (t, trunk flexion, left arm elevation, right arm elevation) every sample_interval
+        self.samples = RingBuffer(int(math.ceil(self.STATIC_SECONDS / sample_interval)) + 8, width=4)
+        self._last_sample_t = -math.inf
+
+        self.last_t = None
+
+    # ------------------------------------------------------------------
+    # SIGNALS
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def measure(landmarks: list, aspect: float = 1.0) -> dict:
+        """Trunk flexion, hand drop and arm elevations (NaN where joints are unreliable)"""
+        def point(i):
+            lm = landmarks[i]
+            ok = lm.get("reliable", lm["visibility"] >= 0.5)
+            return np.array([lm["x"] * aspect, lm["y"], lm["z"] * aspect]) if ok else None
+
+        shoulders = [point(LEFT_SHOULDER), point(RIGHT_SHOULDER)]
+        hips = [point(LEFT_HIP), point(RIGHT_HIP)]
+        elbows = [point(LEFT_ELBOW), point(RIGHT_ELBOW)]
+        wrists = [point(LEFT_WRIST), point(RIGHT_WRIST)]
+
+        seen_shoulders = [p for p in shoulders if p is not None]
+        seen_hips = [p for p in hips if p is not None]
+        trunk = hand_drop = math.nan
+        down = np.array([0.0, 1.0, 0.0])
+        if seen_shoulders and seen_hips:
+            shoulder_mid = np.mean(seen_shoulders, axis=0)
+            hip_mid = np.mean(seen_hips, axis=0)
+            axis = shoulder_mid - hip_mid
+            torso = np.linalg.norm(axis)
+            if torso > 1e-6:
+                trunk = math.degrees(math.acos(max(-1.0, min(1.0, -axis[1] / torso))))
+                down = -axis / torso
+                seen_wrists = [p for p in wrists if p is not None]
+                if seen_wrists:
+                    # Image y grows downwards: positive = hands below the hips
+                    hand_drop = (max(p[1] for p in seen_wrists) - hip_mid[1]) / torso
+
+        arms = []
+        for shoulder, elbow in zip(shoulders, elbows):
+            if shoulder is None or elbow is None:
+                arms.append(math.nan)
+                continue
+            upper = elbow - shoulder
+            norm = np.linalg.norm(upper)
+            arms.append(
+                math.degrees(math.acos(max(-1.0, min(1.0, float(upper @ down) / norm)))) if norm > 1e-6 else math.nan
+            )
+
+        return {"trunk_flexion": trunk, "hand_drop": hand_drop, "arm_elevation": arms}
+
+    # ------------------------------------------------------------------
+    # UPDATE
+    # ------------------------------------------------------------------
+
+    def update(self, landmarks: list, aspect: float, now: float) -> dict:
+        """Feed one pose sample; returns the signals and the events it completed"""
+        signals = self.measure(landmarks, aspect)
+        events = []
+
+        trunk = signals["trunk_flexion"]
+        if not math.isnan(trunk):
+            peak = self._bend_peaks.update(trunk, now, aux=signals["hand_drop"])
+            if peak is not None:
+                _, peak_t, hand_drop = peak
+                self.bends.push(peak_t)
+                events.append("bend")
+                if hand_drop is not None and hand_drop >= self.lift_hand_drop:
+                    self.lifts.push(peak_t)
+                    events.append("lift")
+
+        for side, elevation in enumerate(signals["arm_elevation"]):
+            if math.isnan(elevation):
+                continue
+            if self._arm_peaks[side].update(elevation, now) is not None:
+                self.arm_cycles[side].push(now)
+                events.append("arm_cycle")
+
+        if now - self._last_sample_t >= self.sample_interval:
+            self.samples.push(now, trunk, *signals["arm_elevation"])
+            self._last_sample_t = now
+
+        self.last_t = now
+        return {"signals": signals, "events": events}
+
+    # ------------------------------------------------------------------
+    # RATES / MODIFIERS
+    # ------------------------------------------------------------------
+
+    def rates(self, now: float) -> dict:
+        """Events in the last minute"""
+        since = now - 60.0
+        return {
+            "bends_per_min": self.bends.count_since(since),
+            "lifts_per_min": self.lifts.count_since(since),
+            "arm_cycles_per_min": max(ring.count_since(since) for ring in self.arm_cycles),
+        }
+
+    def is_static(self, now: float) -> bool:
+        """Trunk or an arm held away from neutral, nearly still, for STATIC_SECONDS"""
+        rows = self.samples.rows()
+        window = rows[rows[:, 0] >= now - self.STATIC_SECONDS]
+        # Needs (almost) a full window of samples to call it static
+        if len(window) < 2 or window[:, 0].min() > now - self.STATIC_SECONDS + 2 * self.sample_interval:
+            return False
+        for column in (1, 2, 3):
+            values = window[:, column]
+            values = values[~np.isnan(values)]
+            if len(values) < len(window) // 2:
+                continue
+            if values.max() - values.min() <= self.static_range and values.mean() >= self.static_angle:
+                return True
+        return False
+
+    def modifiers(self, now: float) -> dict:
+        """
+        RULA muscle_use / force and REBA load / activity from recent movement.
+        The handled weight can't be seen, so lifting is scored as a 2-10 kg
+        load: RULA force 1 (intermittent) or 2 (repeated), REBA load 1.
+        """
+        rates = self.rates(now)
+        static = self.is_static(now)
+        repeated_small = rates["arm_cycles_per_min"] > self.REPEAT_PER_MINUTE
+        repeated_large = rates["bends_per_min"] > self.REPEAT_PER_MINUTE
+        lifting = rates["lifts_per_min"] > 0
+
+        return {
+            "muscle_use": int(static or repeated_small or repeated_large),
+            "force": (2 if rates["lifts_per_min"] > self.REPEAT_PER_MINUTE else 1) if lifting else 0,
+            "load": int(lifting),
+            "activity": int(static) + int(repeated_small) + int(repeated_large),
+            "static": static,
+            **rates,
+        }
@@ -0,0 +1,160 @@
+import math
+import threading
+import time
+import numpy as np
+
+
+class LandmarkFilter:
+    """
+    Temporal smoothing and confidence gating for pose landmarks, between
+    the pose detector and ergonomic scoring.
+
+    Each (stream, person) key keeps a One-Euro filter over all 33 joints
+    at once: a low-pass filter whose cutoff rises with joint speed, so a
+    joint holding still is smoothed hard (no score flicker) while fast
+    movement is followed with little lag.
+
+    Visibility is smoothed as well and gated with hysteresis, so a joint
+    hovering around the threshold doesn't toggle every frame. Joints below
+    the gate are marked unreliable and keep their last filtered position
+    instead of following a guessed landmark; a joint unseen for longer
+    than reset_after seconds restarts from its next observation.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 10.0, d_cutoff: float = 1.0,
+                 min_visibility: float = 0.5, hysteresis: float = 0.1,
+                 visibility_smoothing: float = 0.5, reset_after: float = 1.0, ttl: float = 30.0):
+        # Cutoff (Hz) for a still joint, and how fast it rises with speed
+        # (normalized image units per second)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+
+        # Cutoff (Hz) for the speed estimate itself
+        self.d_cutoff = d_cutoff
+
+        # A joint becomes reliable at min_visibility and stays reliable
+        # until it drops below min_visibility - hysteresis
+        self.min_visibility = min_visibility
+        self.hysteresis = hysteresis
+
+        # EMA weight of the newest visibility reading
+        self.visibility_smoothing = visibility_smoothing
+
+        # Seconds a joint (or a whole person) may go unseen before its
+        # filter restarts instead of interpolating across the gap
+        self.reset_after = reset_after
+
+        # Seconds before state for a stream nobody updates is dropped
+        self.ttl = ttl
+
+        # (stream_id, person) -> {"t", "x", "dx", "visibility", "reliable", "seen"}.
+        # Streams run on several scheduler threads, so the dict is only
+        # touched under _lock; one stream's entries are never filtered concurrently
+        self._state: dict = {}
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # FILTERING
+    # ------------------------------------------------------------------
+
+    def filter(self, stream_id: str, landmarks: list, person=0, timestamp: float = None) -> list:
+        """
+        Smooth one person's landmarks. Returns new dicts with filtered
+        x, y, z, smoothed visibility and a 'reliable' flag per joint.
+        """
+        if not landmarks:
+            return landmarks
+
+        now = time.monotonic() if timestamp is None else timestamp
+        raw = np.array(
+            [[lm["x"], lm["y"], lm["z"], lm["visibility"]] for lm in landmarks],
+            dtype=np.float32
+        )
+        x, visibility = raw[:, :3], raw[:, 3]
+
+        key = (stream_id, person)
+        with self._lock:
+            state = self._state.get(key)
+        if state is None or now - state["t"] > self.reset_after or len(state["x"]) != len(x):
+            reliable = visibility >= self.min_visibility
+            state = {
+                "t": now,
+                "x": x.copy(),
+                "dx": np.zeros_like(x),
+                "visibility": visibility.copy(),
+                "reliable": reliable,
+                "seen": np.full(len(x), now),
+            }
+            with self._lock:
+                self._state[key] = state
+        else:
+            self._step(state, x, visibility, now)
+
+        with self._lock:
+            self._calls += 1
+            if self._calls % 256 == 0:
+                self._expire(now)
+
+        filtered, smoothed, reliable = state["x"], state["visibility"], state["reliable"]
+        return [
+            {
+                "x": float(filtered[i, 0]),
+                "y": float(filtered[i, 1]),
+                "z": float(filtered[i, 2]),
+                "visibility": float(smoothed[i]),
+                "reliable": bool(reliable[i]),
+            }
+            for i in range(len(filtered))
+        ]
+
+    def _step(self, state, x, visibility, now):
+        dt = max(now - state["t"], 1e-3)
+        state["t"] = now
+
+        # Visibility EMA, then the hysteresis gate
+        smoothed = state["visibility"]
+        smoothed += self.visibility_smoothing * (visibility - smoothed)
+        threshold = np.where(state["reliable"], self.min_visibility - self.hysteresis, self.min_visibility)
+        reliable = smoothed >= threshold
+        state["reliable"] = reliable
+
+        # Joints back after a long gap restart from the new observation
+        restart = reliable & (now - state["seen"] > self.reset_after)
+        update = reliable & ~restart
+        state["seen"][reliable] = now
+
+        # One-Euro over all joints at once; unreliable joints hold position
+        prev_x, prev_dx = state["x"], state["dx"]
+        dx = prev_dx + self._alpha(self.d_cutoff, dt) * ((x - prev_x) / dt - prev_dx)
+        speed = np.linalg.norm(dx, axis=1, keepdims=True)
+        alpha = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        filtered = prev_x + alpha * (x - prev_x)
+
+        state["x"] = np.where(update[:, None], filtered, np.where(restart[:, None], x, prev_x))
+        state["dx"] = np.where(update[:, None], dx, 0.0)
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor of a first-order low-pass at this cutoff (Hz)"""
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    # ------------------------------------------------------------------
+    # STATE
+    # ------------------------------------------------------------------
+
+    def _expire(self, now):
+        """Drop state unseen for ttl; call with the lock held"""
+        for key in [key for key, state in self._state.items() if now - state["t"] > self.ttl]:
+            del self._state[key]
+
+    def release(self, stream_id: str):
+        """Drop the filters for every person on a stream"""
+        with self._lock:
+            for key in [key for key in self._state if key[0] == stream_id]:
+                del self._state[key]
+
+    def reset(self):
+        with self._lock:
+            self._state.clear()
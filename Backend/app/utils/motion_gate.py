@@ -0,0 +1,141 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap change detector that sits in front of full inference.
+    Each frame is downscaled to a small blurred grayscale image and diffed
+    against the last frame that was actually processed. Only when enough
+    pixels inside the camera ROI changed (or too many frames were skipped)
+    does the gate let the frame through to YOLO + MediaPipe.
+
+    ROI polygons are stored per camera in normalized (0-1) coordinates, so
+    the same zones work at any frame size. Masks are rasterized once per
+    (camera, size) and cached.
+    """
+
+    def __init__(self, threshold: float = 0.004, max_skip: int = 15,
+                 diff_level: int = 25, work_width: int = 160):
+        # Fraction of ROI pixels that must change to count as motion
+        self.threshold = threshold
+
+        # Force a full inference pass after this many static frames so
+        # tracks and detections never go fully stale
+        self.max_skip = max_skip
+
+        # Per-pixel gray level difference that counts as "changed"
+        self.diff_level = diff_level
+
+        # Width of the downscaled image used for differencing
+        self.work_width = work_width
+
+        # camera_id -> list of polygons, each [[x, y], ...] in 0-1 coords
+        self.roi_polygons: dict = {}
+
+        # (camera_id, height, width) -> uint8 mask, 255 inside the ROI
+        self._mask_cache: dict = {}
+
+        # stream_id -> {"reference": gray frame, "skipped": int}
+        self._state: dict = {}
+
+    # ------------------------------------------------------------------
+    # ROI
+    # ------------------------------------------------------------------
+
+    def set_roi(self, camera_id: str, polygons: list):
+        """Replace the ROI polygons for a camera. Empty list clears the ROI."""
+        if polygons:
+            self.roi_polygons[camera_id] = [
+                [[float(x), float(y)] for x, y in polygon] for polygon in polygons
+            ]
+        else:
+            self.roi_polygons.pop(camera_id, None)
+
+        self._mask_cache = {
+            key: mask for key, mask in self._mask_cache.items() if key[0] != camera_id
+        }
+
+    def get_roi(self, camera_id: str) -> list:
+        return self.roi_polygons.get(camera_id, [])
+
+    def get_mask(self, camera_id: str, height: int, width: int):
+        """Rasterized ROI mask for a frame size, or None if the whole frame is relevant"""
+        polygons = self.roi_polygons.get(camera_id)
+        if not polygons:
+            return None
+
+        key = (camera_id, height, width)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = np.zeros((height, width), dtype=np.uint8)
+            scale = np.array([width - 1, height - 1], dtype=np.float32)
+            points = [
+                np.round(np.asarray(polygon, dtype=np.float32) * scale).astype(np.int32)
+                for polygon in polygons
+            ]
+            cv2.fillPoly(mask, points, 255)
+            self._mask_cache[key] = mask
+        return mask
+
+    def filter_detections(self, detections: list, camera_id: str, height: int, width: int) -> list:
+        """Drop detections whose box centre falls outside the camera ROI"""
+        mask = self.get_mask(camera_id, height, width)
+        if mask is None or not detections:
+            return detections
+
+        boxes = np.array([det["bbox"] for det in detections], dtype=np.int32)
+        xs = np.clip((boxes[:, 0] + boxes[:, 2]) // 2, 0, width - 1)
+        ys = np.clip((boxes[:, 1] + boxes[:, 3]) // 2, 0, height - 1)
+        keep = mask[ys, xs] > 0
+
+        return [det for det, inside in zip(detections, keep) if inside]
+
+    # ------------------------------------------------------------------
+    # MOTION CHECK — call this every frame before inference
+    # ------------------------------------------------------------------
+
+    def should_process(self, stream_id: str, frame, camera_id: str = None) -> bool:
+        """
+        Returns True when the frame differs enough from the last processed
+        frame of this stream (inside the ROI) to be worth running inference on.
+        """
+        height, width = frame.shape[:2]
+        work_height = max(1, int(height * self.work_width / width))
+
+        small = cv2.resize(frame, (self.work_width, work_height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        state = self._state.get(stream_id)
+        if state is None or state["reference"].shape != gray.shape:
+            self._state[stream_id] = {"reference": gray, "skipped": 0}
+            return True
+
+        diff = cv2.absdiff(gray, state["reference"])
+        _, changed = cv2.threshold(diff, self.diff_level, 255, cv2.THRESH_BINARY)
+
+        mask = self.get_mask(camera_id or stream_id, work_height, self.work_width)
+        if mask is not None:
+            changed = cv2.bitwise_and(changed, mask)
+            area = max(1, cv2.countNonZero(mask))
+        else:
+            area = changed.size
+
+        changed_ratio = cv2.countNonZero(changed) / area
+
+        if changed_ratio >= self.threshold or state["skipped"] >= self.max_skip:
+            # Compare against the last processed frame, not the previous one,
+            # so slow movement still accumulates into a trigger
+            state["reference"] = gray
+            state["skipped"] = 0
+            return True
+
+        state["skipped"] += 1
+        return False
+
+    def reset(self, stream_id: str = None):
+        if stream_id is None:
+            self._state.clear()
+        else:
+            self._state.pop(stream_id, None)
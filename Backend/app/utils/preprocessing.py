@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+
+
+def letterbox(frame, size: int, pad_value: int = 114):
+    """
+    Resize a frame to fit a size x size square without distorting it and pad
+    the rest. Returns (image, scale, (pad_x, pad_y)) so boxes can be mapped
+    back with (v - pad) / scale.
+    """
+    h, w = frame.shape[:2]
+    scale = min(size / w, size / h)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    image = np.full((size, size, 3), pad_value, dtype=frame.dtype)
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    image[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(frame, (new_w, new_h), interpolation=interpolation)
+    return image, scale, (pad_x, pad_y)
+
+
+def fit_within(frame, max_width: int, max_height: int):
+    """Downscale keeping aspect ratio so the frame fits max_width x max_height (0 = no limit)"""
+    h, w = frame.shape[:2]
+    limits = [limit / side for limit, side in ((max_width, w), (max_height, h)) if limit]
+    scale = min(limits + [1.0])
+    if scale >= 1.0:
+        return frame, 1.0
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), scale
+
+
+class PreparedFrame:
+    """
+    One source frame resized once per consumer, straight from the source:
+    - display: aspect-preserving, capped at the display size. Annotations
+      are drawn on it and every box the pipeline returns is in its pixels,
+      so the frontend can draw over the returned frame as before
+    - detect_input: letterboxed square at the detector's native input size,
+      so ultralytics has nothing left to resize
+    - pose_input: aspect-preserving at the (lower) pose resolution
+    """
+
+    def __init__(self, source, detect_size: int, pose_width: int, display_width: int, display_height: int):
+        self.source = source
+        self.display, self.display_scale = fit_within(source, display_width, display_height)
+        self.detect_size = detect_size
+        self._detect_input = None
+        self._pose_input = None
+        self._pose_width = pose_width
+
+    @property
+    def display_size(self):
+        """(height, width) of the display frame"""
+        return self.display.shape[:2]
+
+    @property
+    def detect_input(self):
+        if self._detect_input is None:
+            self._detect_input, self.detect_scale, self.detect_pad = letterbox(self.source, self.detect_size)
+        return self._detect_input
+
+    @property
+    def pose_input(self):
+        # Built lazily so a skipped pose pass costs nothing
+        if self._pose_input is None:
+            self._pose_input, _ = fit_within(self.source, self._pose_width, 0)
+        return self._pose_input
+
+    def to_display(self, detections: list) -> list:
+        """Map boxes (and pose keypoints) from letterboxed detector input to display pixels, in place"""
+        factor = self.display_scale / self.detect_scale
+        pad_x, pad_y = self.detect_pad
+        height, width = self.display_size
+        for det in detections:
+            x1, y1, x2, y2 = det["bbox"]
+            det["bbox"] = [
+                int(min(max((x1 - pad_x) * factor, 0), width - 1)),
+                int(min(max((y1 - pad_y) * factor, 0), height - 1)),
+                int(min(max((x2 - pad_x) * factor, 0), width - 1)),
+                int(min(max((y2 - pad_y) * factor, 0), height - 1)),
+            ]
+            if det.get("keypoints"):
+                det["keypoints"] = [
+                    [(x - pad_x) * factor, (y - pad_y) * factor, conf] for x, y, conf in det["keypoints"]
+                ]
+        return detections
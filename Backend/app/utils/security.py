@@ -1,16 +1,113 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import OrderedDict
+from urllib.parse import parse_qs
+import hashlib
+import threading
+import time
+import uuid
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.database import get_db
-from app.db_models import User
+from app.database import get_async_db, AsyncSessionLocal
+from app.services.roster_cache import roster_cache, UserRecord
 
 # JWT token bearer
 security = HTTPBearer()
 
+
+class TokenCache:
+    """
+    Bounded LRU of verified JWT payloads, keyed by the SHA-256 digest of the
+    token so raw tokens are never kept in memory.
+
+    A hit skips the HS256 signature check entirely. Entries expire at the
+    token's own exp (or after max_ttl if it has none), and revoked tokens
+    are remembered until they would have expired anyway.
+    """
+
+    def __init__(self, maxsize: int = 4096, max_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: OrderedDict = OrderedDict()   # digest -> (payload, expires_at)
+        self._revoked: dict = {}                     # digest -> expires_at
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        now = time.time()
+        expires_at = float(exp) if isinstance(exp, (int, float)) else now + self.max_ttl
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        key = self.digest(token)
+        with self._lock:
+            expires_at = self._revoked.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._revoked[key]
+                return False
+            return True
+
+    def revoke(self, token: str, payload: Optional[dict] = None):
+        """Reject this token from now on, even though its signature is valid"""
+        key = self.digest(token)
+        exp = (payload or {}).get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else time.time() + self.max_ttl
+        now = time.time()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked[key] = expires_at
+            # Prune revocations that have expired on their own
+            for stale in [k for k, t in self._revoked.items() if t <= now]:
+                del self._revoked[stale]
+
+    def revoke_user(self, user_id: str = None):
+        """Drop every cached token for a user (None = everyone) so the next request re-verifies"""
+        if user_id is None:
+            self.clear()
+            return
+        user_id = str(user_id)
+        with self._lock:
+            for key in [k for k, (p, _) in self._entries.items() if str(p.get("sub")) == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+# Deactivated / deleted users (ORM events or NOTIFY) lose their cached tokens
+roster_cache.on_revoke(token_cache.revoke_user)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -24,33 +121,49 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict:
-    """Decode JWT token"""
+    """Decode JWT token (verified payloads are cached until exp)"""
+    if token_cache.is_revoked(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    token_cache.put(token, payload)
+    return payload
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
+    db: AsyncSession = Depends(get_async_db)
+) -> UserRecord:
+    """Get current authenticated user from JWT token (served from the roster cache)"""
     token = credentials.credentials
     payload = decode_access_token(token)
     
     user_id: str = payload.get("sub")
-    if user_id is None:
+    try:
+        user_uuid = uuid.UUID(str(user_id))
+    except ValueError:
+        user_uuid = None
+    if user_uuid is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await roster_cache.get_user(db, user_uuid)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,7 +178,7 @@ async def get_current_user(
     
     return user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin_user(current_user: UserRecord = Depends(get_current_user)) -> UserRecord:
     """Verify current user is admin"""
     if current_user.role.value != "admin":
         raise HTTPException(
@@ -74,3 +187,68 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
         )
     return current_user
 
+
+class WebSocketAuthMiddleware:
+    """
+    ASGI middleware that authenticates WebSocket handshakes once, at connect
+    time, through the token cache. The token is read from the "token" query
+    parameter or an Authorization: Bearer header; the verified payload is
+    exposed as websocket.state.token_payload. Invalid or revoked tokens, and
+    tokens of users that no longer exist or are inactive (checked through
+    the roster cache, as get_current_user does), are rejected before the
+    handler runs. With require_auth=False, connections
+    without a token are let through unchanged.
+    """
+
+    def __init__(self, app, require_auth: bool = False):
+        self.app = app
+        self.require_auth = require_auth
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "websocket":
+            return await self.app(scope, receive, send)
+
+        token = self._extract_token(scope)
+        payload = None
+        if token:
+            try:
+                payload = decode_access_token(token)
+            except HTTPException:
+                payload = None
+            if payload is not None and not await self._user_is_active(payload):
+                payload = None
+
+        if payload is None and (token or self.require_auth):
+            # Closing before accept rejects the handshake (HTTP 403)
+            await send({"type": "websocket.close", "code": 1008})
+            return
+
+        if payload is not None:
+            scope.setdefault("state", {})["token_payload"] = payload
+        return await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _user_is_active(payload: dict) -> bool:
+        try:
+            user_id = uuid.UUID(str(payload.get("sub")))
+        except ValueError:
+            return False
+        try:
+            async with AsyncSessionLocal() as db:
+                user = await roster_cache.get_user(db, user_id)
+        except Exception as e:
+            print(f"⚠️ WebSocket auth user lookup failed: {e}")
+            return False
+        return user is not None and user.is_active
+
+    @staticmethod
+    def _extract_token(scope) -> Optional[str]:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("token"):
+            return query["token"][0]
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and credentials:
+                    return credentials
+        return None
@@ -0,0 +1,81 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional — falls back to stdlib json
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional — msgpack clients are rejected without it
+    msgpack = None
+
+from fastapi.responses import JSONResponse
+
+
+def _default(obj):
+    """Fallback for numpy scalars / arrays that slip into result dicts"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class JSONSerializer:
+    name = "json"
+    binary = False
+
+    def dumps(self, data) -> str:
+        return json.dumps(data, default=_default, separators=(",", ":"))
+
+
+class ORJSONSerializer:
+    name = "orjson"
+    binary = False
+
+    def __init__(self):
+        # NON_STR_KEYS: active_tracks is keyed by int track_id
+        self.options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, data) -> str:
+        return orjson.dumps(data, default=_default, option=self.options).decode("utf-8")
+
+    def dumps_bytes(self, data) -> bytes:
+        return orjson.dumps(data, default=_default, option=self.options)
+
+
+class MsgpackSerializer:
+    name = "msgpack"
+    binary = True
+
+    def dumps(self, data) -> bytes:
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+SERIALIZERS = {"json": JSONSerializer()}
+if orjson is not None:
+    SERIALIZERS["orjson"] = ORJSONSerializer()
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = MsgpackSerializer()
+
+# Text JSON either way, so the default is invisible to existing clients
+default_serializer = SERIALIZERS.get("orjson", SERIALIZERS["json"])
+
+
+def get_serializer(name: str = None):
+    """Look up a serializer by name. None returns the default; unknown names raise."""
+    if name is None:
+        return default_serializer
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unsupported encoding '{name}'. Available: {', '.join(SERIALIZERS)}")
+    return SERIALIZERS[name]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it's installed"""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return SERIALIZERS["orjson"].dumps_bytes(content)
+        return JSONSerializer().dumps(content).encode("utf-8")
@@ -0,0 +1,184 @@
+import cv2
+
+try:
+    import av
+except ImportError:  # optional — falls back to cv2.VideoCapture
+    av = None
+
+
+class VideoDecoder:
+    """
+    Frame source for uploaded files and CCTV recordings.
+
+    With PyAV the FFmpeg decoder runs multithreaded (frame + slice threads)
+    off the GIL, and frames are converted to BGR by swscale directly at the
+    requested output size, so a 4K file never exists as a full-size BGR
+    array. Without PyAV it falls back to cv2.VideoCapture, asking OpenCV for
+    hardware decoding where the build supports it.
+
+    - every_nth: yield one frame in N. Skipped frames are still decoded
+      (later frames reference them) but never converted or resized; with
+      cv2 they are grab()bed without retrieve()
+    - keyframes_only: have the decoder drop everything but keyframes
+      (PyAV only; cv2 falls back to roughly one frame per second)
+    - start_frame / end_frame: seek straight to a frame range, e.g. one
+      chunk from chunk_ranges()
+    - max_width: downscale output frames to at most this width (0 = source)
+    - loop: restart from start_frame at end of file (CCTV playback)
+
+    Iterating yields (frame_index, frame) tuples.
+    """
+
+    def __init__(self, path: str, every_nth: int = 1, keyframes_only: bool = False,
+                 start_frame: int = 0, end_frame: int = None, max_width: int = 0,
+                 threads: int = 0, loop: bool = False, backend: str = "auto"):
+        self.path = path
+        self.every_nth = max(1, int(every_nth))
+        self.keyframes_only = keyframes_only
+        self.start_frame = max(0, int(start_frame))
+        self.end_frame = end_frame
+        self.max_width = max_width
+        self.threads = threads
+        self.loop = loop
+
+        self._container = None
+        self._stream = None
+        self._cap = None
+
+        if backend in ("auto", "pyav") and av is not None:
+            self._open_pyav()
+        else:
+            self._open_cv2()
+
+    # ------------------------------------------------------------------
+    # OPEN
+    # ------------------------------------------------------------------
+
+    def _open_pyav(self):
+        self._container = av.open(self.path)
+        self._stream = self._container.streams.video[0]
+        # 0 lets FFmpeg pick a thread count from the CPU count
+        self._stream.thread_type = "AUTO"
+        self._stream.codec_context.thread_count = self.threads
+        if self.keyframes_only:
+            self._stream.codec_context.skip_frame = "NONKEY"
+
+        self.backend = "pyav"
+        self.fps = float(self._stream.average_rate or self._stream.guessed_rate or 25)
+        if self._stream.frames:
+            self.frame_count = self._stream.frames
+        elif self._stream.duration:
+            self.frame_count = int(float(self._stream.duration * self._stream.time_base) * self.fps)
+        else:
+            self.frame_count = None
+        self.width = self._stream.codec_context.width
+        self.height = self._stream.codec_context.height
+
+    def _open_cv2(self):
+        params = []
+        if hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            params = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        self._cap = cv2.VideoCapture(self.path, cv2.CAP_ANY, params) if params else cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            raise IOError(f"Cannot open video {self.path}")
+
+        self.backend = "opencv"
+        self.fps = self._cap.get(cv2.CAP_PROP_FPS) or 25.0
+        self.frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+        self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if self.keyframes_only:
+            # No frame-type access through VideoCapture
+            self.every_nth = max(self.every_nth, int(round(self.fps)))
+
+    @property
+    def output_size(self):
+        """(width, height) of yielded frames"""
+        if not self.max_width or self.width <= self.max_width:
+            return self.width, self.height
+        scale = self.max_width / self.width
+        # Even sizes keep swscale on its fast paths
+        return self.max_width - self.max_width % 2, max(2, int(self.height * scale) // 2 * 2)
+
+    # ------------------------------------------------------------------
+    # ITERATION
+    # ------------------------------------------------------------------
+
+    def __iter__(self):
+        while True:
+            frames = self._frames_pyav() if self._container is not None else self._frames_cv2()
+            yielded = False
+            for item in frames:
+                yielded = True
+                yield item
+            if not self.loop or not yielded:
+                return
+
+    def _frames_pyav(self):
+        stream = self._stream
+        time_base = float(stream.time_base)
+        first_pts = stream.start_time or 0
+        # Lands on the keyframe at or before start_frame
+        target = first_pts + int(self.start_frame / self.fps / time_base)
+        self._container.seek(target, stream=stream, backward=True, any_frame=False)
+
+        width, height = self.output_size
+        scale = (width, height) != (self.width, self.height)
+        for frame in self._container.decode(stream):
+            index = int(round((frame.pts - first_pts) * time_base * self.fps)) if frame.pts is not None else 0
+            if index < self.start_frame:
+                # Decoded from the keyframe before start_frame; needed, not yielded
+                continue
+            if self.end_frame is not None and index >= self.end_frame:
+                return
+            if not self.keyframes_only and (index - self.start_frame) % self.every_nth:
+                continue
+            if scale:
+                frame = frame.reformat(width=width, height=height, format="bgr24")
+                yield index, frame.to_ndarray()
+            else:
+                yield index, frame.to_ndarray(format="bgr24")
+
+    def _frames_cv2(self):
+        cap = self._cap
+        cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+        size = self.output_size
+        index = self.start_frame
+        while self.end_frame is None or index < self.end_frame:
+            if (index - self.start_frame) % self.every_nth:
+                if not cap.grab():
+                    return
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                return
+            if size != (self.width, self.height):
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            yield index, frame
+            index += 1
+
+    # ------------------------------------------------------------------
+    # HELPERS
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def chunk_ranges(frame_count: int, chunks: int) -> list:
+        """Split [0, frame_count) into contiguous (start_frame, end_frame) ranges"""
+        chunks = max(1, min(chunks, frame_count or 1))
+        size = -(-(frame_count or 0) // chunks)
+        return [(start, min(start + size, frame_count)) for start in range(0, frame_count or 0, size or 1)]
+
+    def close(self):
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
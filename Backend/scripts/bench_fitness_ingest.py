@@ -0,0 +1,66 @@
+import sys
+import os
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Runs against a throwaway SQLite file unless DATABASE_URL points elsewhere
+os.environ.setdefault("DATABASE_URL", "sqlite:///./fitness_bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-only")
+
+from app.database import async_engine, AsyncSessionLocal, Base
+from app.db_models import User, FitnessData
+from app.services.fitness_ingest import bulk_upsert_fitness, get_fitness_series
+
+WORKERS = 500
+DAYS = 30
+
+async def main():
+    sqlite = async_engine.dialect.name == "sqlite"
+    if sqlite:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=[FitnessData.__table__, User.__table__])
+            await conn.run_sync(Base.metadata.create_all, tables=[User.__table__, FitnessData.__table__])
+
+    async with AsyncSessionLocal() as db:
+        users = [
+            User(id=uuid4(), email=f"bench{i}@example.com", full_name=f"Bench {i}", google_id=f"bench-{uuid4()}")
+            for i in range(WORKERS)
+        ]
+        db.add_all(users)
+        await db.commit()
+
+        today = date.today()
+        rows = [
+            {
+                "user_id": user.id,
+                "date": today - timedelta(days=d),
+                "steps": random.randint(2000, 15000),
+                "heart_rate_resting": random.randint(55, 80),
+                "sleep_hours": round(random.uniform(4, 9), 1),
+            }
+            for user in users
+            for d in range(DAYS)
+        ]
+
+        print(f"=== Ingest {len(rows)} rows ({WORKERS} workers x {DAYS} days) ===")
+        print(f"Insert: {await bulk_upsert_fitness(db, rows)}")
+        print(f"Re-sync (all conflicts): {await bulk_upsert_fitness(db, rows)}")
+
+        t = time.perf_counter()
+        series = await get_fitness_series(db, today - timedelta(days=7), today, metrics=["steps", "sleep_hours"])
+        print(f"Series: {len(series)} workers in {(time.perf_counter() - t) * 1000:.1f}ms")
+
+        if not sqlite:
+            # Clean up the bench users (cascades to their fitness rows)
+            for user in users:
+                await db.delete(user)
+            await db.commit()
+
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing app.models builds the SafetyMonitor, which loads settings
+os.environ.setdefault("DATABASE_URL", "sqlite:///./pose_bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-only")
+
+import numpy as np
+from app.core.config import settings
+from app.models.pose_detector import COCO_TO_MEDIAPIPE, pose_backend_factory
+from app.utils.video_decoder import VideoDecoder
+
+MAX_FRAMES = 300
+MIN_VISIBILITY = 0.5
+
+# (label, backend, options); the first entry is the accuracy reference
+BACKENDS = [
+    ("mediapipe-c2", "mediapipe", {"model_complexity": 2}),
+    ("mediapipe-c1", "mediapipe", {"model_complexity": 1}),
+    ("mediapipe-c0", "mediapipe", {"model_complexity": 0}),
+    ("mediapipe-tasks", "mediapipe-tasks", {"landmarker_model": settings.POSE_LANDMARKER_MODEL, "num_poses": settings.POSE_MAX_PEOPLE}),
+    ("yolo-pose", "yolo-pose", {"yolo_model": settings.POSE_YOLO_MODEL}),
+]
+
+
+def to_array(person):
+    """COCO-mapped joints as (17, 2) with NaN where not visible"""
+    points = np.full((len(COCO_TO_MEDIAPIPE), 2), np.nan)
+    for row, index in enumerate(COCO_TO_MEDIAPIPE):
+        lm = person[index]
+        if lm["visibility"] >= MIN_VISIBILITY:
+            points[row] = lm["x"], lm["y"]
+    return points
+
+
+def torso(points):
+    """Shoulder-mid to hip-mid length, or NaN"""
+    shoulders = np.nanmean(points[5:7], axis=0)
+    hips = np.nanmean(points[11:13], axis=0)
+    return float(np.linalg.norm(shoulders - hips))
+
+
+def nearest(points, people):
+    """Person whose visible joints are closest to points"""
+    best, best_error = None, np.inf
+    for other in people:
+        error = np.nanmean(np.linalg.norm(points - other, axis=1))
+        if error < best_error:
+            best, best_error = other, error
+    return best
+
+
+def run(frames, name, options):
+    detector = pose_backend_factory(name, **options)()
+    latencies, counts, poses = [], [], []
+    try:
+        for frame in frames:
+            t = time.perf_counter()
+            people = detector.detect(frame)
+            latencies.append((time.perf_counter() - t) * 1000)
+            counts.append(len(people))
+            poses.append([to_array(person) for person in people])
+    finally:
+        detector.cleanup()
+    return np.array(latencies), np.array(counts), poses
+
+
+def jitter(poses):
+    """Mean frame-to-frame joint movement of the main person, in torso lengths"""
+    moves = []
+    for previous, current in zip(poses, poses[1:]):
+        if not previous or not current:
+            continue
+        a = previous[0]
+        b = nearest(a, current)
+        scale = torso(a)
+        if scale > 1e-6:
+            moves.append(np.nanmean(np.linalg.norm(a - b, axis=1)) / scale)
+    return float(np.nanmean(moves)) if moves else float("nan")
+
+
+def agreement(poses, reference):
+    """Mean joint error against the reference's main person, in torso lengths"""
+    errors = []
+    for own, ref in zip(poses, reference):
+        if not own or not ref:
+            continue
+        scale = torso(ref[0])
+        if scale > 1e-6:
+            errors.append(np.nanmean(np.linalg.norm(nearest(ref[0], own) - ref[0], axis=1)) / scale)
+    return float(np.nanmean(errors)) if errors else float("nan")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/benchmark_pose.py <video> [max_frames]")
+        sys.exit(1)
+    max_frames = int(sys.argv[2]) if len(sys.argv) > 2 else MAX_FRAMES
+
+    with VideoDecoder(sys.argv[1], max_width=settings.DECODE_MAX_WIDTH) as decoder:
+        frames = []
+        for _, frame in decoder:
+            frames.append(frame)
+            if len(frames) >= max_frames:
+                break
+    print(f"=== {len(frames)} frames from {sys.argv[1]} ===")
+
+    reference = None
+    print(f"{'backend':<18}{'mean ms':>9}{'p95 ms':>9}{'people':>8}{'jitter':>9}{'vs ref':>9}")
+    for label, name, options in BACKENDS:
+        if options.get("landmarker_model") and not os.path.exists(options["landmarker_model"]):
+            print(f"{label:<18}skipped (no {options['landmarker_model']})")
+            continue
+        try:
+            latencies, counts, poses = run(frames, name, options)
+        except Exception as e:
+            print(f"{label:<18}failed: {e}")
+            continue
+        if reference is None:
+            reference = poses
+        print(
+            f"{label:<18}{latencies.mean():>9.1f}{np.percentile(latencies, 95):>9.1f}"
+            f"{counts.mean():>8.2f}{jitter(poses):>9.3f}{agreement(poses, reference):>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import importlib.util
+
+# Load the analyzer on its own: importing app.models builds the SafetyMonitor
+PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "models", "ergonomic_analyzer.py")
+spec = importlib.util.spec_from_file_location("ergonomic_analyzer", PATH)
+ergo = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ergo)
+
+# (table, 1-based sub-scores, expected) read off the published worksheets
+EXAMPLES = [
+    ("RULA_TABLE_A", (1, 1, 1, 1), 1),
+    ("RULA_TABLE_A", (3, 2, 3, 1), 4),
+    ("RULA_TABLE_A", (4, 3, 2, 2), 5),
+    ("RULA_TABLE_A", (6, 3, 4, 2), 9),
+    ("RULA_TABLE_B", (1, 1, 1), 1),
+    ("RULA_TABLE_B", (3, 2, 1), 3),
+    ("RULA_TABLE_B", (4, 3, 2), 7),
+    ("RULA_TABLE_B", (6, 6, 2), 9),
+    ("RULA_TABLE_C", (4, 3), 3),
+    ("RULA_TABLE_C", (5, 5), 6),
+    ("RULA_TABLE_C", (8, 7), 7),
+    ("REBA_TABLE_A", (1, 1, 1), 1),
+    ("REBA_TABLE_A", (3, 2, 2), 5),
+    ("REBA_TABLE_A", (5, 3, 4), 9),
+    ("REBA_TABLE_B", (1, 1, 1), 1),
+    ("REBA_TABLE_B", (4, 1, 2), 5),
+    ("REBA_TABLE_B", (6, 2, 3), 9),
+    ("REBA_TABLE_C", (1, 12), 7),
+    ("REBA_TABLE_C", (4, 6), 6),
+    ("REBA_TABLE_C", (6, 9), 9),
+    ("REBA_TABLE_C", (8, 5), 10),
+    ("REBA_TABLE_C", (12, 1), 12),
+]
+
+SHAPES = {
+    "RULA_TABLE_A": (6, 3, 4, 2),
+    "RULA_TABLE_B": (6, 6, 2),
+    "RULA_TABLE_C": (8, 7),
+    "REBA_TABLE_A": (5, 3, 4),
+    "REBA_TABLE_B": (6, 2, 3),
+    "REBA_TABLE_C": (12, 12),
+}
+
+
+def main():
+    failures = []
+
+    for name, shape in SHAPES.items():
+        table = getattr(ergo, name)
+        if table.shape != shape:
+            failures.append(f"{name}: shape {table.shape}, expected {shape}")
+
+    for name, scores, expected in EXAMPLES:
+        value = int(getattr(ergo, name)[tuple(s - 1 for s in scores)])
+        if value != expected:
+            failures.append(f"{name}{list(scores)} = {value}, expected {expected}")
+
+    # Table C never lowers the score as either input rises
+    for name in ("RULA_TABLE_C", "REBA_TABLE_C"):
+        table = getattr(ergo, name).astype(int)
+        if (table[1:] < table[:-1]).any() or (table[:, 1:] < table[:, :-1]).any():
+            failures.append(f"{name}: not non-decreasing along both axes")
+
+    print(f"Checked {len(SHAPES)} tables, {len(EXAMPLES)} worksheet lookups")
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("All tables match the worksheets")
+
+
+if __name__ == "__main__":
+    main()
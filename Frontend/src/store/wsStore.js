@@ -133,6 +133,10 @@ export const wsStore = {
 
         this.notify();
 
+      } else if (msg.type === "frame_dropped") {
+        // Frame skipped under load (or unreadable): no result will come for it
+        this.pendingFrames = Math.max(0, this.pendingFrames - 1);
+
       } else if (msg.type === "cctv_status") {
         console.log("[wsStore] CCTV status:", msg.status);
         this.cctvStatus = msg.status;